@@ -0,0 +1,44 @@
+"""
+DeepSeekClient request latency against the local mock server.
+"""
+
+import time
+
+from deepseek_balance.client import DeepSeekClient, create_session, fetch_balances
+from deepseek_balance.mockserver import MockServer
+from deepseek_balance.retry import NO_RETRY
+
+
+def run(suite):
+    with MockServer() as server:
+        # New connection per call, as with module-level requests.get
+        def unpooled():
+            with DeepSeekClient("sk-bench", base_url=server.url, retry=NO_RETRY) as client:
+                client.get_balance()
+
+        suite.measure("client.get_balance.new_connection", unpooled, repeat=5)
+
+        with DeepSeekClient("sk-bench", base_url=server.url, retry=NO_RETRY) as client:
+            suite.measure("client.get_balance.pooled", client.get_balance, repeat=5)
+            suite.measure("client.get_models.pooled", client.get_models, repeat=5)
+            suite.measure("client.get_status.pooled", client.get_status, repeat=5)
+
+    accounts = 50 if suite.quick else 200
+    with MockServer(latency=0.02) as server:
+        tokens = [f"sk-bench-{i}" for i in range(accounts)]
+        timings = []
+        for _ in range(2 if suite.quick else 3):
+            session = create_session(pool_maxsize=32)
+            start = time.perf_counter()
+            for _ in fetch_balances(tokens, max_workers=32, session=session, base_url=server.url):
+                pass
+            timings.append(time.perf_counter() - start)
+            session.close()
+        suite.record(
+            "client.fetch_balances.fanout",
+            timings,
+            unit="sweep",
+            accounts=accounts,
+            workers=32,
+            server_latency=0.02,
+        )
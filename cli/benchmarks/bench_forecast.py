@@ -0,0 +1,58 @@
+"""
+Forecast fitting cost: the vectorized kernel over minute-level samples, and
+the end-to-end forecast over a history store's hourly closes.
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from deepseek_balance.forecast import compute_forecasts, forecast
+from deepseek_balance.history import HistoryStore
+
+DAY = 86400
+
+
+def minute_series(accounts, days):
+    t = np.arange(0, days * DAY, 60, dtype=np.float64)
+    groups = np.repeat(np.arange(accounts), t.size)
+    timestamps = np.tile(t, accounts)
+    rates = np.random.default_rng(0).uniform(0.5, 5.0, accounts) / DAY
+    totals = 1000 - rates[groups] * timestamps
+    return groups, timestamps, totals
+
+
+def run(suite):
+    accounts, days = (50, 7) if suite.quick else (300, 30)
+    groups, timestamps, totals = minute_series(accounts, days)
+    suite.measure(
+        f"forecast.compute_forecasts.minutes.{accounts}x{days}d",
+        lambda: compute_forecasts(groups, timestamps, totals, accounts),
+        repeat=3, unit="fit", samples=int(groups.size),
+    )
+
+    accounts, days = (20, 30) if suite.quick else (300, 90)
+    now = time.time()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        with HistoryStore(os.path.join(directory, "history.sqlite3")) as store:
+            for account in range(accounts):
+                rate = rng.uniform(0.5, 5.0)
+                store.record_many(
+                    (
+                        f"acct-{account:04d}",
+                        {"balance_infos": [{"currency": "USD", "total_balance": 1000 - rate * hour / 24}]},
+                        now - days * DAY + hour * 3600,
+                        None,
+                    )
+                    for hour in range(days * 24)
+                )
+            for window in (7, days):
+                suite.measure(
+                    f"forecast.forecast.hourly_closes.{accounts}x{days}d.window_{window}d",
+                    lambda: forecast(store, window=window * DAY, now=now),
+                    repeat=3, unit="forecast", series=accounts,
+                )
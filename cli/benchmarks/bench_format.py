@@ -0,0 +1,40 @@
+"""
+format_balance/format_models rendering throughput on large payloads, from
+raw response dicts and from already parsed typed results.
+"""
+
+from deepseek_balance.cli import format_balance, format_models
+from deepseek_balance.results import Balance
+
+
+def large_balance(currencies):
+    return {
+        "is_available": True,
+        "balance_infos": [
+            {
+                "currency": f"C{i:03d}",
+                "total_balance": f"{i * 1.37:.2f}",
+                "granted_balance": f"{i * 0.11:.2f}",
+                "topped_up_balance": f"{i * 1.26:.2f}",
+            }
+            for i in range(currencies)
+        ],
+    }
+
+
+def large_models(count):
+    return {
+        "object": "list",
+        "data": [{"id": f"deepseek-model-{i}", "object": "model", "owned_by": "deepseek"} for i in range(count)],
+    }
+
+
+def run(suite):
+    for size in (1, 100, 10_000):
+        data = large_balance(size)
+        suite.measure(f"format.format_balance.{size}", lambda: format_balance(data), items=size)
+        balance = Balance.from_dict(data)
+        suite.measure(f"format.format_balance.typed.{size}", lambda: format_balance(balance), items=size)
+    for size in (2, 100, 10_000):
+        data = large_models(size)
+        suite.measure(f"format.format_models.{size}", lambda: format_models(data), items=size)
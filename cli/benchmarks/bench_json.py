@@ -0,0 +1,58 @@
+"""
+JSON backend cost: decoding /usage and balance payloads, and encoding CLI
+output, with the standard library and with orjson when it is installed.
+"""
+
+from datetime import date, timedelta
+
+from deepseek_balance import jsonlib
+from deepseek_balance.cli import balance_records
+from deepseek_balance.mockserver import MockServer
+
+from bench_format import large_balance
+
+
+def available_backends():
+    backends = ["json"]
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        backends.append("orjson")
+    return backends
+
+
+def run(suite):
+    mock = MockServer(usage_models=10)
+    start = date(2024, 1, 1)
+    end = start + timedelta(days=29 if suite.quick else 364)
+    usage = mock.usage("sk-bench", start.isoformat(), end.isoformat())
+    payloads = {
+        "usage": jsonlib.dumps(usage).encode("utf-8"),
+        "balance": jsonlib.dumps(mock.balance("sk-bench")).encode("utf-8"),
+    }
+    ndjson_records = balance_records(large_balance(1000), account="sk-bench...")
+
+    previous = jsonlib.backend()
+    try:
+        for backend in available_backends():
+            jsonlib.use_backend(backend)
+            for name, body in payloads.items():
+                suite.measure(
+                    f"json.loads.{name}.{backend}",
+                    lambda: jsonlib.loads(body),
+                    unit="document", bytes=len(body),
+                )
+            suite.measure(
+                f"json.dumps.usage_pretty.{backend}",
+                lambda: jsonlib.dumps(usage, pretty=True),
+                unit="document", records=len(usage["data"]),
+            )
+            suite.measure(
+                f"json.dumps.ndjson_lines.{backend}",
+                lambda: [jsonlib.dumps(record) for record in ndjson_records],
+                unit="1000 lines",
+            )
+    finally:
+        jsonlib.use_backend(previous)
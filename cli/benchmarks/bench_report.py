@@ -0,0 +1,47 @@
+"""
+Usage report cost: the vectorized group-by over tens of millions of rows,
+and the end-to-end report over a synced usage store.
+"""
+
+import tempfile
+from datetime import date, timedelta
+
+import numpy as np
+
+from deepseek_balance.report import group_sums, usage_report
+from deepseek_balance.usage import UsageStore
+
+
+def run(suite):
+    rows = 1_000_000 if suite.quick else 20_000_000
+    rng = np.random.default_rng(0)
+    sizes = [20, 365, 200, 1]
+    keys = [rng.integers(0, size, rows) for size in sizes]
+    values = {field: rng.integers(0, 1_000_000, rows) for field in ("prompt", "completion", "total", "cost")}
+    suite.measure(
+        f"report.group_sums.{rows // 1_000_000}M_rows",
+        lambda: group_sums(keys, sizes, values),
+        repeat=3, unit="report", rows=rows,
+    )
+
+    accounts, days, models = (5, 30, 4) if suite.quick else (20, 90, 5)
+    start = date(2024, 1, 1)
+    with tempfile.TemporaryDirectory() as directory:
+        store = UsageStore(directory)
+        for account in range(accounts):
+            store.write_days(f"acct-{account:04d}", {
+                day: [
+                    {
+                        "date": day.isoformat(), "model": f"model-{model}", "prompt_tokens": 1000 + model,
+                        "completion_tokens": 100, "total_tokens": 1100 + model, "cost": "0.001234", "currency": "USD",
+                    }
+                    for model in range(models)
+                ]
+                for day in (start + timedelta(days=offset) for offset in range(days))
+            }, label=f"sk-{account:04d}...")
+        for by in (["model"], ["model", "day", "token"]):
+            suite.measure(
+                f"report.usage_report.{accounts}x{days}d.by_{'_'.join(by)}",
+                lambda: usage_report(store, by=by),
+                repeat=3, unit="report", records=accounts * days * models,
+            )
@@ -0,0 +1,48 @@
+"""
+Typed result objects: parsing cost, and memory held per usage record
+compared with the raw response dicts.
+"""
+
+import tracemalloc
+
+from deepseek_balance import jsonlib
+from deepseek_balance.results import UsageRecord
+
+
+def usage_body(count):
+    return jsonlib.dumps([
+        {
+            "date": f"2024-01-{day % 28 + 1:02d}",
+            "model": f"deepseek-model-{day % 5}",
+            "prompt_tokens": 1000 + day,
+            "completion_tokens": 200 + day,
+            "total_tokens": 1200 + 2 * day,
+            "cost": f"{day * 0.000137:.6f}",
+            "currency": "USD",
+        }
+        for day in range(count)
+    ]).encode("utf-8")
+
+
+def retained_bytes(build):
+    tracemalloc.start()
+    try:
+        kept = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def run(suite):
+    count = 10_000 if suite.quick else 200_000
+    body = usage_body(count)
+    dicts = jsonlib.loads(body)
+    suite.measure(
+        f"results.UsageRecord.from_dict.{count}",
+        lambda: [UsageRecord.from_dict(record) for record in dicts],
+        repeat=3, unit="parse", items=count,
+        bytes_per_record=retained_bytes(lambda: [UsageRecord.from_dict(r) for r in jsonlib.loads(body)]) / count,
+        dict_bytes_per_record=retained_bytes(lambda: jsonlib.loads(body)) / count,
+    )
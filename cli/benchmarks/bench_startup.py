@@ -0,0 +1,36 @@
+"""
+End-to-end dsbc process startup time.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+CLI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _time_command(args, runs):
+    env = dict(os.environ, PYTHONPATH=CLI_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run(suite):
+    runs = 3 if suite.quick else 15
+    entry = "from deepseek_balance.cli import main; main()"
+    suite.record("startup.python", _time_command([sys.executable, "-c", "pass"], runs), unit="process")
+    suite.record(
+        "startup.dsbc_version",
+        _time_command([sys.executable, "-c", entry, "--version"], runs),
+        unit="process",
+    )
+    suite.record(
+        "startup.dsbc_help",
+        _time_command([sys.executable, "-c", entry, "--help"], runs),
+        unit="process",
+    )
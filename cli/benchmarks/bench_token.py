@@ -0,0 +1,34 @@
+"""
+get_api_token resolution cost.
+"""
+
+import os
+
+from deepseek_balance.cli import get_api_token
+
+TOKEN_VARS = ("DEEPSEEK_API_TOKEN", "DEEPSEEK_TOKEN", "DEEPSEEK_API_KEY", "OPENAI_API_KEY")
+
+
+def run(suite):
+    saved = {name: os.environ.pop(name, None) for name in TOKEN_VARS}
+    try:
+        suite.measure("token.get_api_token.argument", lambda: get_api_token("sk-argument"))
+
+        os.environ["DEEPSEEK_API_TOKEN"] = "sk-env"
+        suite.measure("token.get_api_token.env", lambda: get_api_token())
+        del os.environ["DEEPSEEK_API_TOKEN"]
+
+        os.environ["OPENAI_API_KEY"] = "sk-fallback"
+        devnull = open(os.devnull, "w")
+        import sys
+        stderr, sys.stderr = sys.stderr, devnull
+        try:
+            suite.measure("token.get_api_token.fallback_env", lambda: get_api_token())
+        finally:
+            sys.stderr = stderr
+            devnull.close()
+    finally:
+        for name in TOKEN_VARS:
+            os.environ.pop(name, None)
+            if saved[name] is not None:
+                os.environ[name] = saved[name]
@@ -0,0 +1,116 @@
+"""
+Benchmark harness
+
+Minimal timing helpers shared by the benchmark modules. Results are plain
+dictionaries so they can be written as JSON and compared across releases.
+"""
+
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class BenchmarkSuite:
+    """Collects timing results for one benchmark run."""
+
+    def __init__(self, quick: bool = False):
+        """
+        Args:
+            quick: Use fewer repetitions, for smoke runs
+        """
+        self.quick = quick
+        self.results: List[Dict[str, Any]] = []
+
+    def measure(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        repeat: int = 5,
+        number: Optional[int] = None,
+        unit: str = "call",
+        **extra: Any,
+    ) -> Dict[str, Any]:
+        """
+        Time ``func`` and record the result.
+
+        ``func`` runs ``number`` times per round (auto-calibrated to about
+        0.2 seconds when not given) for ``repeat`` rounds.
+
+        Args:
+            name: Benchmark name, e.g. ``client.get_balance.sequential``
+            func: Callable to time
+            repeat: Number of timed rounds
+            number: Calls per round
+            unit: What one call represents, for reporting
+            **extra: Additional fields stored with the result
+
+        Returns:
+            Result dictionary with per-call timings in seconds
+        """
+        if self.quick:
+            repeat = min(repeat, 2)
+        func()  # warm-up
+        if number is None:
+            number = self._calibrate(func, 0.02 if self.quick else 0.2)
+        rounds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            rounds.append((time.perf_counter() - start) / number)
+        result = {
+            "name": name,
+            "unit": unit,
+            "repeat": repeat,
+            "number": number,
+            "min": min(rounds),
+            "median": statistics.median(rounds),
+            "mean": statistics.mean(rounds),
+            "stdev": statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+            "ops_per_sec": 1 / statistics.median(rounds) if statistics.median(rounds) else None,
+        }
+        result.update(extra)
+        self.results.append(result)
+        return result
+
+    def record(self, name: str, seconds: List[float], unit: str = "call", **extra: Any) -> Dict[str, Any]:
+        """
+        Record externally measured per-call timings.
+
+        Args:
+            name: Benchmark name
+            seconds: Individual measurements in seconds
+            unit: What one measurement represents
+            **extra: Additional fields stored with the result
+
+        Returns:
+            Result dictionary
+        """
+        ordered = sorted(seconds)
+        median = statistics.median(ordered)
+        result = {
+            "name": name,
+            "unit": unit,
+            "repeat": len(ordered),
+            "number": 1,
+            "min": ordered[0],
+            "median": median,
+            "mean": statistics.mean(ordered),
+            "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "ops_per_sec": 1 / median if median else None,
+        }
+        result.update(extra)
+        self.results.append(result)
+        return result
+
+    @staticmethod
+    def _calibrate(func: Callable[[], Any], target: float) -> int:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= target or number >= 1_000_000:
+                return number
+            number *= 2
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Run the dsbc benchmark suite.
+
+Results are written as JSON so they can be stored per release and compared:
+
+    python benchmarks/run.py --output bench-1.1.0.json
+    python benchmarks/run.py --compare bench-1.1.0.json --threshold 0.2
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from harness import BenchmarkSuite  # noqa: E402
+
+MODULES = ["bench_client", "bench_format", "bench_token", "bench_startup", "bench_forecast", "bench_json", "bench_report", "bench_results"]
+
+
+def compare(results, baseline, threshold):
+    """Print median changes against a baseline; return names that regressed."""
+    previous = {r["name"]: r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if not before:
+            continue
+        change = (result["median"] - before["median"]) / before["median"]
+        marker = ""
+        if change > threshold:
+            regressions.append(result["name"])
+            marker = "  REGRESSION"
+        print(f"{result['name']:45s} {before['median'] * 1e6:12.1f}us -> {result['median'] * 1e6:12.1f}us "
+              f"({change:+.1%}){marker}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the dsbc benchmark suite")
+    parser.add_argument("--output", "-o", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--only", action="append", choices=MODULES, help="Run only these benchmark modules")
+    parser.add_argument("--quick", action="store_true", help="Fewer repetitions, for smoke runs")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare medians with a previous JSON result")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as regression")
+    args = parser.parse_args(argv)
+
+    from deepseek_balance import __version__
+
+    suite = BenchmarkSuite(quick=args.quick)
+    started = time.perf_counter()
+    for name in args.only or MODULES:
+        print(f"Running {name}...", file=sys.stderr)
+        importlib.import_module(name).run(suite)
+
+    report = {
+        "dsbc_version": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "duration": time.perf_counter() - started,
+        "results": suite.results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(suite.results, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,13 +8,54 @@ __version__ = "1.0.2"
 __author__ = "Merlos"
 __email__ = "merlos@users.github.com"
 
-from .client import DeepSeekClient
-from .cli import main, format_balance, format_models, get_api_token
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .client import DeepSeekClient, fetch_balances
+    from .async_client import AsyncDeepSeekClient
+    from .cli import main, format_balance, format_models, get_api_token
+    from .results import Balance, BalanceInfo, Model, UsageRecord
+
+# Public names are imported on first access, so that importing the package
+# (and running `dsbc --help`) does not load requests, aiohttp and friends.
+_LAZY_IMPORTS = {
+    "DeepSeekClient": ".client",
+    "fetch_balances": ".client",
+    "AsyncDeepSeekClient": ".async_client",
+    "main": ".cli",
+    "format_balance": ".cli",
+    "format_models": ".cli",
+    "get_api_token": ".cli",
+    "Balance": ".results",
+    "BalanceInfo": ".results",
+    "Model": ".results",
+    "UsageRecord": ".results",
+}
 
 __all__ = [
     "DeepSeekClient",
+    "AsyncDeepSeekClient",
+    "fetch_balances",
     "main",
     "format_balance",
     "format_models",
     "get_api_token",
-]
\ No newline at end of file
+    "Balance",
+    "BalanceInfo",
+    "Model",
+    "UsageRecord",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
\ No newline at end of file
@@ -0,0 +1,428 @@
+"""
+Balance Alerts
+
+Threshold rules evaluated on every watch poll, with hysteresis and
+deduplication, delivered through pluggable sinks (local command, webhook,
+file). Each sink runs on its own worker thread behind a bounded queue, so a
+slow or failing sink never delays the next balance poll.
+"""
+
+import os
+import queue
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from . import jsonlib
+from .client import token_fingerprint
+from .constants import DEFAULT_ALERT_QUEUE_SIZE
+
+# Alert defaults
+DEFAULT_SINK_TIMEOUT = 10.0
+# Fraction of the threshold a balance must recover above before a low
+# balance alert resolves, when no explicit margin is given
+DEFAULT_HYSTERESIS = 0.1
+
+# Request headers of webhook deliveries
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+FIRING = "firing"
+RESOLVED = "resolved"
+
+
+class Condition(NamedTuple):
+    """Outcome of a rule for one account and currency."""
+
+    currency: Optional[str]
+    # True breaches the rule, False clears it, None keeps the current state
+    breached: Optional[bool]
+    value: float
+    threshold: float
+
+
+class AlertRule:
+    """Base class for alert rules."""
+
+    name = "rule"
+
+    def evaluate(self, balance_data: Dict[str, Any]) -> List[Condition]:
+        """Return one condition per currency (or one for the account) the rule covers."""
+        raise NotImplementedError
+
+    def describe(self, condition: Condition, firing: bool) -> str:
+        """Human-readable summary of a condition that fired or resolved."""
+        raise NotImplementedError
+
+
+class LowBalanceRule(AlertRule):
+    """
+    Fire when ``total_balance`` drops below a threshold.
+
+    The alert resolves only once the balance is back at or above
+    ``threshold + clear_margin``, so a balance hovering around the threshold
+    does not flap.
+    """
+
+    name = "low_balance"
+
+    def __init__(self, threshold: float, currency: Optional[str] = None, clear_margin: Optional[float] = None):
+        """
+        Args:
+            threshold: Balance below which the rule fires
+            currency: Only check this currency (default: every currency)
+            clear_margin: Amount above the threshold needed to resolve
+                (default: 10% of the threshold)
+
+        Raises:
+            ValueError: If the threshold or margin is negative
+        """
+        if threshold < 0:
+            raise ValueError("threshold must not be negative")
+        if clear_margin is None:
+            clear_margin = threshold * DEFAULT_HYSTERESIS
+        if clear_margin < 0:
+            raise ValueError("clear_margin must not be negative")
+        self.threshold = threshold
+        self.currency = currency
+        self.clear_margin = clear_margin
+
+    def evaluate(self, balance_data: Dict[str, Any]) -> List[Condition]:
+        conditions = []
+        for info in balance_data.get("balance_infos", []):
+            currency = info.get("currency", "USD")
+            if self.currency is not None and currency != self.currency:
+                continue
+            total = float(info.get("total_balance", 0))
+            if total < self.threshold:
+                breached: Optional[bool] = True
+            elif total >= self.threshold + self.clear_margin:
+                breached = False
+            else:
+                breached = None
+            conditions.append(Condition(currency, breached, total, self.threshold))
+        return conditions
+
+    def describe(self, condition: Condition, firing: bool) -> str:
+        if firing:
+            return f"Balance {condition.value:.2f} {condition.currency} is below {condition.threshold:.2f}"
+        return f"Balance {condition.value:.2f} {condition.currency} recovered above {condition.threshold:.2f}"
+
+
+class UnavailableRule(AlertRule):
+    """Fire when the account reports ``is_available == false``."""
+
+    name = "unavailable"
+
+    def evaluate(self, balance_data: Dict[str, Any]) -> List[Condition]:
+        available = bool(balance_data.get("is_available", True))
+        return [Condition(None, not available, 1.0 if available else 0.0, 1.0)]
+
+    def describe(self, condition: Condition, firing: bool) -> str:
+        return "Account is not available" if firing else "Account is available again"
+
+
+class Sink:
+    """Base class for alert sinks. ``send`` runs on a worker thread."""
+
+    name = "sink"
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class CommandSink(Sink):
+    """
+    Run a local command for every alert.
+
+    The alert is passed as JSON on stdin and as ``DSBC_ALERT_*`` environment
+    variables (``RULE``, ``STATE``, ``ACCOUNT``, ``CURRENCY``, ``VALUE``,
+    ``THRESHOLD``, ``MESSAGE``).
+    """
+
+    name = "command"
+
+    def __init__(self, command: str, timeout: float = DEFAULT_SINK_TIMEOUT):
+        """
+        Args:
+            command: Shell command line
+            timeout: Seconds before the command is killed
+        """
+        self.command = command
+        self.timeout = timeout
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        env = dict(os.environ)
+        for key, value in alert.items():
+            env[f"DSBC_ALERT_{key.upper()}"] = "" if value is None else str(value)
+        result = subprocess.run(
+            self.command,
+            shell=True,
+            input=jsonlib.dumps(alert).encode("utf-8"),
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=self.timeout,
+        )
+        if result.returncode != 0:
+            raise Exception(
+                f"Alert command exited with {result.returncode}: "
+                f"{result.stderr.decode('utf-8', 'replace').strip()}"
+            )
+
+
+class WebhookSink(Sink):
+    """POST every alert as JSON to a URL, encoded with :mod:`deepseek_balance.jsonlib`."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = DEFAULT_SINK_TIMEOUT, session: Optional[requests.Session] = None):
+        """
+        Args:
+            url: Webhook URL
+            timeout: Seconds to wait for the webhook
+            session: requests session to reuse (default: a private one)
+        """
+        self.url = url
+        self.timeout = timeout
+        self.session = session if session is not None else requests.Session()
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        response = self.session.post(
+            self.url, data=jsonlib.dumps(alert).encode("utf-8"), headers=JSON_HEADERS, timeout=self.timeout
+        )
+        response.raise_for_status()
+
+
+class FileSink(Sink):
+    """Append every alert to a file as one JSON document per line."""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: File to append to
+        """
+        self.path = path
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(jsonlib.dumps(alert) + "\n")
+
+
+class CallbackSink(Sink):
+    """Call a function with every alert, e.g. to print it."""
+
+    name = "callback"
+
+    def __init__(self, callback: Callable[[Dict[str, Any]], None]):
+        self.callback = callback
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        self.callback(alert)
+
+
+class _SinkWorker:
+    """Bounded queue and worker thread in front of one sink."""
+
+    def __init__(self, sink: Sink, queue_size: int, on_error: Optional[Callable[[Sink, Exception], None]]):
+        self.sink = sink
+        self.queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self.on_error = on_error
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name=f"dsbc-alert-{sink.name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, alert: Dict[str, Any]) -> bool:
+        try:
+            self.queue.put_nowait(alert)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self) -> None:
+        while True:
+            alert = self.queue.get()
+            if alert is None:
+                return
+            try:
+                self.sink.send(alert)
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                if self.on_error is not None:
+                    self.on_error(self.sink, e)
+
+    def close(self, timeout: Optional[float]) -> None:
+        # The sentinel waits behind queued alerts, so they are delivered first
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+
+
+class AlertDispatcher:
+    """
+    Deliver alerts to sinks without blocking the caller.
+
+    Every sink has its own worker thread and bounded queue. When a queue is
+    full the alert is dropped for that sink and counted in :attr:`dropped`.
+    """
+
+    def __init__(
+        self,
+        sinks: Iterable[Sink],
+        queue_size: int = DEFAULT_ALERT_QUEUE_SIZE,
+        on_error: Optional[Callable[[Sink, Exception], None]] = None,
+    ):
+        """
+        Args:
+            sinks: Sinks to deliver to
+            queue_size: Alerts buffered per sink
+            on_error: Called on the worker thread when a sink fails
+
+        Raises:
+            ValueError: If the queue size is not positive
+        """
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self._workers = [_SinkWorker(sink, queue_size, on_error) for sink in sinks]
+
+    @property
+    def dropped(self) -> int:
+        """Alerts dropped because a sink's queue was full."""
+        return sum(worker.dropped for worker in self._workers)
+
+    @property
+    def failed(self) -> int:
+        """Alerts a sink failed to deliver."""
+        return sum(worker.failed for worker in self._workers)
+
+    @property
+    def sent(self) -> int:
+        """Alerts delivered, counted once per sink."""
+        return sum(worker.sent for worker in self._workers)
+
+    def submit(self, alert: Dict[str, Any]) -> None:
+        """Queue an alert for every sink; never blocks."""
+        for worker in self._workers:
+            worker.submit(alert)
+
+    def close(self, timeout: Optional[float] = DEFAULT_SINK_TIMEOUT) -> None:
+        """Deliver queued alerts, waiting up to ``timeout`` seconds per sink."""
+        for worker in self._workers:
+            worker.close(timeout)
+
+    def __enter__(self) -> "AlertDispatcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class AlertEngine:
+    """
+    Evaluate rules against watcher events and emit deduplicated alerts.
+
+    Each rule, account and currency has its own state. An alert is emitted
+    when the state flips to firing or back to resolved, after the condition
+    held for ``confirm`` consecutive polls; polls in a rule's hysteresis band
+    and failed polls leave the state unchanged. While firing, the alert is
+    repeated every ``repeat`` seconds if set.
+
+    Register :meth:`handle` with :meth:`deepseek_balance.watch.Watcher.add_handler`.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[AlertRule],
+        emit: Callable[[Dict[str, Any]], None],
+        confirm: int = 1,
+        repeat: Optional[float] = None,
+        account_label: Callable[[str], str] = token_fingerprint,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            rules: Rules to evaluate
+            emit: Receives every alert, e.g. :meth:`AlertDispatcher.submit`
+            confirm: Consecutive polls a condition must hold before the
+                state changes
+            repeat: Re-send firing alerts this often, in seconds (default:
+                only on state changes)
+            account_label: Turns a token into the ``account`` field
+            clock: Monotonic time source for ``repeat``
+
+        Raises:
+            ValueError: If ``confirm`` or ``repeat`` is out of range
+        """
+        if confirm < 1:
+            raise ValueError("confirm must be at least 1")
+        if repeat is not None and repeat <= 0:
+            raise ValueError("repeat must be positive")
+        self.rules = list(rules)
+        self.emit = emit
+        self.confirm = confirm
+        self.repeat = repeat
+        self.account_label = account_label
+        self._clock = clock
+        self._state: Dict[Tuple[int, str, Optional[str]], Dict[str, Any]] = {}
+
+    @property
+    def firing(self) -> List[Tuple[str, str, Optional[str]]]:
+        """(rule, account, currency) of every alert currently firing."""
+        return [
+            (self.rules[index].name, self.account_label(token), currency)
+            for (index, token, currency), state in self._state.items()
+            if state["firing"]
+        ]
+
+    def handle(self, event: Dict[str, Any]) -> None:
+        """Evaluate every rule against one watcher event."""
+        if event["error"] is not None or event["balance"] is None:
+            return
+        now = self._clock()
+        for index, rule in enumerate(self.rules):
+            for condition in rule.evaluate(event["balance"]):
+                key = (index, event["token"], condition.currency)
+                state = self._state.setdefault(key, {"firing": False, "streak": 0, "last_sent": None})
+                if condition.breached is None or condition.breached == state["firing"]:
+                    state["streak"] = 0
+                    if state["firing"] and self.repeat is not None and now - state["last_sent"] >= self.repeat:
+                        self._send(rule, condition, event, FIRING, state, now)
+                    continue
+                state["streak"] += 1
+                if state["streak"] < self.confirm:
+                    continue
+                state["firing"] = condition.breached
+                state["streak"] = 0
+                self._send(rule, condition, event, FIRING if condition.breached else RESOLVED, state, now)
+
+    def _send(
+        self,
+        rule: AlertRule,
+        condition: Condition,
+        event: Dict[str, Any],
+        status: str,
+        state: Dict[str, Any],
+        now: float,
+    ) -> None:
+        state["last_sent"] = now
+        self.emit({
+            "rule": rule.name,
+            "state": status,
+            "account": self.account_label(event["token"]),
+            "currency": condition.currency,
+            "value": condition.value,
+            "threshold": condition.threshold,
+            "message": rule.describe(condition, status == FIRING),
+            "timestamp": datetime.fromtimestamp(event["timestamp"], timezone.utc).isoformat(),
+        })
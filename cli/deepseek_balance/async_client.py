@@ -0,0 +1,291 @@
+"""
+DeepSeek API Async Client
+
+Asyncio client for interacting with DeepSeek API without blocking the event loop.
+Requires the optional ``aiohttp`` dependency (``pip install dsbc[async]``).
+"""
+
+import asyncio
+import time
+from typing import Optional, Dict, Any
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised only without the extra
+    aiohttp = None
+
+from . import __version__, jsonlib
+from .constants import (
+    DEEPSEEK_API_BASE,
+    BALANCE_PATH,
+    MODELS_PATH,
+    USAGE_PATH,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_HEALTH_TIMEOUT,
+    Timeout,
+)
+from .results import Balance, Model, UsageRecord, parse_list
+
+# Connection pool and concurrency defaults
+DEFAULT_MAX_CONCURRENCY = 100
+DEFAULT_CONNECTION_LIMIT = 100
+DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+
+
+class AsyncDeepSeekClient:
+    """Asyncio client for interacting with DeepSeek API."""
+
+    def __init__(
+        self,
+        api_token: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        limit: int = DEFAULT_CONNECTION_LIMIT,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        session: Optional["aiohttp.ClientSession"] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        base_url: str = DEEPSEEK_API_BASE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ):
+        """
+        Initialize async DeepSeek client with API token.
+
+        Args:
+            api_token: DeepSeek API token
+            max_concurrency: Maximum number of requests in flight at once
+            limit: Total number of pooled connections
+            limit_per_host: Maximum pooled connections per host (0 = no limit)
+            keepalive_timeout: Seconds an idle connection is kept open
+            session: Existing aiohttp session to share between clients. The
+                caller stays responsible for closing it.
+            semaphore: Existing semaphore to share the concurrency limit
+                between clients (overrides max_concurrency)
+            base_url: API base URL, e.g. a local mock server
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for the server to respond
+
+        Raises:
+            ImportError: If aiohttp is not installed
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncDeepSeekClient requires aiohttp. "
+                "Install it with: pip install dsbc[async]"
+            )
+        self.api_token = api_token
+        self.headers = {
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json",
+            "User-Agent": f"dsbc/{__version__}"
+        }
+        self.max_concurrency = max_concurrency
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._owns_session = session is None
+        self._session = session
+        self._semaphore = semaphore
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """Pooled aiohttp session, created on first use inside the event loop."""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """Close pooled connections owned by this client."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncDeepSeekClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    def url(self, path: str) -> str:
+        """Return the absolute URL of an API path."""
+        return f"{self.base_url}{path}"
+
+    def _client_timeout(self, timeout: Optional[Timeout]) -> "aiohttp.ClientTimeout":
+        """Convert a timeout override, or the client defaults, for aiohttp."""
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        if isinstance(timeout, tuple):
+            return aiohttp.ClientTimeout(connect=timeout[0], sock_read=timeout[1])
+        return aiohttp.ClientTimeout(total=timeout)
+
+    def _limiter(self) -> asyncio.Semaphore:
+        """Semaphore bounding requests in flight, bound to the running loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _get(
+        self,
+        url: str,
+        timeout: Optional[Timeout] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Issue a GET request, bounded by the concurrency limit, and decode JSON."""
+        async with self._limiter():
+            async with self.session.get(
+                url,
+                headers=self.headers,
+                params=params,
+                timeout=self._client_timeout(timeout),
+            ) as response:
+                response.raise_for_status()
+                return await response.json(loads=jsonlib.loads)
+
+    async def get_balance(self, timeout: Optional[Timeout] = None, typed: bool = False) -> Dict[str, Any]:
+        """
+        Get account balance information.
+
+        Args:
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call
+            typed: Return a :class:`~deepseek_balance.results.Balance`
+                instead of the response dict
+
+        Returns:
+            Dictionary with balance information, or a ``Balance``
+
+        Raises:
+            Exception: If API request fails
+        """
+        try:
+            balance = await self._get(self.url(BALANCE_PATH), timeout=timeout)
+            return Balance.from_dict(balance) if typed else balance
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise Exception(f"Failed to fetch balance: {e}")
+
+    async def get_models(self, timeout: Optional[Timeout] = None, typed: bool = False) -> Dict[str, Any]:
+        """
+        Get available models and their pricing.
+
+        Args:
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call
+            typed: Hold :class:`~deepseek_balance.results.Model` entries
+                in ``data`` instead of dicts
+
+        Returns:
+            Dictionary with models information
+
+        Raises:
+            Exception: If API request fails
+        """
+        try:
+            models = await self._get(self.url(MODELS_PATH), timeout=timeout)
+            return parse_list(models, Model) if typed else models
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise Exception(f"Failed to fetch models: {e}")
+
+    async def get_status(self, timeout: Optional[Timeout] = None, typed: bool = False) -> Dict[str, Any]:
+        """
+        Check API health and fetch the balance with a single request.
+
+        Args:
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call
+            typed: Return the balance as a
+                :class:`~deepseek_balance.results.Balance`
+
+        Returns:
+            Dictionary with ``healthy``, ``status_code``, ``latency_ms``,
+            ``balance``, ``error`` and ``circuit``, as in
+            DeepSeekClient.get_status; ``circuit`` is always None, as the
+            async client has no circuit breaker
+        """
+        status: Dict[str, Any] = {
+            "healthy": False,
+            "status_code": None,
+            "latency_ms": 0.0,
+            "balance": None,
+            "error": None,
+            "circuit": None,
+        }
+        start = time.perf_counter()
+        try:
+            async with self._limiter():
+                async with self.session.get(
+                    self.url(BALANCE_PATH),
+                    headers=self.headers,
+                    timeout=self._client_timeout(timeout),
+                ) as response:
+                    status["latency_ms"] = (time.perf_counter() - start) * 1000
+                    status["status_code"] = response.status
+                    if response.status != 200:
+                        status["error"] = f"HTTP {response.status}"
+                        return status
+                    balance = await response.json(loads=jsonlib.loads)
+                    status["balance"] = Balance.from_dict(balance) if typed else balance
+                    status["healthy"] = True
+        except Exception as e:
+            if not status["latency_ms"]:
+                status["latency_ms"] = (time.perf_counter() - start) * 1000
+            status["error"] = str(e) or type(e).__name__
+        return status
+
+    async def check_health(self, timeout: Optional[Timeout] = None) -> bool:
+        """
+        Check if API token is valid and API is accessible.
+
+        Args:
+            timeout: Timeout override (default: the client's timeouts, with
+                the read timeout capped at 5 seconds)
+
+        Returns:
+            True if API is accessible, False otherwise
+        """
+        if timeout is None:
+            timeout = (self.connect_timeout, min(self.read_timeout, DEFAULT_HEALTH_TIMEOUT))
+        return (await self.get_status(timeout=timeout))["healthy"]
+
+    async def get_usage(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        timeout: Optional[Timeout] = None,
+        typed: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Get usage statistics for a date range.
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call
+            typed: Hold :class:`~deepseek_balance.results.UsageRecord`
+                entries in ``data`` instead of dicts
+
+        Returns:
+            Dictionary with usage statistics
+
+        Note: This endpoint may not be available in all DeepSeek API versions
+        """
+        params = {}
+        if start_date:
+            params["start_date"] = start_date
+        if end_date:
+            params["end_date"] = end_date
+
+        try:
+            usage = await self._get(self.url(USAGE_PATH), params=params, timeout=timeout)
+            return parse_list(usage, UsageRecord) if typed else usage
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise Exception(f"Failed to fetch usage: {e}")
@@ -0,0 +1,310 @@
+"""
+Response Cache
+
+Pluggable cache backends for DeepSeek API responses, with an in-memory LRU
+layer, an on-disk layer under the user cache directory, and a tiered cache
+combining both.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+from . import jsonlib
+
+# Cache defaults
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 128
+CACHE_DIR_ENV_VAR = "DSBC_CACHE_DIR"
+
+
+def user_cache_dir() -> str:
+    """
+    Return the per-user cache directory for dsbc.
+
+    ``DSBC_CACHE_DIR`` overrides the platform default.
+
+    Returns:
+        Absolute path of the cache directory (not created)
+    """
+    override = os.getenv(CACHE_DIR_ENV_VAR)
+    if override:
+        return os.path.abspath(os.path.expanduser(override))
+    if sys.platform == "win32":
+        base = os.getenv("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "dsbc", "Cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/dsbc")
+    base = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "dsbc")
+
+
+class CacheEntry:
+    """A cached response body with its expiry time and HTTP validators."""
+
+    __slots__ = ("body", "stored_at", "expires_at", "etag", "last_modified")
+
+    def __init__(
+        self,
+        body: Any,
+        ttl: float,
+        stored_at: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """
+        Create a cache entry.
+
+        Args:
+            body: Decoded response body
+            ttl: Seconds the entry stays fresh
+            stored_at: Unix time the response was received (default: now)
+            etag: ``ETag`` header of the response, if any
+            last_modified: ``Last-Modified`` header of the response, if any
+        """
+        self.body = body
+        self.stored_at = time.time() if stored_at is None else stored_at
+        self.expires_at = self.stored_at + ttl
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Return True if the entry has not expired yet."""
+        return (time.time() if now is None else now) < self.expires_at
+
+    @property
+    def has_validators(self) -> bool:
+        """True if the entry can be revalidated with a conditional request."""
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Return ``If-None-Match``/``If-Modified-Since`` headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the entry to a JSON-compatible dictionary."""
+        return {
+            "body": self.body,
+            "stored_at": self.stored_at,
+            "expires_at": self.expires_at,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CacheEntry":
+        """Rebuild an entry from :meth:`to_dict` output."""
+        entry = cls(
+            data["body"],
+            0,
+            stored_at=data["stored_at"],
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+        )
+        entry.expires_at = data["expires_at"]
+        return entry
+
+
+class CacheBackend:
+    """
+    Base class for cache backends.
+
+    Backends store entries by key and may return expired entries; callers
+    decide what to do with them using :meth:`CacheEntry.is_fresh`, e.g.
+    revalidate them with a conditional request.
+    """
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry stored under key, or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry under key."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under key, if any."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """Thread-safe in-memory LRU cache."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Maximum number of entries before the least recently
+                used one is evicted
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FileCache(CacheBackend):
+    """
+    On-disk cache storing one JSON file per entry.
+
+    Writes are atomic, so concurrent dsbc processes can share a directory.
+    I/O errors are swallowed: a broken cache only costs a network request.
+    """
+
+    SUFFIX = ".json"
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            directory: Cache directory (default: :func:`user_cache_dir`)
+            max_entries: Maximum number of files before the oldest ones are
+                evicted
+        """
+        self.directory = directory or user_cache_dir()
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> str:
+        import hashlib  # deferred: noticeable in CLI startup time
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + self.SUFFIX)
+
+    def _files(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, n) for n in names if n.endswith(self.SUFFIX)]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return CacheEntry.from_dict(jsonlib.loads(f.read()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(jsonlib.dumps(entry.to_dict()))
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._evict()
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _evict(self) -> None:
+        files = self._files()
+        if len(files) <= self.max_entries:
+            return
+        def mtime(path: str) -> float:
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0.0
+        files.sort(key=mtime)
+        for path in files[: len(files) - self.max_entries]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        for path in self._files():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+class TieredCache(CacheBackend):
+    """
+    Cache made of several layers, fastest first.
+
+    Lookups fall through the layers and promote hits into the faster ones;
+    writes go to every layer.
+    """
+
+    def __init__(self, *layers: CacheBackend):
+        self.layers = list(layers)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        for index, layer in enumerate(self.layers):
+            entry = layer.get(key)
+            if entry is not None:
+                for faster in self.layers[:index]:
+                    faster.set(key, entry)
+                return entry
+        return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        for layer in self.layers:
+            layer.set(key, entry)
+
+    def delete(self, key: str) -> None:
+        for layer in self.layers:
+            layer.delete(key)
+
+    def clear(self) -> None:
+        for layer in self.layers:
+            layer.clear()
+
+
+def default_cache(directory: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> TieredCache:
+    """
+    Create the default two-layer cache: memory in front of disk.
+
+    Args:
+        directory: On-disk cache directory (default: :func:`user_cache_dir`)
+        max_entries: Maximum number of entries per layer
+
+    Returns:
+        Tiered cache with a MemoryCache and a FileCache layer
+    """
+    return TieredCache(MemoryCache(max_entries), FileCache(directory, max_entries))
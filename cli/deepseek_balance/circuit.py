@@ -0,0 +1,167 @@
+"""
+Circuit Breaker
+
+Fail fast while the DeepSeek API is down instead of waiting for timeouts.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+# Circuit states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Circuit breaker defaults
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT = 30.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit is open."""
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open: DeepSeek API unavailable, next probe in {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+
+    The circuit opens after ``failure_threshold`` consecutive failures.
+    While open, requests fail immediately with :class:`CircuitOpenError`.
+    After ``recovery_timeout`` seconds the circuit half-opens and lets a
+    single probe request through: a success closes the circuit, a failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before probing again
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if now - self._opened_at >= self.recovery_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    @property
+    def state(self) -> str:
+        """Current state: ``closed``, ``open`` or ``half_open``."""
+        with self._lock:
+            return self._state(time.monotonic())
+
+    @property
+    def failures(self) -> int:
+        """Number of consecutive failures recorded."""
+        return self._failures
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 when not open)."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def before_request(self) -> None:
+        """
+        Check whether a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                probe already in flight
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN:
+                probe_stale = (
+                    self._probe_started is None
+                    or now - self._probe_started >= self.recovery_timeout
+                )
+                if probe_stale:
+                    self._probe_started = now
+                    return
+                raise CircuitOpenError(self.recovery_timeout - (now - self._probe_started))
+            raise CircuitOpenError(self._opened_at + self.recovery_timeout - now)
+
+    def record_success(self) -> None:
+        """Record a successful request and close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit past the threshold."""
+        with self._lock:
+            now = time.monotonic()
+            self._failures += 1
+            if self._state(now) == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = now
+                self._probe_started = None
+
+    def reset(self) -> None:
+        """Close the circuit and forget recorded failures."""
+        self.record_success()
+
+
+class CircuitBreakers:
+    """
+    One :class:`CircuitBreaker` per account, created on first use.
+
+    Pass an instance as a client's ``circuit_breaker`` to give every account
+    its own breaker, so one failing account never blocks the others.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open a circuit
+            recovery_timeout: Seconds to stay open before probing again
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        """Breaker of one account, e.g. a token fingerprint."""
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        """Current state of every breaker created so far, by key."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.state for key, breaker in breakers.items()}
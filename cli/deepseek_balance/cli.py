@@ -9,56 +9,108 @@ Supports token from environment variable or command-line argument.
 import os
 import sys
 import argparse
-import json
-from typing import Optional, Dict, Any
-from datetime import datetime
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple
 
-from .client import DeepSeekClient
+from . import __version__, jsonlib
+from .constants import (
+    DEFAULT_MAX_WORKERS,
+    DEEPSEEK_API_BASE,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_METRICS_HOST,
+    DEFAULT_METRICS_PORT,
+    DEFAULT_ALERT_QUEUE_SIZE,
+)
+from .cache import default_cache, DEFAULT_TTL
+from .retry import RetryPolicy, DEFAULT_MAX_ATTEMPTS
+from .ratelimit import FileRateLimiter
+from .circuit import CircuitBreakers, DEFAULT_FAILURE_THRESHOLD, DEFAULT_RECOVERY_TIMEOUT
+from .results import Balance, format_rounded
+
+# Duration suffixes accepted by parse_duration, in seconds
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
 
 # Default environment variable name
 DEFAULT_ENV_VAR = "DEEPSEEK_API_TOKEN"
 
+# Connection settings environment variables
+BASE_URL_ENV_VAR = "DEEPSEEK_API_BASE"
+CONNECT_TIMEOUT_ENV_VAR = "DSBC_CONNECT_TIMEOUT"
+READ_TIMEOUT_ENV_VAR = "DSBC_READ_TIMEOUT"
+
 def format_balance(balance_data: Dict[str, Any]) -> str:
     """
     Format balance information for display.
     
     Args:
-        balance_data: Raw balance data from API
+        balance_data: :class:`~deepseek_balance.results.Balance` or raw
+            balance data from API
         
     Returns:
         Formatted string with balance information
     """
     if not balance_data:
         return "No balance data received"
+    balance = Balance.from_dict(balance_data)
     
     output = []
     output.append("=" * 50)
     output.append("DEEPSEEK ACCOUNT BALANCE")
     output.append("=" * 50)
 
-    is_available = balance_data.get("is_available", True)
+    is_available = balance.is_available is None or bool(balance.is_available)
     output.append(f"Status:            {'✅ Available' if is_available else '❌ Unavailable'}")
 
-    balance_infos = balance_data.get("balance_infos", [])
-    if not balance_infos:
+    if not balance.balance_infos:
         output.append("No balance information available")
         output.append("=" * 50)
         return "\n".join(output)
 
-    for info in balance_infos:
-        currency = info.get("currency", "USD")
-        total_balance = float(info.get("total_balance", 0))
-        granted_balance = float(info.get("granted_balance", 0))
-        topped_up_balance = float(info.get("topped_up_balance", 0))
+    for info in balance.balance_infos:
+        currency = info.currency or "USD"
+        total_balance = format_rounded(info.total_micros or 0)
+        granted_balance = format_rounded(info.granted_micros or 0)
+        topped_up_balance = format_rounded(info.topped_up_micros or 0)
 
         output.append(f"Currency:          {currency}")
-        output.append(f"Total Balance:     {total_balance:.2f} {currency}")
-        output.append(f"Topped-up Balance: {topped_up_balance:.2f} {currency}")
-        output.append(f"Granted Balance:   {granted_balance:.2f} {currency}")
+        output.append(f"Total Balance:     {total_balance} {currency}")
+        output.append(f"Topped-up Balance: {topped_up_balance} {currency}")
+        output.append(f"Granted Balance:   {granted_balance} {currency}")
 
     output.append("=" * 50)
     return "\n".join(output)
 
+def format_balance_line(balance_data: Dict[str, Any]) -> str:
+    """
+    Format balance information as a single line, for repeated output.
+    
+    Args:
+        balance_data: :class:`~deepseek_balance.results.Balance` or raw
+            balance data from API
+        
+    Returns:
+        One-line summary with every currency
+    """
+    if not balance_data:
+        return "No balance data received"
+    balance = Balance.from_dict(balance_data)
+    
+    is_available = balance.is_available is None or bool(balance.is_available)
+    parts = ["✅ Available" if is_available else "❌ Unavailable"]
+    for info in balance.balance_infos or ():
+        currency = info.currency or "USD"
+        total_balance = format_rounded(info.total_micros or 0)
+        granted_balance = format_rounded(info.granted_micros or 0)
+        topped_up_balance = format_rounded(info.topped_up_micros or 0)
+        parts.append(
+            f"{total_balance} {currency} "
+            f"(topped-up {topped_up_balance}, granted {granted_balance})"
+        )
+    return "  ".join(parts)
+
 def format_models(models_data: Dict[str, Any]) -> str:
     """
     Format models information for display.
@@ -91,6 +143,106 @@ def format_models(models_data: Dict[str, Any]) -> str:
     output.append("=" * 50)
     return "\n".join(output)
 
+def format_forecast(forecasts: List[Dict[str, Any]]) -> str:
+    """
+    Format balance depletion forecasts for display.
+    
+    Args:
+        forecasts: Results of :func:`deepseek_balance.forecast.forecast`
+        
+    Returns:
+        Formatted string with one line per account and currency
+    """
+    output = []
+    output.append("=" * 50)
+    output.append("DEEPSEEK BALANCE FORECAST")
+    output.append("=" * 50)
+    
+    if not forecasts:
+        output.append("No history recorded in this window")
+        output.append("=" * 50)
+        return "\n".join(output)
+    
+    for item in forecasts:
+        line = f"  {item['label']}  {item['balance']:.2f} {item['currency']}"
+        rate = item["burn_rate_per_day"]
+        if rate is None:
+            line += "  not enough history"
+        elif item["depletes_at"] is None:
+            line += "  no spend detected"
+        else:
+            empty_on = datetime.fromtimestamp(item["depletes_at"]).strftime("%Y-%m-%d %H:%M")
+            line += f"  burn {rate:.2f}/day  empty in {item['days_left']:.1f} days ({empty_on})"
+        output.append(line)
+    
+    output.append("=" * 50)
+    return "\n".join(output)
+
+def format_usage_report(rows: List[Dict[str, Any]], by: Sequence[str]) -> str:
+    """
+    Format an aggregated usage report for display.
+    
+    Args:
+        rows: Results of :func:`deepseek_balance.report.usage_report`
+        by: Record fields of the grouping dimensions, e.g. ``["model"]``
+        
+    Returns:
+        Formatted string with one line per group and a total per currency
+    """
+    from decimal import Decimal
+    
+    output = []
+    output.append("=" * 50)
+    output.append("DEEPSEEK USAGE REPORT")
+    output.append("=" * 50)
+    
+    if not rows:
+        output.append("No usage stored for this selection")
+        output.append("=" * 50)
+        return "\n".join(output)
+    
+    widths = {field: max(len(str(row[field])) for row in rows) for field in by}
+    totals: Dict[Any, List[Any]] = {}
+    for row in rows:
+        keys = "  ".join(str(row[field]).ljust(widths[field]) for field in by)
+        currency = row["currency"] or ""
+        output.append(
+            f"  - {keys}  in {row['prompt_tokens']:,}  out {row['completion_tokens']:,}  "
+            f"cost {row['cost']} {currency}".rstrip()
+        )
+        total = totals.setdefault(currency, [0, 0, Decimal(0)])
+        total[0] += row["prompt_tokens"]
+        total[1] += row["completion_tokens"]
+        total[2] += Decimal(row["cost"])
+    
+    for currency, (prompt_tokens, completion_tokens, cost) in totals.items():
+        output.append(f"  Total: in {prompt_tokens:,}  out {completion_tokens:,}  cost {cost} {currency}".rstrip())
+    
+    output.append("=" * 50)
+    return "\n".join(output)
+
+def balance_records(balance_data: Dict[str, Any], **fields: Any) -> List[Dict[str, Any]]:
+    """
+    Split a balance response into one flat record per currency.
+    
+    Args:
+        balance_data: Raw balance data from API
+        **fields: Leading fields of every record, e.g. ``account``
+        
+    Returns:
+        One record per currency with the fields, the balance info and
+        ``is_available``; a single record without currency fields when the
+        response lists no currency
+    """
+    is_available = balance_data.get("is_available", True)
+    infos = balance_data.get("balance_infos") or [{}]
+    return [{**fields, **info, "is_available": is_available} for info in infos]
+
+def print_ndjson(records: Iterable[Dict[str, Any]]) -> None:
+    """Print records as compact JSON, one per line, flushing after each."""
+    for record in records:
+        print(jsonlib.dumps(record), flush=True)
+
 def get_api_token(args_token: Optional[str] = None) -> str:
     """
     Get API token from command line argument or environment variable.
@@ -125,8 +277,1125 @@ def get_api_token(args_token: Optional[str] = None) -> str:
         f"Set {DEFAULT_ENV_VAR} environment variable or use --token argument."
     )
 
-def main():
+def get_env_float(name: str, default: float) -> float:
+    """
+    Read a positive number from an environment variable.
+    
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset or empty
+        
+    Returns:
+        Parsed value
+        
+    Raises:
+        ValueError: If the variable is not a positive number
+    """
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {raw!r}")
+    if value <= 0:
+        raise ValueError(f"{name} must be positive")
+    return value
+
+def get_connection_options(
+    base_url: Optional[str] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Resolve base URL and timeouts from arguments, then environment variables.
+    
+    Args:
+        base_url: API base URL from the command line
+        connect_timeout: Connect timeout from the command line
+        read_timeout: Read timeout from the command line
+        
+    Returns:
+        DeepSeekClient keyword arguments
+        
+    Raises:
+        ValueError: If a timeout is not positive
+    """
+    if connect_timeout is None:
+        connect_timeout = get_env_float(CONNECT_TIMEOUT_ENV_VAR, DEFAULT_CONNECT_TIMEOUT)
+    if read_timeout is None:
+        read_timeout = get_env_float(READ_TIMEOUT_ENV_VAR, DEFAULT_READ_TIMEOUT)
+    options = {
+        "base_url": base_url or os.getenv(BASE_URL_ENV_VAR) or DEEPSEEK_API_BASE,
+        "connect_timeout": connect_timeout,
+        "read_timeout": read_timeout,
+    }
+    for name in ("connect_timeout", "read_timeout"):
+        if options[name] <= 0:
+            raise ValueError(f"--{name.replace('_', '-')} must be positive")
+    return options
+
+def read_tokens(path: str) -> List[str]:
+    """
+    Read API tokens from a file, one per line.
+    
+    Blank lines and lines starting with ``#`` are ignored.
+    
+    Args:
+        path: Path to the tokens file, or ``-`` to read from stdin
+        
+    Returns:
+        List of tokens in file order
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+def get_api_tokens(args_tokens: Optional[List[str]] = None, tokens_file: Optional[str] = None) -> List[str]:
+    """
+    Collect API tokens from repeated --token arguments and a tokens file.
+    
+    Falls back to :func:`get_api_token` when neither source provides a token.
+    Duplicate tokens are dropped, keeping the first occurrence.
+    
+    Args:
+        args_tokens: Tokens from command line arguments
+        tokens_file: Path to a tokens file, or ``-`` for stdin
+        
+    Returns:
+        List of unique API tokens
+        
+    Raises:
+        ValueError: If no token is found
+    """
+    tokens = list(args_tokens or [])
+    if tokens_file:
+        tokens.extend(read_tokens(tokens_file))
+    if not tokens:
+        return [get_api_token()]
+    return list(dict.fromkeys(tokens))
+
+def mask_token(token: str) -> str:
+    """Return a printable, shortened form of an API token."""
+    if len(token) <= 12:
+        return token[:4] + "..."
+    return f"{token[:8]}...{token[-4:]}"
+
+def add_client_arguments(parser: argparse.ArgumentParser, circuit_breaker: bool = True) -> None:
+    """
+    Add token, connection and resilience options shared by every command.
+    
+    Args:
+        parser: Parser to extend
+        circuit_breaker: Add the circuit breaker options. Breakers live in
+            memory, so only commands making many requests per account in
+            one process can ever open them
+    """
+    parser.add_argument(
+        "--token", "-t",
+        action="append",
+        help=f"DeepSeek API token, repeat for several accounts (default: from {DEFAULT_ENV_VAR} env var)"
+    )
+    
+    parser.add_argument(
+        "--tokens-file", "-f",
+        metavar="PATH",
+        help="Read API tokens from a file, one per line (use - for stdin)"
+    )
+    
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Concurrent requests when checking several accounts (default: {DEFAULT_MAX_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--base-url",
+        metavar="URL",
+        help=f"API base URL, e.g. a local mock server (default: ${BASE_URL_ENV_VAR} or {DEEPSEEK_API_BASE})"
+    )
+    
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        metavar="SECONDS",
+        help=f"Seconds to wait for a connection (default: ${CONNECT_TIMEOUT_ENV_VAR} or {DEFAULT_CONNECT_TIMEOUT:g})"
+    )
+    
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        metavar="SECONDS",
+        help=f"Seconds to wait for a response (default: ${READ_TIMEOUT_ENV_VAR} or {DEFAULT_READ_TIMEOUT:g})"
+    )
+    
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS - 1,
+        metavar="N",
+        help=f"Retries for connection errors, 429 and 5xx responses (default: {DEFAULT_MAX_ATTEMPTS - 1})"
+    )
+    
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Total time allowed per request, including retries (default: unbounded)"
+    )
+    
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        metavar="RPS",
+        help="Maximum requests per second, shared by all dsbc processes on this host"
+    )
+    
+    parser.add_argument(
+        "--burst",
+        type=int,
+        metavar="N",
+        help="Requests allowed at once under --rate-limit (default: one second worth)"
+    )
+    
+    if not circuit_breaker:
+        return
+    
+    parser.add_argument(
+        "--circuit-threshold",
+        type=int,
+        default=DEFAULT_FAILURE_THRESHOLD,
+        metavar="N",
+        help=f"Consecutive API failures of an account before failing fast (default: {DEFAULT_FAILURE_THRESHOLD}, 0 disables)"
+    )
+    
+    parser.add_argument(
+        "--circuit-timeout",
+        type=float,
+        default=DEFAULT_RECOVERY_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Seconds to fail fast before probing the API again (default: {DEFAULT_RECOVERY_TIMEOUT:.0f})"
+    )
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the mutually exclusive ``--json`` and ``--ndjson`` output options.
+    
+    Args:
+        parser: Parser to extend
+    """
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--json", "-j",
+        action="store_true",
+        help="Output in JSON format"
+    )
+    group.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Output one compact JSON object per line, flushed as soon as it is ready"
+    )
+
+def get_client_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Build DeepSeekClient keyword arguments from parsed command line options.
+    
+    Args:
+        args: Namespace produced by a parser set up with :func:`add_client_arguments`
+        
+    Returns:
+        DeepSeekClient keyword arguments
+        
+    Raises:
+        ValueError: If an option is out of range
+    """
+    if args.retries < 0:
+        raise ValueError("--retries must not be negative")
+    if args.workers < 1:
+        raise ValueError("--workers must be at least 1")
+    options = get_connection_options(args.base_url, args.connect_timeout, args.read_timeout)
+    options["retry"] = RetryPolicy(max_attempts=args.retries + 1, deadline=args.deadline)
+    options["rate_limiter"] = None
+    if args.rate_limit is not None:
+        if args.rate_limit <= 0:
+            raise ValueError("--rate-limit must be positive")
+        options["rate_limiter"] = FileRateLimiter(args.rate_limit, args.burst)
+    options["circuit_breaker"] = None
+    if getattr(args, "circuit_threshold", 0) > 0:
+        # One breaker per account, so a failing account never blocks the others
+        options["circuit_breaker"] = CircuitBreakers(args.circuit_threshold, args.circuit_timeout)
+    return options
+
+def parse_duration(value: str) -> float:
+    """
+    Parse a duration such as ``90``, ``90s``, ``15m``, ``12h``, ``7d`` or ``2w``.
+    
+    Args:
+        value: Number of seconds, optionally with a unit suffix
+        
+    Returns:
+        Duration in seconds
+        
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive duration
+    """
+    text = value.strip().lower()
+    scale = DURATION_UNITS.get(text[-1:], None)
+    number = text[:-1] if scale is not None else text
+    try:
+        seconds = float(number) * (scale or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid duration: {value!r} (use e.g. 90s, 15m, 12h, 7d)")
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"duration must be positive: {value!r}")
+    return seconds
+
+def parse_threshold(value: str) -> Tuple[Optional[str], float]:
+    """
+    Parse a low-balance threshold such as ``5`` or ``USD:5``.
+    
+    Args:
+        value: Amount, optionally prefixed with a currency and a colon
+        
+    Returns:
+        Tuple of (currency or None for every currency, amount)
+        
+    Raises:
+        argparse.ArgumentTypeError: If the amount is not a non-negative number
+    """
+    currency, _, amount = value.rpartition(":")
+    try:
+        threshold = float(amount)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid threshold: {value!r} (use e.g. 5 or USD:5)")
+    if threshold < 0:
+        raise argparse.ArgumentTypeError(f"threshold must not be negative: {value!r}")
+    return (currency.strip().upper() or None), threshold
+
+def parse_date(value: str) -> date:
+    """
+    Parse a ``YYYY-MM-DD`` date.
+    
+    Args:
+        value: ISO date
+        
+    Returns:
+        Parsed date
+        
+    Raises:
+        argparse.ArgumentTypeError: If the value is not an ISO date
+    """
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {value!r} (use YYYY-MM-DD)")
+
+def check_accounts(
+    tokens: List[str],
+    max_workers: int,
+    as_json: bool,
+    ndjson: bool = False,
+    **client_options: Any,
+) -> int:
+    """
+    Fetch balances for many accounts concurrently and print each as it arrives.
+    
+    Args:
+        tokens: API tokens to check
+        max_workers: Maximum number of requests in flight at once
+        as_json: Print JSON documents instead of formatted text
+        ndjson: Print one JSON line per account and currency instead
+        **client_options: Extra DeepSeekClient options
+        
+    Returns:
+        Number of accounts that could not be checked
+    """
+    # Imported here so --help and --version never load the HTTP stack
+    from .client import fetch_balances
+    
+    failed = 0
+    for token, balance_data, error in fetch_balances(tokens, max_workers=max_workers, **client_options):
+        account = mask_token(token)
+        if error is not None:
+            failed += 1
+        if ndjson:
+            if error is not None:
+                print_ndjson([{"account": account, "error": str(error)}])
+            else:
+                print_ndjson(balance_records(balance_data, account=account))
+        elif as_json:
+            record = {"account": account}
+            if error is not None:
+                record["error"] = str(error)
+            else:
+                record["balance"] = balance_data
+            print(jsonlib.dumps(record, pretty=True), flush=True)
+        elif error is not None:
+            print(f"Account: {account}\nError: {error}", flush=True)
+        else:
+            print(f"Account: {account}\n{format_balance(balance_data)}", flush=True)
+    print(f"Checked {len(tokens)} accounts, {failed} failed", file=sys.stderr)
+    return failed
+
+def print_watch_event(event: Dict[str, Any], as_json: bool, ndjson: bool = False) -> None:
+    """
+    Print a watcher event that is due for reporting.
+    
+    Args:
+        event: Event produced by :class:`deepseek_balance.watch.Watcher`
+        as_json: Print a JSON document instead of a text line
+        ndjson: Print one JSON line per currency instead
+    """
+    if not event["report"]:
+        return
+    account = mask_token(event["token"])
+    if ndjson:
+        timestamp = datetime.fromtimestamp(event["timestamp"], timezone.utc).isoformat()
+        if event["error"] is not None:
+            print_ndjson([{"timestamp": timestamp, "account": account, "error": event["error"]}])
+        else:
+            print_ndjson(balance_records(event["balance"], timestamp=timestamp, account=account))
+        return
+    if as_json:
+        record = {
+            "timestamp": datetime.fromtimestamp(event["timestamp"], timezone.utc).isoformat(),
+            "account": account,
+        }
+        if event["error"] is not None:
+            record["error"] = event["error"]
+        else:
+            record["balance"] = event["balance"]
+        print(jsonlib.dumps(record, pretty=True), flush=True)
+        return
+    stamp = datetime.fromtimestamp(event["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
+    if event["error"] is not None:
+        print(f"{stamp}  {account}  Error: {event['error']}", flush=True)
+    else:
+        print(f"{stamp}  {account}  {format_balance_line(event['balance'])}", flush=True)
+
+def print_alert(alert: Dict[str, Any]) -> None:
+    """Print an alert to stderr."""
+    marker = "🔔" if alert["state"] == "firing" else "✅"
+    print(f"{marker} {alert['account']}  {alert['message']}", file=sys.stderr, flush=True)
+
+def build_alerts(args: argparse.Namespace, watcher: Any) -> Any:
+    """
+    Attach the alert rules and sinks requested on the command line to a watcher.
+    
+    Alerts are printed to stderr when no sink is given.
+    
+    Args:
+        args: Parsed ``dsbc watch`` options
+        watcher: :class:`deepseek_balance.watch.Watcher` to evaluate
+        
+    Returns:
+        The :class:`deepseek_balance.alerts.AlertDispatcher` to close when
+        done, or None when no rule is configured
+    """
+    if not args.alert_below and not args.alert_unavailable:
+        if args.alert_command or args.alert_webhook or args.alert_file:
+            raise ValueError("Alert sinks need a rule: use --alert-below or --alert-unavailable")
+        return None
+    
+    from .alerts import (
+        AlertDispatcher, AlertEngine, CallbackSink, CommandSink, FileSink,
+        LowBalanceRule, UnavailableRule, WebhookSink,
+    )
+    
+    rules = [
+        LowBalanceRule(threshold, currency=currency, clear_margin=args.alert_margin)
+        for currency, threshold in args.alert_below
+    ]
+    if args.alert_unavailable:
+        rules.append(UnavailableRule())
+    sinks = (
+        [CommandSink(command) for command in args.alert_command]
+        + [WebhookSink(url) for url in args.alert_webhook]
+        + [FileSink(path) for path in args.alert_file]
+    )
+    if not sinks:
+        sinks.append(CallbackSink(print_alert))
+    dispatcher = AlertDispatcher(
+        sinks, queue_size=args.alert_queue,
+        on_error=lambda sink, e: print(f"Alert {sink.name} sink failed: {e}", file=sys.stderr, flush=True),
+    )
+    engine = AlertEngine(
+        rules, dispatcher.submit, confirm=args.alert_confirm,
+        repeat=args.alert_repeat, account_label=mask_token,
+    )
+    watcher.add_handler(engine.handle)
+    return dispatcher
+
+def watch_command(argv: List[str]) -> None:
+    """Entry point for ``dsbc watch``."""
+    parser = argparse.ArgumentParser(
+        prog="dsbc watch",
+        description="Poll DeepSeek balances on a fixed schedule, printing only changes",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                          # Poll every 60 seconds, print on change
+  %(prog)s --interval 10            # Poll every 10 seconds
+  %(prog)s --heartbeat 3600         # Also print unchanged balances hourly
+  %(prog)s -f keys.txt --json       # Watch many accounts, JSON output
+  %(prog)s --ndjson | jq .total_balance
+  %(prog)s --alert-below USD:5 --alert-unavailable --alert-webhook https://hooks.example.com/dsbc
+        """
+    )
+    add_client_arguments(parser)
+    
+    parser.add_argument(
+        "--interval", "-i",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+        metavar="SECONDS",
+        help=f"Seconds between polls (default: {DEFAULT_WATCH_INTERVAL:g})"
+    )
+    
+    parser.add_argument(
+        "--heartbeat",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Print unchanged balances at least this often (default: 0, only on change)"
+    )
+    
+    parser.add_argument(
+        "--count", "-n",
+        type=int,
+        metavar="N",
+        help="Stop after N polls (default: run until interrupted)"
+    )
+    
+    add_output_arguments(parser)
+    
+    parser.add_argument(
+        "--alert-below",
+        type=parse_threshold,
+        action="append",
+        default=[],
+        metavar="[CURRENCY:]AMOUNT",
+        help="Alert when a total balance drops below AMOUNT, repeatable (e.g. 5 or USD:5)"
+    )
+    
+    parser.add_argument(
+        "--alert-margin",
+        type=float,
+        metavar="AMOUNT",
+        help="How far above the threshold a balance must recover to resolve (default: 10%% of the threshold)"
+    )
+    
+    parser.add_argument(
+        "--alert-unavailable",
+        action="store_true",
+        help="Alert when an account reports is_available false"
+    )
+    
+    parser.add_argument(
+        "--alert-confirm",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Polls a condition must hold before an alert fires or resolves (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--alert-repeat",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Repeat firing alerts this often (default: only when the state changes)"
+    )
+    
+    parser.add_argument(
+        "--alert-command",
+        action="append",
+        default=[],
+        metavar="CMD",
+        help="Run CMD for each alert, with the alert as JSON on stdin and in DSBC_ALERT_* variables"
+    )
+    
+    parser.add_argument(
+        "--alert-webhook",
+        action="append",
+        default=[],
+        metavar="URL",
+        help="POST each alert as JSON to URL"
+    )
+    
+    parser.add_argument(
+        "--alert-file",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Append each alert to PATH as a line of JSON"
+    )
+    
+    parser.add_argument(
+        "--alert-queue",
+        type=int,
+        default=DEFAULT_ALERT_QUEUE_SIZE,
+        metavar="N",
+        help=f"Alerts buffered per sink before new ones are dropped (default: {DEFAULT_ALERT_QUEUE_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="Record every poll in the local balance history (see dsbc history)"
+    )
+    
+    parser.add_argument(
+        "--history-file",
+        metavar="PATH",
+        help="History database to record into, implies --history (default: in the user data directory)"
+    )
+    
+    parser.add_argument(
+        "--retention",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Drop recorded samples older than this, e.g. 90d (default: keep everything)"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        api_tokens = get_api_tokens(args.token, args.tokens_file)
+        client_options = get_client_options(args)
+        if args.count is not None and args.count < 1:
+            raise ValueError("--count must be at least 1")
+        
+        # Imported here so --help and --version never load the HTTP stack
+        from .watch import Watcher
+        
+        with Watcher(
+            api_tokens, interval=args.interval, heartbeat=args.heartbeat,
+            max_workers=args.workers, **client_options,
+        ) as watcher:
+            watcher.add_handler(lambda event: print_watch_event(event, args.json, args.ndjson))
+            dispatcher = build_alerts(args, watcher)
+            store = None
+            if args.history or args.history_file:
+                from .history import HistoryStore
+                store = HistoryStore(args.history_file, retention=args.retention)
+                watcher.add_poll_handler(lambda events: record_history(store, events))
+            try:
+                watcher.run(count=args.count)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                if store is not None:
+                    store.close()
+                if dispatcher is not None:
+                    dispatcher.close()
+                    if dispatcher.dropped:
+                        print(f"Dropped {dispatcher.dropped} alerts: sink queues were full", file=sys.stderr)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def serve_metrics_command(argv: List[str]) -> None:
+    """Entry point for ``dsbc serve-metrics``."""
+    parser = argparse.ArgumentParser(
+        prog="dsbc serve-metrics",
+        description="Expose DeepSeek balances as Prometheus gauges",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  %(prog)s                          # Serve http://127.0.0.1:{DEFAULT_METRICS_PORT}/metrics
+  %(prog)s --host 0.0.0.0 --port 9100
+  %(prog)s -f keys.txt --interval 300
+
+Scrapes are answered from balances refreshed every --interval seconds, so
+scrapers never trigger API requests.
+        """
+    )
+    add_client_arguments(parser)
+    
+    parser.add_argument(
+        "--interval", "-i",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+        metavar="SECONDS",
+        help=f"Seconds between balance refreshes (default: {DEFAULT_WATCH_INTERVAL:g})"
+    )
+    
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_METRICS_HOST,
+        help=f"Interface to listen on (default: {DEFAULT_METRICS_HOST})"
+    )
+    
+    parser.add_argument(
+        "--port", "-p",
+        type=int,
+        default=DEFAULT_METRICS_PORT,
+        help=f"Port to listen on (default: {DEFAULT_METRICS_PORT})"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        api_tokens = get_api_tokens(args.token, args.tokens_file)
+        client_options = get_client_options(args)
+        
+        # Imported here so --help and --version never load the HTTP stack
+        from .metrics import MetricsExporter
+        
+        exporter = MetricsExporter(
+            api_tokens, interval=args.interval, host=args.host, port=args.port,
+            max_workers=args.workers, **client_options,
+        )
+        print(f"Serving metrics on http://{args.host}:{args.port}/metrics", file=sys.stderr)
+        try:
+            exporter.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def record_history(store: Any, events: List[Dict[str, Any]]) -> None:
+    """
+    Record the successful events of one watcher poll in a history store.
+    
+    Accounts are keyed by token fingerprint and labelled with the masked
+    token, so raw tokens never reach the database.
+    
+    Args:
+        store: :class:`deepseek_balance.history.HistoryStore` to write to
+        events: Events produced by one :meth:`deepseek_balance.watch.Watcher.poll`
+    """
+    from .client import token_fingerprint
+    
+    store.record_many(
+        (token_fingerprint(event["token"]), event["balance"], event["timestamp"], mask_token(event["token"]))
+        for event in events
+        if event["error"] is None
+    )
+
+def history_command(argv: List[str]) -> None:
+    """Entry point for ``dsbc history``."""
+    parser = argparse.ArgumentParser(
+        prog="dsbc history",
+        description="Show balances recorded by dsbc watch --history",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                          # Every sample of the last day
+  %(prog)s --since 30d --bucket 1d  # Daily closing balances for a month
+  %(prog)s --account sk-abc1...2345 --currency USD --json
+  %(prog)s --prune 90d              # Delete samples older than 90 days
+        """
+    )
+    
+    parser.add_argument(
+        "--history-file",
+        metavar="PATH",
+        help="History database (default: in the user data directory)"
+    )
+    
+    parser.add_argument(
+        "--account", "-a",
+        help="Only this account, as printed by dsbc (masked token) or its fingerprint"
+    )
+    
+    parser.add_argument(
+        "--currency", "-c",
+        help="Only this currency"
+    )
+    
+    parser.add_argument(
+        "--since", "-s",
+        type=parse_duration,
+        default=DURATION_UNITS["d"],
+        metavar="DURATION",
+        help="How far back to look, e.g. 12h or 30d (default: 1d)"
+    )
+    
+    parser.add_argument(
+        "--bucket", "-b",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Downsample to the closing balance of each bucket, e.g. 1h"
+    )
+    
+    parser.add_argument(
+        "--prune",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Delete samples older than DURATION and exit"
+    )
+    
+    add_output_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        from .history import HistoryStore
+        
+        with HistoryStore(args.history_file) as store:
+            if args.prune is not None:
+                deleted = store.prune(args.prune)
+                print(f"Deleted {deleted} samples", file=sys.stderr)
+                return
+            start = time.time() - args.since
+            if args.bucket is not None:
+                samples = store.downsample(args.bucket, args.account, args.currency, start=start)
+            else:
+                samples = store.query(args.account, args.currency, start=start)
+            labels = store.accounts()
+        
+        if args.json or args.ndjson:
+            records = [
+                {
+                    "timestamp": datetime.fromtimestamp(sample.timestamp, timezone.utc).isoformat(),
+                    "account": labels.get(sample.account, sample.account),
+                    "currency": sample.currency,
+                    "total_balance": sample.total,
+                    "granted_balance": sample.granted,
+                    "topped_up_balance": sample.topped_up,
+                    "is_available": sample.available,
+                }
+                for sample in samples
+            ]
+            if args.ndjson:
+                print_ndjson(records)
+            else:
+                print(jsonlib.dumps(records, pretty=True))
+            return
+        if not samples:
+            print("No history recorded in this range")
+            return
+        for sample in samples:
+            stamp = datetime.fromtimestamp(sample.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+            print(
+                f"{stamp}  {labels.get(sample.account, sample.account)}  "
+                f"{sample.total:.2f} {sample.currency} "
+                f"(topped-up {sample.topped_up:.2f}, granted {sample.granted:.2f})"
+                + ("" if sample.available else "  ❌ Unavailable")
+            )
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def forecast_command(argv: List[str]) -> None:
+    """Entry point for ``dsbc forecast``."""
+    parser = argparse.ArgumentParser(
+        prog="dsbc forecast",
+        description="Project when each account runs out of balance, from dsbc watch --history",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                          # Fit the last 7 days of every account
+  %(prog)s --window 30d --currency USD
+  %(prog)s --json
+
+Requires numpy: pip install dsbc[analytics]
+        """
+    )
+    
+    parser.add_argument(
+        "--history-file",
+        metavar="PATH",
+        help="History database (default: in the user data directory)"
+    )
+    
+    parser.add_argument(
+        "--window",
+        type=parse_duration,
+        default=7 * DURATION_UNITS["d"],
+        metavar="DURATION",
+        help="Trailing history used to fit the spend rate, e.g. 3d (default: 7d)"
+    )
+    
+    parser.add_argument(
+        "--account", "-a",
+        help="Only this account, as printed by dsbc (masked token) or its fingerprint"
+    )
+    
+    parser.add_argument(
+        "--currency", "-c",
+        help="Only this currency"
+    )
+    
+    add_output_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        from .history import HistoryStore
+        from .forecast import forecast
+        
+        with HistoryStore(args.history_file) as store:
+            forecasts = forecast(store, window=args.window, account=args.account, currency=args.currency)
+        
+        if args.json or args.ndjson:
+            for item in forecasts:
+                if item["depletes_at"] is not None:
+                    item["depletes_at"] = datetime.fromtimestamp(item["depletes_at"], timezone.utc).isoformat()
+            if args.ndjson:
+                print_ndjson(forecasts)
+            else:
+                print(jsonlib.dumps(forecasts, pretty=True))
+        else:
+            print(format_forecast(forecasts))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def usage_sync_command(argv: List[str]) -> None:
+    """Entry point for ``dsbc usage sync``."""
+    parser = argparse.ArgumentParser(
+        prog="dsbc usage sync",
+        description="Copy /usage data to the local usage store, one day per request",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                          # Sync the last 30 days
+  %(prog)s --start 2024-01-01       # Sync from a date up to today
+  %(prog)s -f keys.txt --since 1y --workers 16
+  %(prog)s --full --since 7d        # Re-fetch every day, even final ones
+
+Days already fetched once they were final (--settle after they ended, in
+UTC) are skipped; new days and days that could still change are fetched.
+        """
+    )
+    add_client_arguments(parser)
+    
+    parser.add_argument(
+        "--since",
+        type=parse_duration,
+        default=30 * DURATION_UNITS["d"],
+        metavar="DURATION",
+        help="Sync days within DURATION of now, e.g. 90d (default: 30d)"
+    )
+    
+    parser.add_argument(
+        "--start",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="First day to sync (overrides --since)"
+    )
+    
+    parser.add_argument(
+        "--end",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="Last day to sync (default: today, UTC)"
+    )
+    
+    parser.add_argument(
+        "--settle",
+        type=parse_duration,
+        default=DURATION_UNITS["d"],
+        metavar="DURATION",
+        help="How long after a day ends its usage may still change (default: 1d)"
+    )
+    
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Fetch every day in the range, ignoring the checkpoint"
+    )
+    
+    parser.add_argument(
+        "--usage-dir",
+        metavar="PATH",
+        help="Usage store directory (default: in the user data directory)"
+    )
+    
+    add_output_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        api_tokens = get_api_tokens(args.token, args.tokens_file)
+        client_options = get_client_options(args)
+        today = datetime.now(timezone.utc).date()
+        end = min(args.end or today, today)
+        start = args.start or (datetime.now(timezone.utc) - timedelta(seconds=args.since)).date()
+        if start > end:
+            raise ValueError(f"--start {start} is after the last day to sync ({end})")
+        
+        from .usage import UsageStore, day_range, sync_usage
+        
+        store = UsageStore(args.usage_dir)
+        fetched = changed = failed = 0
+        for result in sync_usage(
+            store, api_tokens, start, end, max_workers=args.workers, settle=args.settle,
+            full=args.full, account_label=mask_token, **client_options,
+        ):
+            account = mask_token(result.token)
+            if result.error is not None:
+                failed += 1
+                if not args.ndjson:
+                    print(f"{account}  {result.day}  Error: {result.error}", file=sys.stderr, flush=True)
+            else:
+                fetched += 1
+                changed += result.changed
+            if args.ndjson:
+                record = {"account": account, "date": result.day.isoformat()}
+                if result.error is not None:
+                    record["error"] = str(result.error)
+                else:
+                    record.update(records=result.records, changed=result.changed)
+                print_ndjson([record])
+        
+        summary = {
+            "accounts": len(api_tokens),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "fetched": fetched,
+            "changed": changed,
+            "failed": failed,
+            "up_to_date": len(api_tokens) * len(day_range(start, end)) - fetched - failed,
+        }
+        if args.json:
+            print(jsonlib.dumps(summary, pretty=True))
+        elif not args.ndjson:
+            print(
+                f"Synced {summary['accounts']} accounts from {start} to {end}: "
+                f"{fetched} days fetched ({changed} changed), {failed} failed, "
+                f"{summary['up_to_date']} up to date"
+            )
+        if failed:
+            sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def usage_report_command(argv: List[str]) -> None:
+    """Entry point for ``dsbc usage report``."""
+    parser = argparse.ArgumentParser(
+        prog="dsbc usage report",
+        description="Aggregate synced usage: tokens in and out, and cost",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                          # Totals per model over all synced days
+  %(prog)s --by model,day,token --since 7d
+  %(prog)s --by day --model deepseek-chat --ndjson
+
+Groups are always split by currency. Reads the store filled by
+dsbc usage sync. Requires numpy: pip install dsbc[analytics]
+        """
+    )
+    
+    parser.add_argument(
+        "--by",
+        default="model",
+        metavar="DIMENSIONS",
+        help="Comma-separated dimensions to group by: model, day, token (default: model)"
+    )
+    
+    parser.add_argument(
+        "--since",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Only days within DURATION of now, e.g. 30d"
+    )
+    
+    parser.add_argument(
+        "--start",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="First day to include (overrides --since)"
+    )
+    
+    parser.add_argument(
+        "--end",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="Last day to include (default: the last synced day)"
+    )
+    
+    parser.add_argument(
+        "--account", "-a",
+        help="Only this account, as printed by dsbc (masked token) or its fingerprint"
+    )
+    
+    parser.add_argument(
+        "--model", "-m",
+        help="Only this model"
+    )
+    
+    parser.add_argument(
+        "--usage-dir",
+        metavar="PATH",
+        help="Usage store directory (default: in the user data directory)"
+    )
+    
+    add_output_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        from .report import REPORT_DIMENSIONS, usage_report
+        from .usage import UsageStore
+        
+        by = [dimension.strip() for dimension in args.by.split(",") if dimension.strip()]
+        start = args.start
+        if start is None and args.since is not None:
+            start = (datetime.now(timezone.utc) - timedelta(seconds=args.since)).date()
+        rows = usage_report(
+            UsageStore(args.usage_dir), by=by, account=args.account,
+            start=start, end=args.end, model=args.model,
+        )
+        
+        if args.ndjson:
+            print_ndjson(rows)
+        elif args.json:
+            print(jsonlib.dumps(rows, pretty=True))
+        else:
+            print(format_usage_report(rows, [REPORT_DIMENSIONS[dimension] for dimension in dict.fromkeys(by)]))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+# ``dsbc usage`` subcommands
+USAGE_COMMANDS = {
+    "sync": usage_sync_command,
+    "report": usage_report_command,
+}
+
+def usage_command(argv: List[str]) -> None:
+    """Entry point for ``dsbc usage``; dispatches to its subcommands."""
+    if argv and argv[0] in USAGE_COMMANDS:
+        return USAGE_COMMANDS[argv[0]](argv[1:])
+    parser = argparse.ArgumentParser(
+        prog="dsbc usage",
+        description="Local copy of API usage data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Commands:
+  sync                              Fetch new and changing days (see %(prog)s sync --help)
+  report                            Aggregate synced usage (see %(prog)s report --help)
+        """
+    )
+    parser.add_argument("command", choices=sorted(USAGE_COMMANDS), help="Usage command to run")
+    parser.parse_args(argv)
+
+# Subcommands, dispatched on the first argument; anything else is the classic flag interface
+COMMANDS = {
+    "watch": watch_command,
+    "serve-metrics": serve_metrics_command,
+    "history": history_command,
+    "forecast": forecast_command,
+    "usage": usage_command,
+}
+
+def main(argv: Optional[List[str]] = None):
     """Main CLI entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    
     parser = argparse.ArgumentParser(
         description="Check DeepSeek API account balance and available models",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -134,21 +1403,38 @@ def main():
 Examples:
   %(prog)s                          # Use {DEFAULT_ENV_VAR} environment variable
   %(prog)s --token sk-abc123        # Use provided token
+  %(prog)s -t sk-abc -t sk-def      # Check several accounts concurrently
+  %(prog)s --tokens-file keys.txt   # Check every token in a file (- for stdin)
   %(prog)s --models                 # Show available models
+  %(prog)s --models --refresh       # Bypass the models cache
   %(prog)s --verbose                # Show detailed information
   %(prog)s --json                   # Output in JSON format
+  %(prog)s -f keys.txt --ndjson     # One JSON line per account and currency
+  %(prog)s watch --interval 30      # Poll every 30 seconds, print on change
+
+Commands:
+  watch                             Poll balances on a schedule (see %(prog)s watch --help)
+  serve-metrics                     Prometheus exporter (see %(prog)s serve-metrics --help)
+  history                           Balances recorded by watch --history (see %(prog)s history --help)
+  forecast                          Spend rate and depletion date per account (see %(prog)s forecast --help)
+  usage sync                        Incremental local copy of usage data (see %(prog)s usage --help)
+  usage report                      Tokens and cost by model, day or account
 
 Environment Variables:
   {DEFAULT_ENV_VAR}: Default API token
   DEEPSEEK_TOKEN: Alternative token variable
   DEEPSEEK_API_KEY: Alternative token variable
+  DSBC_CACHE_DIR: Directory for cached responses
+  DSBC_DATA_DIR: Directory for the balance history and usage data
+  DSBC_JSON_BACKEND: Set to json to disable orjson
+  DEEPSEEK_API_BASE: API base URL (default: https://api.deepseek.com)
+  DSBC_CONNECT_TIMEOUT: Connect timeout in seconds
+  DSBC_READ_TIMEOUT: Read timeout in seconds
         """
     )
     
-    parser.add_argument(
-        "--token", "-t",
-        help=f"DeepSeek API token (default: from {DEFAULT_ENV_VAR} env var)"
-    )
+    # A single run makes one request per account: a breaker could never open
+    add_client_arguments(parser, circuit_breaker=False)
     
     parser.add_argument(
         "--models", "-m",
@@ -157,17 +1443,27 @@ Environment Variables:
     )
     
     parser.add_argument(
-        "--verbose", "-v",
+        "--refresh", "-r",
         action="store_true",
-        help="Show verbose output including API health check"
+        help="Ignore cached responses and fetch fresh data from the API"
     )
     
     parser.add_argument(
-        "--json", "-j",
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        metavar="SECONDS",
+        help=f"How long cached models stay fresh (default: {DEFAULT_TTL}, 0 disables the cache)"
+    )
+    
+    parser.add_argument(
+        "--verbose", "-v",
         action="store_true",
-        help="Output in JSON format"
+        help="Show verbose output including API health check"
     )
     
+    add_output_arguments(parser)
+    
     parser.add_argument(
         "--health", "-H",
         action="store_true",
@@ -177,48 +1473,77 @@ Environment Variables:
     parser.add_argument(
         "--version",
         action="version",
-        version="deepseek-balance-checker 1.0.0"
+        version=f"deepseek-balance-checker {__version__}"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
-        # Get API token
-        api_token = get_api_token(args.token)
+        # Get API tokens
+        api_tokens = get_api_tokens(args.token, args.tokens_file)
+        client_options = get_client_options(args)
         
-        # Initialize client
-        client = DeepSeekClient(api_token)
+        # Several accounts: fan out balance checks concurrently
+        if len(api_tokens) > 1:
+            if args.models or args.health:
+                raise ValueError("--models and --health accept a single token")
+            failed = check_accounts(api_tokens, args.workers, args.json, args.ndjson, **client_options)
+            sys.exit(1 if failed else 0)
+        api_token = api_tokens[0]
+        
+        # Initialize client; imported here so --help and --version stay fast
+        from .client import DeepSeekClient
+        
+        cache = default_cache() if args.cache_ttl > 0 else None
+        client = DeepSeekClient(api_token, cache=cache, cache_ttl=args.cache_ttl, **client_options)
         
         # Health check
         if args.health:
-            is_healthy = client.check_health()
-            if args.json:
-                print(json.dumps({"healthy": is_healthy}, indent=2))
+            status = client.get_status(timeout=client.health_timeout)
+            is_healthy = status["healthy"]
+            health = {"healthy": is_healthy, "latency_ms": round(status["latency_ms"], 1)}
+            if args.ndjson:
+                print_ndjson([health])
+            elif args.json:
+                print(jsonlib.dumps(health, pretty=True))
             else:
                 print("✅ API is accessible" if is_healthy else "❌ API is not accessible")
             sys.exit(0 if is_healthy else 1)
         
-        # Verbose output
+        # Typed results render faster, but JSON output is the API body as is
+        typed = not (args.json or args.ndjson)
+        
+        # Verbose output: the health verdict comes from the balance request
+        balance_data = None
         if args.verbose:
-            print(f"Using API token: {api_token[:8]}...{api_token[-4:]}")
-            is_healthy = client.check_health()
+            print(f"Using API token: {mask_token(api_token)}")
+            status = client.get_status(typed=typed)
+            is_healthy = status["healthy"]
             print(f"API Health: {'✅ Healthy' if is_healthy else '❌ Unhealthy'}")
+            print(f"API Latency: {status['latency_ms']:.0f} ms")
             if not is_healthy:
                 print("Warning: API may not be accessible", file=sys.stderr)
+                raise Exception(f"Failed to fetch balance: {status['error']}")
+            balance_data = status["balance"]
         
         # Get models if requested
         if args.models:
-            models_data = client.get_models()
-            if args.json:
-                print(json.dumps(models_data, indent=2))
+            models_data = client.get_models(refresh=args.refresh)
+            if args.ndjson:
+                print_ndjson(models_data.get("data", []))
+            elif args.json:
+                print(jsonlib.dumps(models_data, pretty=True))
             else:
                 print(format_models(models_data))
         
         # Always get balance (unless only models requested without balance)
         if not args.models or args.verbose:
-            balance_data = client.get_balance()
-            if args.json:
-                print(json.dumps(balance_data, indent=2))
+            if balance_data is None:
+                balance_data = client.get_balance(typed=typed)
+            if args.ndjson:
+                print_ndjson(balance_records(balance_data, account=mask_token(api_token)))
+            elif args.json:
+                print(jsonlib.dumps(balance_data, pretty=True))
             else:
                 print(format_balance(balance_data))
         
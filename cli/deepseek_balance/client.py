@@ -4,26 +4,142 @@ DeepSeek API Client
 Client for interacting with DeepSeek API for balance checking and model information.
 """
 
+import hashlib
+import time
 import requests
-from typing import Optional, Dict, Any
-from datetime import datetime
-from . import __version__
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, Tuple, Union
+from . import __version__, jsonlib
+from .constants import (
+    DEEPSEEK_API_BASE,
+    BALANCE_PATH,
+    MODELS_PATH,
+    USAGE_PATH,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_HEALTH_TIMEOUT,
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_STREAM_CHUNK_SIZE,
+    Timeout,
+)
+from .cache import CacheBackend, CacheEntry, DEFAULT_TTL
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter
+from .circuit import CircuitBreaker, CircuitBreakers
+from .results import Balance, Model, UsageRecord, parse_list
 
-# DeepSeek API endpoints
-DEEPSEEK_API_BASE = "https://api.deepseek.com"
-BALANCE_ENDPOINT = f"{DEEPSEEK_API_BASE}/user/balance"
-MODELS_ENDPOINT = f"{DEEPSEEK_API_BASE}/models"
+
+def token_fingerprint(api_token: str) -> str:
+    """
+    Return a short, stable identifier for an API token.
+
+    The fingerprint is a truncated SHA-256 digest, so it can be stored in
+    caches and logs without exposing the token.
+    """
+    return hashlib.sha256(api_token.encode("utf-8")).hexdigest()[:16]
+
+
+def decode_json(response: requests.Response) -> Any:
+    """
+    Decode a JSON response body with the configured JSON backend.
+
+    Args:
+        response: Response to decode
+
+    Returns:
+        Decoded body
+
+    Raises:
+        requests.exceptions.RequestException: If the body is not valid JSON
+    """
+    try:
+        return jsonlib.loads(response.content)
+    except ValueError as e:
+        raise requests.exceptions.RequestException(f"Invalid JSON response: {e}", response=response)
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = False,
+    keep_alive: bool = True,
+) -> requests.Session:
+    """
+    Create a pooled HTTP session suitable for sharing between clients.
+
+    Args:
+        pool_connections: Number of per-host connection pools to keep
+        pool_maxsize: Maximum number of connections kept open per host
+        pool_block: Block when the per-host pool is exhausted instead of
+            opening throw-away connections
+        keep_alive: Keep connections open between requests
+
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
 
 
 class DeepSeekClient:
     """Client for interacting with DeepSeek API."""
     
-    def __init__(self, api_token: str):
+    def __init__(
+        self,
+        api_token: str,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        session: Optional[requests.Session] = None,
+        cache: Optional[CacheBackend] = None,
+        cache_ttl: float = DEFAULT_TTL,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[Union[CircuitBreaker, CircuitBreakers]] = None,
+        base_url: str = DEEPSEEK_API_BASE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ):
         """
         Initialize DeepSeek client with API token.
         
         Args:
             api_token: DeepSeek API token
+            pool_connections: Number of per-host connection pools to keep
+            pool_maxsize: Maximum number of connections kept open per host
+            pool_block: Block when the per-host pool is exhausted
+            keep_alive: Keep connections open between requests
+            session: Existing session to share between clients. The caller
+                stays responsible for closing it.
+            cache: Cache backend for slowly changing responses such as the
+                models list (default: no caching)
+            cache_ttl: Seconds a cached response stays fresh
+            retry: Retry policy for connection errors, 429 and 5xx
+                responses (default: RetryPolicy())
+            rate_limiter: Token bucket every request, including retries,
+                waits on (default: unlimited). Share one instance between
+                clients to share a quota.
+            circuit_breaker: Circuit breaker that fails requests fast while
+                the API is down (default: none). Share one instance between
+                clients talking to the same API, or pass
+                :class:`~deepseek_balance.circuit.CircuitBreakers` to give
+                every account its own breaker.
+            base_url: API base URL, e.g. a local mock server
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for the server to respond
         """
         self.api_token = api_token
         self.headers = {
@@ -31,65 +147,341 @@ class DeepSeekClient:
             "Content-Type": "application/json",
             "User-Agent": f"dsbc/{__version__}"
         }
+        self._owns_session = session is None
+        if session is None:
+            session = create_session(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                keep_alive=keep_alive,
+            )
+        self.session = session
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        if isinstance(circuit_breaker, CircuitBreakers):
+            circuit_breaker = circuit_breaker.get(token_fingerprint(api_token))
+        self.circuit_breaker = circuit_breaker
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+    
+    def close(self) -> None:
+        """Close pooled connections owned by this client."""
+        if self._owns_session:
+            self.session.close()
+    
+    def __enter__(self) -> "DeepSeekClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """Default (connect, read) timeout for requests."""
+        return (self.connect_timeout, self.read_timeout)
+    
+    @property
+    def health_timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout for health checks, read capped at 5 seconds."""
+        return (self.connect_timeout, min(self.read_timeout, DEFAULT_HEALTH_TIMEOUT))
+    
+    def url(self, path: str) -> str:
+        """Return the absolute URL of an API path."""
+        return f"{self.base_url}{path}"
+    
+    @property
+    def circuit_state(self) -> Optional[str]:
+        """State of the circuit breaker, or None if none is configured."""
+        if self.circuit_breaker is None:
+            return None
+        return self.circuit_breaker.state
+    
+    def _get(
+        self,
+        url: str,
+        timeout: Optional[Timeout] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        Issue a GET request through the shared connection pool.
+        
+        ``timeout`` defaults to the client's (connect, read) timeouts. With
+        ``stream``, the body is left unread on the socket and the caller
+        must close the response.
+        Connection errors, timeouts and retryable statuses are retried
+        according to the retry policy. The response of the last attempt is
+        returned even if its status is retryable, so callers can report it.
+        
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            requests.exceptions.Timeout: If the retry deadline is exhausted
+            requests.exceptions.RequestException: If the last attempt fails
+        """
+        if headers:
+            headers = {**self.headers, **headers}
+        else:
+            headers = self.headers
+        if timeout is None:
+            timeout = self.timeout
+        # Only streaming calls pass the flag, so minimal session stand-ins keep working
+        extra = {"stream": True} if stream else {}
+        policy = self.retry
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            attempt_timeout = timeout
+            if policy.deadline is not None:
+                remaining = policy.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise requests.exceptions.Timeout(
+                        f"Retry deadline of {policy.deadline}s exceeded for {url}"
+                    )
+                attempt_timeout = _cap_timeout(timeout, remaining)
+            breaker = self.circuit_breaker
+            if breaker is not None:
+                breaker.before_request()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            retry_after = None
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=attempt_timeout, **extra)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt >= policy.max_attempts:
+                    raise
+            else:
+                if breaker is not None:
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if attempt >= policy.max_attempts or not policy.should_retry_status(response.status_code):
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+            delay = policy.delay(attempt, retry_after)
+            if policy.deadline is not None and time.monotonic() - started + delay >= policy.deadline:
+                raise requests.exceptions.Timeout(
+                    f"Retry deadline of {policy.deadline}s exceeded for {url}"
+                )
+            time.sleep(delay)
     
-    def get_balance(self) -> Dict[str, Any]:
+    def _cached_get(
+        self,
+        url: str,
+        ttl: float,
+        refresh: bool,
+        parse: Optional[Callable[[Any], Any]] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> Any:
+        """
+        GET a JSON resource through the cache.
+        
+        Fresh entries are returned without a request. Stale entries carrying
+        an ETag or Last-Modified validator are revalidated with a conditional
+        request, and a ``304 Not Modified`` answer reuses the cached body.
+        The cache holds the decoded JSON; ``parse`` is applied on the way
+        out, so plain and typed callers share an entry.
+        
+        Args:
+            url: Resource URL
+            ttl: Seconds a response stays fresh (0 = always revalidate)
+            refresh: Skip the freshness check and always ask the server
+            parse: Turns the decoded body into the result (default: return
+                the decoded body itself)
+            timeout: Request timeout override
+        
+        Returns:
+            Parsed response body
+        
+        Raises:
+            requests.exceptions.RequestException: If API request fails
+            ValueError: If the body is not JSON or ``parse`` rejects it
+        """
+        body = self._cached_body(url, ttl, refresh, timeout)
+        return body if parse is None else parse(body)
+    
+    def _cached_body(self, url: str, ttl: float, refresh: bool, timeout: Optional[Timeout]) -> Any:
+        """Fetch the decoded JSON body for :meth:`_cached_get`."""
+        if self.cache is None:
+            response = self._get(url, timeout=timeout)
+            response.raise_for_status()
+            return decode_json(response)
+        
+        cache_key = f"{url}|{token_fingerprint(self.api_token)}"
+        entry = self.cache.get(cache_key)
+        if entry is not None and not refresh and entry.is_fresh():
+            return entry.body
+        
+        conditional = entry.conditional_headers() if entry is not None else None
+        response = self._get(url, timeout=timeout, headers=conditional)
+        if response.status_code == 304 and entry is not None:
+            body = entry.body
+        else:
+            response.raise_for_status()
+            body = decode_json(response)
+        
+        etag = response.headers.get("ETag") or (entry.etag if response.status_code == 304 else None)
+        last_modified = response.headers.get("Last-Modified") or (
+            entry.last_modified if response.status_code == 304 else None
+        )
+        if ttl > 0 or etag or last_modified:
+            self.cache.set(cache_key, CacheEntry(body, ttl, etag=etag, last_modified=last_modified))
+        return body
+    
+    def get_balance(self, timeout: Optional[Timeout] = None, typed: bool = False) -> Dict[str, Any]:
         """
         Get account balance information.
         
+        Balances are never served from the cache without asking the API, but
+        when a cache is configured and the API sends validators, an unchanged
+        balance is answered with ``304 Not Modified`` and not re-downloaded.
+        
+        Args:
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call
+            typed: Return a :class:`~deepseek_balance.results.Balance`
+                instead of the response dict
+        
         Returns:
-            Dictionary with balance information
+            Dictionary with balance information, or a ``Balance``
             
         Raises:
-            requests.exceptions.RequestException: If API request fails
+            Exception: "Failed to fetch balance: ..." if the request fails
+            CircuitOpenError: If the circuit breaker is open; raised as is,
+                without a request
         """
         try:
-            response = requests.get(BALANCE_ENDPOINT, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._cached_get(
+                self.url(BALANCE_PATH), ttl=0, refresh=True,
+                parse=Balance.from_dict if typed else None, timeout=timeout,
+            )
+        except (requests.exceptions.RequestException, ValueError) as e:
             raise Exception(f"Failed to fetch balance: {e}")
     
-    def get_models(self) -> Dict[str, Any]:
+    def get_models(
+        self, refresh: bool = False, timeout: Optional[Timeout] = None, typed: bool = False
+    ) -> Dict[str, Any]:
         """
         Get available models and their pricing.
         
+        When a cache is configured, a fresh cached response is returned
+        without a network request, and a stale one is revalidated with a
+        conditional request.
+        
+        Args:
+            refresh: Bypass the cache freshness check and ask the API
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call
+            typed: Hold :class:`~deepseek_balance.results.Model` entries
+                in ``data`` instead of dicts
+        
         Returns:
             Dictionary with models information
             
         Raises:
-            requests.exceptions.RequestException: If API request fails
+            Exception: "Failed to fetch models: ..." if the request fails
+            CircuitOpenError: If the circuit breaker is open; raised as is,
+                without a request
         """
         try:
-            response = requests.get(MODELS_ENDPOINT, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._cached_get(
+                self.url(MODELS_PATH), ttl=self.cache_ttl, refresh=refresh,
+                parse=(lambda data: parse_list(data, Model)) if typed else None, timeout=timeout,
+            )
+        except (requests.exceptions.RequestException, ValueError) as e:
             raise Exception(f"Failed to fetch models: {e}")
     
-    def check_health(self) -> bool:
+    def get_status(self, timeout: Optional[Timeout] = None, typed: bool = False) -> Dict[str, Any]:
+        """
+        Check API health and fetch the balance with a single request.
+        
+        Args:
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call
+            typed: Return the balance as a
+                :class:`~deepseek_balance.results.Balance`
+        
+        Returns:
+            Dictionary with ``healthy`` (bool), ``status_code`` (int or None),
+            ``latency_ms`` (float), ``balance`` (dict, ``Balance`` or None),
+            ``error`` (str or None) and ``circuit`` (circuit breaker state
+            or None)
+        """
+        status: Dict[str, Any] = {
+            "healthy": False,
+            "status_code": None,
+            "latency_ms": 0.0,
+            "balance": None,
+            "error": None,
+            "circuit": None,
+        }
+        start = time.perf_counter()
+        try:
+            response = self._get(self.url(BALANCE_PATH), timeout=timeout)
+            status["latency_ms"] = (time.perf_counter() - start) * 1000
+            status["status_code"] = response.status_code
+            if response.status_code != 200:
+                status["error"] = f"HTTP {response.status_code}"
+            else:
+                balance = decode_json(response)
+                status["balance"] = Balance.from_dict(balance) if typed else balance
+                status["healthy"] = True
+        except Exception as e:
+            if not status["latency_ms"]:
+                status["latency_ms"] = (time.perf_counter() - start) * 1000
+            status["error"] = str(e) or type(e).__name__
+        status["circuit"] = self.circuit_state
+        return status
+    
+    def check_health(self, timeout: Optional[Timeout] = None) -> bool:
         """
         Check if API token is valid and API is accessible.
         
+        Args:
+            timeout: Timeout override (default: the client's timeouts, with
+                the read timeout capped at 5 seconds)
+        
         Returns:
             True if API is accessible, False otherwise
         """
-        try:
-            response = requests.get(BALANCE_ENDPOINT, headers=self.headers, timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+        if timeout is None:
+            timeout = self.health_timeout
+        return self.get_status(timeout=timeout)["healthy"]
     
-    def get_usage(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+    def get_usage(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        timeout: Optional[Timeout] = None,
+        typed: bool = False,
+    ) -> Dict[str, Any]:
         """
         Get usage statistics for a date range.
         
         Args:
             start_date: Start date in YYYY-MM-DD format
             end_date: End date in YYYY-MM-DD format
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call
+            typed: Hold :class:`~deepseek_balance.results.UsageRecord`
+                entries in ``data`` instead of dicts
             
         Returns:
             Dictionary with usage statistics
             
+        Raises:
+            Exception: "Failed to fetch usage: ..." if the request fails
+            CircuitOpenError: If the circuit breaker is open; raised as is,
+                without a request
+            
         Note: This endpoint may not be available in all DeepSeek API versions
         """
         params = {}
@@ -101,13 +493,126 @@ class DeepSeekClient:
         try:
             # Note: This endpoint might be different or not available
             # Adjust based on actual DeepSeek API documentation
-            response = requests.get(
-                f"{DEEPSEEK_API_BASE}/usage",
-                headers=self.headers,
+            response = self._get(
+                self.url(USAGE_PATH),
                 params=params,
-                timeout=10
+                timeout=timeout
             )
             response.raise_for_status()
-            return response.json()
+            usage = decode_json(response)
+            return parse_list(usage, UsageRecord) if typed else usage
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise Exception(f"Failed to fetch usage: {e}")
+    
+    def iter_usage(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        timeout: Optional[Timeout] = None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+        typed: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream usage records for a date range, one at a time.
+        
+        Unlike :meth:`get_usage`, the response body is never held in memory
+        as a whole: records are decoded from the socket as they arrive, so
+        memory stays flat however long the range is. The request is sent
+        when iteration starts; stop early or close the generator to release
+        the connection.
+        
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            timeout: Seconds, or (connect, read) seconds, overriding the
+                client's timeouts for this call; the read timeout applies
+                to every chunk
+            chunk_size: Bytes read from the socket at a time
+            typed: Yield :class:`~deepseek_balance.results.UsageRecord`
+                objects instead of dicts
+            
+        Yields:
+            Each entry of the response's ``data`` list
+            
+        Raises:
+            Exception: If the request fails or the body is not valid JSON,
+                possibly after some records were yielded
+            CircuitOpenError: If the circuit breaker is open; raised as is,
+                without a request
+        """
+        params = {}
+        if start_date:
+            params["start_date"] = start_date
+        if end_date:
+            params["end_date"] = end_date
+        
+        try:
+            response = self._get(self.url(USAGE_PATH), params=params, timeout=timeout, stream=True)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to fetch usage: {e}")
+        try:
+            response.raise_for_status()
+            items = jsonlib.iter_array(response.iter_content(chunk_size), key="data")
+            for item in items:
+                yield UsageRecord.from_dict(item) if typed else item
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to fetch usage: {e}")
\ No newline at end of file
+            raise Exception(f"Failed to fetch usage: {e}")
+        except ValueError as e:
+            raise Exception(f"Failed to fetch usage: Invalid JSON response: {e}")
+        finally:
+            response.close()
+
+
+def _cap_timeout(timeout: Timeout, limit: float) -> Timeout:
+    """Cap a timeout, or each part of a (connect, read) timeout, at limit."""
+    if isinstance(timeout, tuple):
+        return (min(timeout[0], limit), min(timeout[1], limit))
+    return min(timeout, limit)
+
+
+def fetch_balances(
+    tokens: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    session: Optional[requests.Session] = None,
+    **client_options: Any,
+) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    Fetch balances for many API tokens concurrently.
+
+    Results are yielded as soon as each request finishes, so the order does
+    not follow the input order. All requests share one connection pool sized
+    to the worker count.
+
+    Args:
+        tokens: API tokens to check
+        max_workers: Maximum number of requests in flight at once
+        session: Existing session to use instead of a private pool
+        **client_options: Extra DeepSeekClient options, e.g. ``retry`` or
+            ``base_url``
+
+    Yields:
+        Tuples of (token, balance data or None, error or None)
+    """
+    owns_session = session is None
+    if session is None:
+        session = create_session(pool_maxsize=max_workers)
+
+    def fetch(token: str) -> Dict[str, Any]:
+        return DeepSeekClient(token, session=session, **client_options).get_balance()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, token): token for token in tokens}
+            try:
+                for future in as_completed(futures):
+                    token = futures[future]
+                    try:
+                        yield token, future.result(), None
+                    except Exception as e:
+                        yield token, None, e
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        if owns_session:
+            session.close()
\ No newline at end of file
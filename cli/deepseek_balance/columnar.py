@@ -0,0 +1,281 @@
+"""
+Columnar Files
+
+Minimal on-disk columnar format for record lists. A dataset directory holds
+named partitions; each partition stores one little-endian typed-array file
+per column, and one JSON manifest describes every partition's row count and
+column types. Integers become ``int64``, other numbers ``float64``, decimal
+strings can be stored exactly as scaled ``int64`` (more precise ones are
+rejected rather than rounded), and anything else is
+dictionary-encoded as ``uint32`` codes. Missing numbers are stored as zeros
+and listed in the column's ``nulls``, so numeric columns stay numeric. Readers load only the columns they
+need, memory-mapping large files with NumPy when it is installed.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import jsonlib
+
+MANIFEST_NAME = "_manifest.json"
+FORMAT_VERSION = 1
+COLUMN_SUFFIX = ".bin"
+# Column files at least this large are memory-mapped; smaller ones are read,
+# which is cheaper than setting up a mapping
+MMAP_THRESHOLD = 1 << 16
+
+# Column type: (array typecode, NumPy dtype)
+COLUMN_TYPES = {
+    "int64": ("q", "<i8"),
+    "float64": ("d", "<f8"),
+    "uint32": ("I", "<u4"),
+}
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def require_numpy(purpose: str = "columnar reports") -> Any:
+    """Import NumPy, with an install hint naming ``purpose`` when it is missing."""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            f"numpy is required for {purpose}. "
+            "Install it with: pip install dsbc[analytics]"
+        )
+    return numpy
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def dictionary_key(value: Any) -> Any:
+    """Hashable lookup key of a dictionary-encoded value."""
+    # Lists and objects are not hashable; look them up by their JSON text
+    return jsonlib.dumps(value) if isinstance(value, (dict, list)) else (type(value), value)
+
+
+class _NotDecimal(Exception):
+    """A value of a scaled column is not a finite decimal number."""
+
+
+def _scaled(value: Any, scale: int) -> int:
+    """Exact multiple of ``10 ** -scale`` for a decimal value of a scaled column."""
+    try:
+        scaled = Decimal(str(value)).scaleb(scale)
+        units = int(scaled.to_integral_value())
+    except (ArithmeticError, ValueError):
+        raise _NotDecimal
+    if units != scaled and not isinstance(value, float):
+        raise ValueError(f"Invalid amount {value!r}: more than {scale} decimal places")
+    return units
+
+
+def encode_column(values: Sequence[Any], scale: Optional[int] = None) -> Tuple[Dict[str, Any], array]:
+    """
+    Encode one column of values as a typed array.
+
+    Numeric columns store a missing value (None) as zero and list its row
+    in the spec's ``nulls``. Integer and float values mixed in one column
+    are stored as ``float64``.
+
+    Args:
+        values: Column values, one per row (None for a missing value)
+        scale: Store numbers as ``int64`` multiples of ``10 ** -scale``,
+            parsed exactly from decimal strings, e.g. 6 for micro-units
+
+    Returns:
+        Tuple of (column spec for the manifest, typed array)
+
+    Raises:
+        ValueError: If a decimal string in a scaled column has more than
+            ``scale`` decimal places, as :func:`~deepseek_balance.results.parse_amount`
+            rejects it; floats are rounded
+    """
+    nulls = [row for row, value in enumerate(values) if value is None]
+    present = [value for value in values if value is not None] if nulls else values
+    spec: Dict[str, Any] = {"nulls": nulls} if nulls else {}
+    if scale is not None:
+        try:
+            data = array("q", (_scaled(v, scale) if v is not None else 0 for v in values))
+            return {"type": "int64", "scale": scale, **spec}, data
+        except _NotDecimal:
+            pass  # not decimal numbers after all: store the values as they are
+    if present and all(_is_int(v) for v in present):
+        return {"type": "int64", **spec}, array("q", (0 if v is None else v for v in values))
+    if present and all(_is_int(v) or isinstance(v, float) for v in present):
+        return {"type": "float64", **spec}, array("d", (0.0 if v is None else v for v in values))
+
+    codes: Dict[Any, int] = {}
+    dictionary: List[Any] = []
+    data = array("I")
+    for value in values:
+        key = dictionary_key(value)
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(dictionary)
+            dictionary.append(value)
+        data.append(code)
+    return {"type": "uint32", "dictionary": dictionary}, data
+
+
+def decode_column(spec: Dict[str, Any], data: Sequence[Any]) -> List[Any]:
+    """
+    Turn a stored column back into Python values.
+
+    Scaled columns become exact decimal strings, dictionary columns their
+    original values, and rows listed in ``nulls`` None.
+    """
+    if "dictionary" in spec:
+        dictionary = spec["dictionary"]
+        return [dictionary[code] for code in data]
+    scale = spec.get("scale")
+    if scale is not None:
+        values: List[Any] = [format(Decimal(int(v)).scaleb(-scale), "f") for v in data]
+    elif spec["type"] == "int64":
+        values = [int(v) for v in data]
+    else:
+        values = [float(v) for v in data]
+    for row in spec.get("nulls", ()):
+        values[row] = None
+    return values
+
+
+def encode_records(
+    records: Sequence[Dict[str, Any]],
+    exclude: Iterable[str] = (),
+    scales: Optional[Dict[str, int]] = None,
+) -> Dict[str, Tuple[Dict[str, Any], array]]:
+    """
+    Split records into encoded columns, in first-seen field order.
+
+    Args:
+        records: Flat records
+        exclude: Fields not to store, e.g. partition keys
+        scales: Fields stored as scaled integers, see :func:`encode_column`
+
+    Returns:
+        Map of field name to (column spec, typed array)
+    """
+    skip = set(exclude)
+    names = [name for name in dict.fromkeys(key for record in records for key in record) if name not in skip]
+    scales = scales or {}
+    return {
+        name: encode_column([record.get(name) for record in records], scales.get(name))
+        for name in names
+    }
+
+
+def write_dataset(
+    directory: str,
+    partitions: Dict[str, Sequence[Dict[str, Any]]],
+    exclude: Iterable[str] = (),
+    scales: Optional[Dict[str, int]] = None,
+) -> None:
+    """
+    Write named partitions of records as a columnar dataset.
+
+    The dataset is built next to ``directory`` and swapped in with renames,
+    so readers never see a half-written dataset; between the two renames
+    the directory is briefly missing. Any previous dataset at ``directory``
+    is replaced.
+
+    Args:
+        directory: Dataset directory
+        partitions: Map of partition name (a safe directory name) to records
+        exclude: Fields not to store, e.g. values implied by the partition
+        scales: Fields stored as scaled integers, see :func:`encode_column`
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, mode=0o700, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        manifest: Dict[str, Any] = {"version": FORMAT_VERSION, "partitions": {}}
+        for name, records in partitions.items():
+            os.mkdir(os.path.join(staging, name))
+            columns = {}
+            for column, (spec, data) in encode_records(records, exclude, scales).items():
+                if _BIG_ENDIAN:
+                    data.byteswap()
+                with open(os.path.join(staging, name, column + COLUMN_SUFFIX), "wb") as f:
+                    data.tofile(f)
+                columns[column] = spec
+            manifest["partitions"][name] = {"rows": len(records), "columns": columns}
+        with open(os.path.join(staging, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            f.write(jsonlib.dumps(manifest))
+
+        # Directories cannot be replaced atomically: move the old one aside first
+        retired = None
+        if os.path.exists(directory):
+            retired = tempfile.mkdtemp(dir=parent, prefix=".old-")
+            os.rename(directory, os.path.join(retired, "dataset"))
+        os.rename(staging, directory)
+        if retired is not None:
+            shutil.rmtree(retired, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    """Manifest of a dataset, or None when there is none."""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), "rb") as f:
+            manifest = jsonlib.loads(f.read())
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar format version in {directory}")
+    return manifest
+
+
+def load_column(directory: str, partition: str, column: str, spec: Dict[str, Any], rows: int) -> Any:
+    """
+    Load the raw typed values of one column.
+
+    With NumPy installed, returns a read-only array, memory-mapped when the
+    file is large; otherwise an :class:`array.array`.
+
+    Args:
+        directory: Dataset directory
+        partition: Partition name
+        column: Column name
+        spec: Column spec from the manifest
+        rows: Row count from the manifest
+
+    Returns:
+        Array of ``rows`` values
+    """
+    typecode, dtype = COLUMN_TYPES[spec["type"]]
+    path = os.path.join(directory, partition, column + COLUMN_SUFFIX)
+    try:
+        import numpy as np
+    except ImportError:
+        data = array(typecode)
+        with open(path, "rb") as f:
+            data.fromfile(f, rows)
+        if _BIG_ENDIAN:
+            data.byteswap()
+        return data
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    if rows * np.dtype(dtype).itemsize >= MMAP_THRESHOLD:
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+    return np.fromfile(path, dtype=dtype, count=rows)
+
+
+def read_partition(directory: str, partition: str, manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rebuild the records of one partition."""
+    info = manifest["partitions"][partition]
+    rows = info["rows"]
+    columns = {
+        name: decode_column(spec, load_column(directory, partition, name, spec, rows))
+        for name, spec in info["columns"].items()
+    }
+    return [{name: values[row] for name, values in columns.items()} for row in range(rows)]
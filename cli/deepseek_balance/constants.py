@@ -0,0 +1,46 @@
+"""
+DeepSeek API Constants
+
+Endpoints and connection defaults shared by the clients and the CLI. This
+module has no third-party imports, so the CLI can build its argument parser
+without loading the HTTP stack.
+"""
+
+from typing import Tuple, Union
+
+# A timeout is either one value for connect and read, or a (connect, read) pair
+Timeout = Union[float, Tuple[float, float]]
+
+# DeepSeek API endpoints
+DEEPSEEK_API_BASE = "https://api.deepseek.com"
+BALANCE_PATH = "/user/balance"
+MODELS_PATH = "/models"
+USAGE_PATH = "/usage"
+BALANCE_ENDPOINT = f"{DEEPSEEK_API_BASE}{BALANCE_PATH}"
+MODELS_ENDPOINT = f"{DEEPSEEK_API_BASE}{MODELS_PATH}"
+
+# Request timeout defaults, in seconds
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_HEALTH_TIMEOUT = 5.0
+
+# Bytes read from the socket at a time by streaming calls
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Connection pool defaults
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# Default number of concurrent workers for multi-account fan-out
+DEFAULT_MAX_WORKERS = 16
+
+
+# Default seconds between polls in watch mode
+DEFAULT_WATCH_INTERVAL = 60.0
+
+# Prometheus exporter defaults
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9877
+
+# Alerts buffered per sink before new ones are dropped
+DEFAULT_ALERT_QUEUE_SIZE = 100
\ No newline at end of file
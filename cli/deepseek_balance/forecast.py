@@ -0,0 +1,169 @@
+"""
+Balance Forecasting
+
+Estimates the spend rate of every account and currency from the recorded
+balance history with a least-squares fit over a trailing window, and
+projects when ``total_balance`` reaches zero. All series are fitted at once
+with vectorized NumPy operations. Requires the optional ``numpy``
+dependency (``pip install dsbc[analytics]``).
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from .columnar import require_numpy
+from .history import HistoryStore
+
+# Forecast defaults
+DEFAULT_WINDOW = 7 * 86400
+SECONDS_PER_DAY = 86400
+
+
+def compute_forecasts(groups: Any, timestamps: Any, totals: Any, n_groups: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Fit the spend rate of many balance series at once.
+
+    Top-ups (increases between consecutive samples) are removed before the
+    fit, so a recharge does not read as negative spending; spending within
+    the same sampling interval as a recharge is not visible. The slope of a
+    least-squares line through each remaining series is its spend rate.
+
+    Args:
+        groups: Series index of every sample, ``0 .. n_groups - 1``
+        timestamps: Unix time of every sample
+        totals: Total balance of every sample
+        n_groups: Number of series (default: ``max(groups) + 1``)
+
+    Note:
+        Samples must be sorted by series, then time.
+
+    Returns:
+        Dictionary of per-series arrays: ``samples``, ``balance`` (latest
+        total), ``last_timestamp``, ``rate`` (spend per second, positive when
+        spending), ``r2`` (fit quality, NaN when undefined) and
+        ``depletes_at`` (Unix time, NaN when the balance is not falling)
+    """
+    np = require_numpy("forecasting")
+    groups = np.asarray(groups, dtype=np.intp)
+    t = np.asarray(timestamps, dtype=np.float64)
+    y = np.asarray(totals, dtype=np.float64)
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if groups.size else 0
+    counts = np.zeros(n_groups, dtype=np.intp)
+    balance = np.full(n_groups, np.nan)
+    last_timestamp = np.full(n_groups, np.nan)
+    s_t, s_y, s_tt, s_ty, s_yy = (np.zeros(n_groups) for _ in range(5))
+
+    if groups.size:
+        # Series are contiguous, so segment reductions replace scattered sums
+        boundary = np.empty(groups.size, dtype=bool)
+        boundary[0] = True
+        np.not_equal(groups[1:], groups[:-1], out=boundary[1:])
+        starts = np.flatnonzero(boundary)
+        lengths = np.diff(np.append(starts, groups.size))
+        present = groups[starts]
+        ends = starts + lengths - 1
+        counts[present] = lengths
+        balance[present] = y[ends]
+        last_timestamp[present] = t[ends]
+
+        # Undo top-ups: subtract the running sum of increases within each series
+        spent = np.empty_like(y)
+        spent[0] = 0.0
+        np.subtract(y[1:], y[:-1], out=spent[1:])
+        np.maximum(spent, 0.0, out=spent)
+        spent[starts] = 0.0
+        np.cumsum(spent, out=spent)
+        spent -= np.repeat(spent[starts], lengths)
+        np.subtract(y, spent, out=spent)
+
+        # Least-squares sums, with time relative to each series start
+        dt = t - np.repeat(t[starts], lengths)
+        s_t[present] = np.add.reduceat(dt, starts)
+        s_y[present] = np.add.reduceat(spent, starts)
+        s_ty[present] = np.add.reduceat(dt * spent, starts)
+        np.multiply(spent, spent, out=spent)
+        s_yy[present] = np.add.reduceat(spent, starts)
+        np.multiply(dt, dt, out=dt)
+        s_tt[present] = np.add.reduceat(dt, starts)
+
+    n = counts.astype(np.float64)
+    var_t = n * s_tt - s_t * s_t
+    var_y = n * s_yy - s_y * s_y
+    cov = n * s_ty - s_t * s_y
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(var_t > 0, -cov / var_t, np.nan)
+        r2 = np.where((var_t > 0) & (var_y > 0), cov * cov / (var_t * var_y), np.nan)
+        depletes_at = np.where(rate > 0, last_timestamp + np.maximum(balance, 0.0) / rate, np.nan)
+
+    return {
+        "samples": counts,
+        "balance": balance,
+        "last_timestamp": last_timestamp,
+        "rate": rate,
+        "r2": r2,
+        "depletes_at": depletes_at,
+    }
+
+
+def forecast(
+    store: HistoryStore,
+    window: float = DEFAULT_WINDOW,
+    account: Optional[str] = None,
+    currency: Optional[str] = None,
+    now: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Project when each recorded account runs out of balance.
+
+    Fits the hourly closing balances of the last ``window`` seconds, read
+    from the store's rollup table, so a history of minute-level samples costs
+    no more than its hourly closes.
+
+    Args:
+        store: History to read
+        window: Trailing fit window, in seconds
+        account: Only this account identifier or label
+        currency: Only this currency
+        now: End of the window (default: now)
+
+    Returns:
+        One dictionary per account and currency with ``account``, ``label``,
+        ``currency``, ``samples``, ``balance``, ``burn_rate_per_day``, ``r2``,
+        ``depletes_at`` (Unix time or None) and ``days_left`` (or None)
+    """
+    np = require_numpy("forecasting")
+    if window <= 0:
+        raise ValueError("window must be positive")
+    if now is None:
+        now = time.time()
+    series, timestamps, totals = store.close_columns(account, currency, start=now - window, end=now)
+    labels = store.accounts()
+
+    lengths = np.fromiter((count for _, _, count in series), dtype=np.intp, count=len(series))
+    groups = np.repeat(np.arange(len(series)), lengths)
+    fits = compute_forecasts(
+        groups,
+        np.asarray(timestamps, dtype=np.float64),
+        np.asarray(totals, dtype=np.float64),
+        len(series),
+    )
+
+    results = []
+    for i, (account_id, series_currency, _) in enumerate(series):
+        rate = fits["rate"][i]
+        depletes_at = fits["depletes_at"][i]
+        r2 = fits["r2"][i]
+        results.append({
+            "account": account_id,
+            "label": labels.get(account_id, account_id),
+            "currency": series_currency,
+            "samples": int(fits["samples"][i]),
+            "balance": float(fits["balance"][i]),
+            "burn_rate_per_day": None if np.isnan(rate) else float(rate * SECONDS_PER_DAY),
+            "r2": None if np.isnan(r2) else float(r2),
+            "depletes_at": None if np.isnan(depletes_at) else float(depletes_at),
+            "days_left": None if np.isnan(depletes_at) else max(0.0, float(depletes_at - now) / SECONDS_PER_DAY),
+        })
+    return results
@@ -0,0 +1,438 @@
+"""
+Balance History
+
+Append-only local store for polled balances, backed by SQLite in WAL mode.
+Each poll is stored as one row per account and currency, clustered by
+``(account, currency, timestamp)`` so range queries for one account read a
+contiguous slice of the table. The closing balance of every hour is kept in
+a rollup table updated on write, so long-range downsampling and forecasting
+never scan the raw samples. Supports age-based retention.
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from itertools import chain
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# History defaults
+DATA_DIR_ENV_VAR = "DSBC_DATA_DIR"
+HISTORY_FILENAME = "history.sqlite3"
+# Minimum seconds between two retention sweeps while recording
+PRUNE_INTERVAL = 3600
+# Width of the closing-balance rollup buckets, in seconds
+ROLLUP_BUCKET = 3600
+# Stored in PRAGMA user_version, so later schema changes can tell databases apart
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account TEXT PRIMARY KEY,
+    label TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    account TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    total REAL NOT NULL,
+    granted REAL NOT NULL,
+    topped_up REAL NOT NULL,
+    available INTEGER NOT NULL,
+    PRIMARY KEY (account, currency, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS closes (
+    account TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    total REAL NOT NULL,
+    granted REAL NOT NULL,
+    topped_up REAL NOT NULL,
+    available INTEGER NOT NULL,
+    PRIMARY KEY (account, currency, bucket)
+) WITHOUT ROWID;
+"""
+
+# Keep the latest sample of each rollup bucket
+_UPSERT_CLOSE = f"""
+INSERT INTO closes VALUES (?1, ?2, (?3 / {ROLLUP_BUCKET}) * {ROLLUP_BUCKET}, ?3, ?4, ?5, ?6, ?7)
+ON CONFLICT (account, currency, bucket) DO UPDATE SET
+    ts = excluded.ts, total = excluded.total, granted = excluded.granted,
+    topped_up = excluded.topped_up, available = excluded.available
+WHERE excluded.ts > closes.ts
+"""
+
+
+class Sample(NamedTuple):
+    """One recorded balance of one account in one currency."""
+
+    account: str
+    currency: str
+    timestamp: int
+    total: float
+    granted: float
+    topped_up: float
+    available: bool
+
+
+def user_data_dir() -> str:
+    """
+    Return the per-user data directory for dsbc.
+
+    ``DSBC_DATA_DIR`` overrides the platform default.
+
+    Returns:
+        Absolute path of the data directory (not created)
+    """
+    override = os.getenv(DATA_DIR_ENV_VAR)
+    if override:
+        return os.path.abspath(os.path.expanduser(override))
+    if sys.platform == "win32":
+        base = os.getenv("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "dsbc", "Data")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/dsbc")
+    base = os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "dsbc")
+
+
+def default_history_path() -> str:
+    """Path of the default history database."""
+    return os.path.join(user_data_dir(), HISTORY_FILENAME)
+
+
+def balance_rows(
+    account: str, balance_data: Dict[str, Any], timestamp: float
+) -> List[Tuple[str, str, int, float, float, float, int]]:
+    """
+    Turn a ``get_balance`` payload into sample rows, one per currency.
+
+    Args:
+        account: Account identifier
+        balance_data: Raw balance data from API
+        timestamp: Unix time of the poll
+
+    Returns:
+        Rows ready for insertion
+    """
+    available = 1 if balance_data.get("is_available", True) else 0
+    return [
+        (
+            account,
+            info.get("currency", "USD"),
+            int(timestamp),
+            float(info.get("total_balance", 0)),
+            float(info.get("granted_balance", 0)),
+            float(info.get("topped_up_balance", 0)),
+            available,
+        )
+        for info in balance_data.get("balance_infos", [])
+    ]
+
+
+class HistoryStore:
+    """
+    SQLite-backed balance history.
+
+    Timestamps are whole Unix seconds; recording the same account, currency
+    and second twice keeps the first sample. The store can be shared between
+    threads.
+
+    Example::
+
+        with HistoryStore() as store:
+            store.record("team-a", client.get_balance())
+            hourly = store.downsample(3600, start=time.time() - 86400)
+    """
+
+    def __init__(self, path: Optional[str] = None, retention: Optional[float] = None):
+        """
+        Open or create a history database.
+
+        Args:
+            path: Database file (default: ``history.sqlite3`` in the user data
+                directory), or ``:memory:``
+            retention: Drop samples older than this many seconds while
+                recording (default: keep everything)
+
+        Raises:
+            ValueError: If retention is not positive
+        """
+        if retention is not None and retention <= 0:
+            raise ValueError("retention must be positive")
+        self.path = path or default_history_path()
+        self.retention = retention
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def record(
+        self,
+        account: str,
+        balance_data: Dict[str, Any],
+        timestamp: Optional[float] = None,
+        label: Optional[str] = None,
+    ) -> int:
+        """
+        Append one poll of one account.
+
+        Args:
+            account: Stable account identifier, e.g. a token fingerprint
+            balance_data: Raw balance data from API
+            timestamp: Unix time of the poll (default: now)
+            label: Human-readable account name for listings
+
+        Returns:
+            Number of samples written
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        return self.record_many([(account, balance_data, timestamp, label)])
+
+    def record_many(
+        self, polls: Iterable[Tuple[str, Dict[str, Any], float, Optional[str]]]
+    ) -> int:
+        """
+        Append many polls in a single transaction.
+
+        Args:
+            polls: Tuples of (account, balance data, Unix time, label or None)
+
+        Returns:
+            Number of samples written
+        """
+        rows = []
+        labels = []
+        unlabelled = []
+        for account, balance_data, timestamp, label in polls:
+            rows.extend(balance_rows(account, balance_data, timestamp))
+            if label:
+                labels.append((account, label))
+            else:
+                unlabelled.append((account, account))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO accounts (account, label) VALUES (?, ?) "
+                "ON CONFLICT (account) DO UPDATE SET label = excluded.label",
+                labels,
+            )
+            self._conn.executemany("INSERT OR IGNORE INTO accounts (account, label) VALUES (?, ?)", unlabelled)
+            written = self._conn.executemany(
+                "INSERT OR IGNORE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            ).rowcount
+            self._conn.executemany(_UPSERT_CLOSE, rows)
+        if self.retention is not None and time.time() - self._last_prune >= PRUNE_INTERVAL:
+            self.prune(self.retention)
+        return written
+
+    def prune(self, max_age: float) -> int:
+        """
+        Delete samples older than ``max_age`` seconds.
+
+        Args:
+            max_age: Maximum age to keep, in seconds
+
+        Returns:
+            Number of samples deleted
+        """
+        now = time.time()
+        cutoff = int(now - max_age)
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM samples WHERE ts < ?", (cutoff,)).rowcount
+            self._conn.execute("DELETE FROM closes WHERE ts < ?", (cutoff,))
+        self._last_prune = now
+        return deleted
+
+    def accounts(self) -> Dict[str, str]:
+        """Return a mapping of recorded account identifiers to labels."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT account, label FROM accounts ORDER BY label"))
+
+    def _where(
+        self,
+        account: Optional[str],
+        currency: Optional[str],
+        start: Optional[float],
+        end: Optional[float],
+    ) -> Tuple[str, List[Any]]:
+        clauses = []
+        params: List[Any] = []
+        if account is not None:
+            # Accept either the identifier or the label
+            clauses.append("account IN (SELECT account FROM accounts WHERE account = ? OR label = ?)")
+            params.extend([account, account])
+        if currency is not None:
+            clauses.append("currency = ?")
+            params.append(currency)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(int(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(int(end))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(
+        self,
+        account: Optional[str] = None,
+        currency: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[Sample]:
+        """
+        Return raw samples in a time range.
+
+        Args:
+            account: Only this account identifier or label
+            currency: Only this currency
+            start: Earliest Unix time, inclusive
+            end: Latest Unix time, exclusive
+
+        Returns:
+            Samples ordered by account, currency and time
+        """
+        where, params = self._where(account, currency, start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT account, currency, ts, total, granted, topped_up, available FROM samples"
+                + where + " ORDER BY account, currency, ts",
+                params,
+            ).fetchall()
+        return [Sample(*row[:6], bool(row[6])) for row in rows]
+
+    def downsample(
+        self,
+        bucket: float,
+        account: Optional[str] = None,
+        currency: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[Sample]:
+        """
+        Return the last sample of every fixed-size time bucket.
+
+        Balances are levels, not rates, so each bucket keeps its closing
+        values. Timestamps are the bucket start. Multiples of
+        :data:`ROLLUP_BUCKET` are answered from the hourly rollup table, so
+        their cost does not grow with the polling frequency.
+
+        Args:
+            bucket: Bucket width in seconds
+            account: Only this account identifier or label
+            currency: Only this currency
+            start: Earliest Unix time, inclusive
+            end: Latest Unix time, exclusive
+
+        Returns:
+            One sample per account, currency and non-empty bucket
+
+        Raises:
+            ValueError: If the bucket width is not positive
+        """
+        width = int(bucket)
+        if width <= 0:
+            raise ValueError("bucket must be at least one second")
+        table = "closes" if width % ROLLUP_BUCKET == 0 else "samples"
+        where, params = self._where(account, currency, start, end)
+        # SQLite returns the other columns from the row holding MAX(ts)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT account, currency, (ts / ?) * ? AS bucket, total, granted, topped_up, available, MAX(ts)"
+                f" FROM {table}" + where + " GROUP BY account, currency, bucket ORDER BY account, currency, bucket",
+                [width, width] + params,
+            ).fetchall()
+        return [Sample(*row[:6], bool(row[6])) for row in rows]
+
+    def closes(
+        self,
+        account: Optional[str] = None,
+        currency: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[Sample]:
+        """
+        Return the closing sample of every hour, with its own timestamp.
+
+        Reads only the rollup table, one row per account, currency and hour.
+
+        Args:
+            account: Only this account identifier or label
+            currency: Only this currency
+            start: Earliest Unix time, inclusive
+            end: Latest Unix time, exclusive
+
+        Returns:
+            Samples ordered by account, currency and time
+        """
+        where, params = self._where(account, currency, start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT account, currency, ts, total, granted, topped_up, available FROM closes"
+                + where + " ORDER BY account, currency, bucket",
+                params,
+            ).fetchall()
+        return [Sample(*row[:6], bool(row[6])) for row in rows]
+
+    def close_columns(
+        self,
+        account: Optional[str] = None,
+        currency: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Tuple[List[Tuple[str, str, int]], array, array]:
+        """
+        Return hourly closing totals as flat columns, for bulk analysis.
+
+        Avoids building one Python object per sample: the values land in
+        ``array('d')`` buffers that NumPy can wrap without copying.
+
+        Args:
+            account: Only this account identifier or label
+            currency: Only this currency
+            start: Earliest Unix time, inclusive
+            end: Latest Unix time, exclusive
+
+        Returns:
+            Tuple of (series, timestamps, totals): ``series`` lists
+            ``(account, currency, number of samples)`` in storage order, and
+            the columns hold the samples of each series back to back, in
+            time order
+        """
+        where, params = self._where(account, currency, start, end)
+        with self._lock:
+            # One read transaction, so both queries see the same snapshot
+            self._conn.execute("BEGIN")
+            try:
+                series = self._conn.execute(
+                    "SELECT account, currency, COUNT(*) FROM closes" + where
+                    + " GROUP BY account, currency ORDER BY account, currency",
+                    params,
+                ).fetchall()
+                values = array("d", chain.from_iterable(self._conn.execute(
+                    "SELECT ts, total FROM closes" + where + " ORDER BY account, currency, bucket",
+                    params,
+                )))
+            finally:
+                self._conn.execute("COMMIT")
+        return series, values[0::2], values[1::2]
@@ -0,0 +1,231 @@
+"""
+JSON Backend
+
+JSON encoding and decoding shared by the clients, the response cache and the
+CLI output. Uses ``orjson`` when it is installed (``pip install dsbc[fast]``)
+and the standard library otherwise. The backend is picked on first use, so
+importing this module stays cheap; set ``DSBC_JSON_BACKEND=json`` to force
+the standard library.
+
+:func:`iter_array` decodes the items of a large array one at a time from a
+byte stream, so memory stays flat however long the array is.
+"""
+
+import codecs
+import json
+import os
+import re
+from collections.abc import Mapping
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+# Environment variable overriding the automatic choice
+BACKEND_ENV_VAR = "DSBC_JSON_BACKEND"
+BACKENDS = ("auto", "orjson", "json")
+
+_backend: Optional[str] = None
+_loads: Optional[Callable[[Union[str, bytes]], Any]] = None
+_dumps: Optional[Callable[[Any, bool], str]] = None
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# The standard library decoder can resume at any offset of a buffer
+_DECODER = json.JSONDecoder()
+
+
+def _default(obj: Any) -> Any:
+    # Typed results (see deepseek_balance.results) are mappings, not dicts
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps(obj: Any, pretty: bool) -> str:
+    if pretty:
+        return json.dumps(obj, indent=2, default=_default)
+    return json.dumps(obj, separators=(",", ":"), default=_default)
+
+
+def use_backend(name: str = "auto") -> str:
+    """
+    Select the JSON backend.
+
+    Args:
+        name: ``orjson``, ``json`` (standard library) or ``auto`` (orjson
+            when installed)
+
+    Returns:
+        Name of the backend in use
+
+    Raises:
+        ValueError: If the backend name is unknown
+        ImportError: If ``orjson`` is requested but not installed
+    """
+    global _backend, _loads, _dumps
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {name!r}, expected one of: {', '.join(BACKENDS)}")
+
+    orjson: Any = None
+    if name != "json":
+        try:
+            import orjson
+        except ImportError:
+            if name == "orjson":
+                raise ImportError("The orjson backend is not installed. Install it with: pip install dsbc[fast]")
+
+    if orjson is None:
+        _backend, _loads, _dumps = "json", json.loads, _json_dumps
+        return _backend
+
+    indent = orjson.OPT_INDENT_2
+
+    def orjson_dumps(obj: Any, pretty: bool) -> str:
+        return orjson.dumps(obj, default=_default, option=indent if pretty else 0).decode("utf-8")
+
+    _backend, _loads, _dumps = "orjson", orjson.loads, orjson_dumps
+    return _backend
+
+
+def backend() -> str:
+    """Return the name of the JSON backend, selecting it if needed."""
+    if _backend is None:
+        use_backend("json" if os.environ.get(BACKEND_ENV_VAR, "").lower() == "json" else "auto")
+    return _backend  # type: ignore[return-value]
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode a JSON document.
+
+    Args:
+        data: UTF-8 encoded bytes (preferred, avoids a copy) or text
+
+    Returns:
+        Decoded value
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    if _loads is None:
+        backend()
+    return _loads(data)  # type: ignore[misc]
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """
+    Encode a value as JSON.
+
+    Args:
+        obj: Value made of dicts and other mappings, lists, strings,
+            numbers, booleans and None
+        pretty: Indent with two spaces instead of the compact form
+
+    Returns:
+        JSON text
+    """
+    if _dumps is None:
+        backend()
+    return _dumps(obj, pretty)  # type: ignore[misc]
+
+
+class _StreamReader:
+    """Text buffer over a stream of UTF-8 chunks, trimmed as it is consumed."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk; False at the end of the stream."""
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def peek(self) -> str:
+        """Next character after whitespace, or "" at the end of the stream."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of ``chars``."""
+        char = self.peek()
+        if not char or char not in chars:
+            found = repr(char) if char else "end of document"
+            raise ValueError(f"Expected {' or '.join(map(repr, chars))}, found {found}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return value
+
+
+def iter_array(chunks: Iterable[bytes], key: Optional[str] = None) -> Iterator[Any]:
+    """
+    Decode the items of a JSON array incrementally.
+
+    Items are decoded as soon as their bytes arrive, so memory use depends
+    on the size of one item, not of the document. Other members of the
+    enclosing object are decoded and discarded, and anything after the array
+    is not read. Always uses the standard library decoder.
+
+    Args:
+        chunks: UTF-8 encoded document in pieces of any size, e.g.
+            ``response.iter_content()``
+        key: Member of the top-level object holding the array, or None when
+            the document is the array itself; a missing member yields nothing
+
+    Yields:
+        Decoded array items
+
+    Raises:
+        ValueError: If the document is not valid JSON or ends early
+    """
+    reader = _StreamReader(chunks)
+    if key is not None:
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            name = reader.value()
+            if not isinstance(name, str):
+                raise ValueError(f"Expected an object member name, found {name!r}")
+            reader.expect(":")
+            if name == key:
+                break
+            reader.value()
+            if reader.expect(",}") == "}":
+                return
+
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
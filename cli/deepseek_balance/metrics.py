@@ -0,0 +1,285 @@
+"""
+Prometheus metrics exporter.
+
+Serves account balances as Prometheus gauges on a local HTTP port. Balances
+are refreshed by a background :class:`~deepseek_balance.watch.Watcher` on its
+own schedule and scrapes are answered from the last rendered snapshot, so
+any number of scrapers costs no extra API calls.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .client import token_fingerprint
+from .constants import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_METRICS_HOST,
+    DEFAULT_METRICS_PORT,
+    DEFAULT_WATCH_INTERVAL,
+)
+from .watch import Watcher
+
+# Exposition endpoint
+METRICS_PATH = "/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Per-currency gauges: (metric name, help text, balance_infos field)
+BALANCE_GAUGES = [
+    ("deepseek_balance_total", "Total balance per currency", "total_balance"),
+    ("deepseek_balance_granted", "Granted balance per currency", "granted_balance"),
+    ("deepseek_balance_topped_up", "Topped-up balance per currency", "topped_up_balance"),
+]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _float(value: Any) -> str:
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError):
+        return "NaN"
+
+
+def render_metrics(
+    accounts: Dict[str, Dict[str, Any]],
+    running: Optional[bool] = None,
+    last_poll: Optional[float] = None,
+) -> bytes:
+    """
+    Render account state in the Prometheus text exposition format.
+
+    Args:
+        accounts: Mapping of account label to state, with ``up`` (last poll
+            succeeded), ``balance`` (last successful balance payload or None)
+            and ``last_success`` (Unix time or None)
+        running: Whether the exporter is still polling (omitted when None)
+        last_poll: Unix time the exporter last finished a poll (omitted
+            when None)
+
+    Returns:
+        Encoded exposition document
+    """
+    lines: List[str] = []
+
+    def family(name: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+
+    labels = {account: f'account="{_escape(account)}"' for account in accounts}
+
+    family("deepseek_balance_up", "Whether the last balance poll succeeded")
+    for account, state in accounts.items():
+        lines.append(f"deepseek_balance_up{{{labels[account]}}} {1 if state['up'] else 0}")
+
+    family("deepseek_balance_available", "Whether the account is available (is_available)")
+    for account, state in accounts.items():
+        if state["balance"] is not None:
+            available = state["balance"].get("is_available", True)
+            lines.append(f"deepseek_balance_available{{{labels[account]}}} {1 if available else 0}")
+
+    for name, help_text, field in BALANCE_GAUGES:
+        family(name, help_text)
+        for account, state in accounts.items():
+            if state["balance"] is None:
+                continue
+            for info in state["balance"].get("balance_infos") or []:
+                # "or" also covers keys the API sent as null
+                currency = _escape(info.get("currency") or "USD")
+                lines.append(
+                    f'{name}{{{labels[account]},currency="{currency}"}} {_float(info.get(field, 0))}'
+                )
+
+    family("deepseek_balance_last_success_timestamp_seconds", "Unix time of the last successful poll")
+    for account, state in accounts.items():
+        if state["last_success"] is not None:
+            lines.append(
+                f"deepseek_balance_last_success_timestamp_seconds{{{labels[account]}}} "
+                f"{_float(state['last_success'])}"
+            )
+
+    if running is not None:
+        family("deepseek_balance_exporter_up", "Whether the exporter is still polling the API")
+        lines.append(f"deepseek_balance_exporter_up {1 if running else 0}")
+    if last_poll is not None:
+        family("deepseek_balance_exporter_last_poll_timestamp_seconds", "Unix time the exporter last finished a poll")
+        lines.append(f"deepseek_balance_exporter_last_poll_timestamp_seconds {_float(last_poll)}")
+
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+class MetricsExporter:
+    """
+    Prometheus exporter backed by a background balance watcher.
+
+    The last successful balance of each account is kept when a poll fails;
+    ``deepseek_balance_up`` tells whether it is current.
+    ``deepseek_balance_exporter_up`` and
+    ``deepseek_balance_exporter_last_poll_timestamp_seconds`` tell whether
+    the background poller itself is still alive and polling.
+
+    Example::
+
+        with MetricsExporter(["sk-team-a", "sk-team-b"], interval=60, port=9877) as exporter:
+            print(exporter.url)
+            ...
+    """
+
+    def __init__(
+        self,
+        tokens: Iterable[str],
+        interval: float = DEFAULT_WATCH_INTERVAL,
+        host: str = DEFAULT_METRICS_HOST,
+        port: int = DEFAULT_METRICS_PORT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        account_label: Callable[[str], str] = token_fingerprint,
+        **client_options: Any,
+    ):
+        """
+        Args:
+            tokens: API tokens to export
+            interval: Seconds between upstream balance polls
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            max_workers: Maximum number of upstream requests in flight at once
+            account_label: Turns a token into the ``account`` label value;
+                the default is a short SHA-256 fingerprint
+            **client_options: Extra DeepSeekClient options, e.g. ``retry`` or
+                ``base_url``
+        """
+        self.host = host
+        self.port = port
+        self.watcher = Watcher(tokens, interval=interval, max_workers=max_workers, **client_options)
+        self.watcher.add_handler(self._update)
+        self._labels = {token: account_label(token) for token in self.watcher.clients}
+        self._accounts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._body: Optional[bytes] = None
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._threads: List[threading.Thread] = []
+        self._poller: Optional[threading.Thread] = None
+        self._rendered_poll: Optional[float] = None
+
+    def _poll_forever(self) -> None:
+        try:
+            self.watcher.run()
+        finally:
+            # Scrapes must see that polling ended, not serve the old snapshot as is
+            with self._lock:
+                self._body = None
+
+    def _start_poller(self) -> threading.Thread:
+        self._poller = threading.Thread(target=self._poll_forever, daemon=True)
+        self._poller.start()
+        return self._poller
+
+    def _update(self, event: Dict[str, Any]) -> None:
+        account = self._labels[event["token"]]
+        with self._lock:
+            state = self._accounts.setdefault(account, {"up": False, "balance": None, "last_success": None})
+            state["up"] = event["error"] is None
+            if event["error"] is None:
+                state["balance"] = event["balance"]
+                state["last_success"] = event["timestamp"]
+            # Rendered again on the next scrape, not once per account
+            self._body = None
+
+    def metrics(self) -> bytes:
+        """Return the current exposition document, rendering it at most once per update."""
+        last_poll = self.watcher.last_poll
+        with self._lock:
+            if self._body is None or self._rendered_poll != last_poll:
+                running = self._poller is not None and self._poller.is_alive()
+                self._body = render_metrics(self._accounts, running=running, last_poll=last_poll)
+                self._rendered_poll = last_poll
+            return self._body
+
+    @property
+    def url(self) -> str:
+        """URL of the metrics endpoint."""
+        if self._httpd is None:
+            raise RuntimeError("Metrics exporter is not running")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{METRICS_PATH}"
+
+    def _create_httpd(self) -> ThreadingHTTPServer:
+        handler = type("MetricsHandler", (_MetricsHandler,), {"exporter": self})
+        return _MetricsHTTPServer((self.host, self.port), handler)
+
+    def start(self) -> "MetricsExporter":
+        """Start polling and serving in background threads."""
+        self._httpd = self._create_httpd()
+        server = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        server.start()
+        self._threads = [self._start_poller(), server]
+        return self
+
+    def stop(self) -> None:
+        """Stop polling and serving, and release the upstream connections."""
+        self.watcher.stop()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.watcher.close()
+
+    def __enter__(self) -> "MetricsExporter":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        """Poll in a background thread and serve in the calling thread until interrupted."""
+        self._httpd = self._create_httpd()
+        poller = self._start_poller()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self.watcher.stop()
+            self._httpd.server_close()
+            self._httpd = None
+            poller.join()
+            self.watcher.close()
+
+
+class _MetricsHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server for scrapes."""
+
+    daemon_threads = True
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Request handler bound to a MetricsExporter through the ``exporter`` attribute."""
+
+    exporter: MetricsExporter
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if path == METRICS_PATH:
+            status, content_type, body = 200, CONTENT_TYPE, self.exporter.metrics()
+        elif path == "/":
+            status, content_type = 200, "text/html; charset=utf-8"
+            body = f'<html><body><a href="{METRICS_PATH}">Metrics</a></body></html>'.encode("utf-8")
+        else:
+            status, content_type, body = 404, "text/plain; charset=utf-8", b"Not Found\n"
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
@@ -0,0 +1,364 @@
+"""
+DeepSeek API Mock Server
+
+A lightweight local HTTP server emulating ``/user/balance``, ``/models`` and
+``/usage`` for offline load and resilience testing. Latency, error rates,
+429 bursts and payload sizes are configurable.
+
+Run it from the command line::
+
+    python -m deepseek_balance.mockserver --port 8080 --latency 0.05 --error-rate 0.01
+
+and point dsbc at it with ``--base-url http://127.0.0.1:8080``.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+# Mock server defaults
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MODELS = ["deepseek-chat", "deepseek-reasoner"]
+ERROR_STATUSES = (500, 502, 503)
+
+
+def _seed(*parts: str) -> int:
+    """Deterministic integer seed derived from strings."""
+    return int(hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:12], 16)
+
+
+class MockServer:
+    """
+    Local DeepSeek API emulator running in a background thread.
+
+    Every token gets its own deterministic balance, so multi-account runs see
+    different accounts. Tokens starting with ``sk-invalid`` are rejected with
+    401. Responses carry ETags and honour ``If-None-Match``.
+
+    Example::
+
+        with MockServer(latency=0.01, error_rate=0.05) as server:
+            client = DeepSeekClient("sk-test", base_url=server.url)
+            client.get_balance()
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = 0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        burst_every: int = 0,
+        burst_length: int = 1,
+        retry_after: Optional[float] = 1,
+        currencies: int = 1,
+        models: int = len(DEFAULT_MODELS),
+        usage_models: int = 2,
+        spend_per_request: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            latency: Seconds added to every response
+            latency_jitter: Extra random latency, uniform in [0, jitter]
+            error_rate: Probability of answering with a 5xx error
+            burst_every: Start a burst of 429 responses every N requests
+                (0 disables bursts)
+            burst_length: Number of consecutive 429 responses per burst
+            retry_after: ``Retry-After`` seconds sent with 429 responses
+                (None omits the header)
+            currencies: Number of ``balance_infos`` entries per account
+            models: Number of models returned by ``/models``
+            usage_models: Number of models with usage on each day
+            spend_per_request: Amount subtracted from every balance on each
+                balance request, to emulate spending
+            seed: Seed for latency and error randomness
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.retry_after = retry_after
+        self.currencies = currencies
+        self.models = models
+        self.usage_models = usage_models
+        self.spend_per_request = spend_per_request
+        self.request_count = 0
+        self.status_counts: Dict[int, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._spent: Dict[str, float] = {}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        if self._httpd is None:
+            raise RuntimeError("Mock server is not running")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _create_httpd(self) -> ThreadingHTTPServer:
+        handler = type("MockHandler", (_MockHandler,), {"mock": self})
+        return _MockHTTPServer((self.host, self.port), handler)
+
+    def start(self) -> "MockServer":
+        """Start serving in a background thread."""
+        self._httpd = self._create_httpd()
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and wait for the serving thread."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+        self._httpd = self._create_httpd()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+            self._httpd = None
+
+    def _next_fault(self) -> Tuple[float, Optional[int]]:
+        """Pick the latency and injected status (429, 5xx or None) of a request."""
+        with self._lock:
+            self.request_count += 1
+            count = self.request_count
+            delay = self.latency
+            if self.latency_jitter:
+                delay += self._random.uniform(0, self.latency_jitter)
+            if self.burst_every and count > self.burst_every and (count - 1) % self.burst_every < self.burst_length:
+                return delay, 429
+            if self.error_rate and self._random.random() < self.error_rate:
+                return delay, self._random.choice(ERROR_STATUSES)
+            return delay, None
+
+    def _record_status(self, status: int) -> None:
+        with self._lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def balance(self, token: str) -> Dict[str, Any]:
+        """Balance payload for a token."""
+        with self._lock:
+            spent = self._spent.get(token, 0.0) + self.spend_per_request
+            self._spent[token] = spent
+        rng = random.Random(_seed("balance", token))
+        infos = []
+        for index in range(self.currencies):
+            currency = "USD" if index == 0 else ("CNY" if index == 1 else f"X{index:02d}")
+            topped_up = round(rng.uniform(5, 500), 2)
+            granted = round(rng.uniform(0, 10), 2)
+            total = max(0.0, topped_up + granted - spent)
+            infos.append({
+                "currency": currency,
+                "total_balance": f"{total:.2f}",
+                "granted_balance": f"{granted:.2f}",
+                "topped_up_balance": f"{max(0.0, total - granted):.2f}",
+            })
+        return {
+            "is_available": any(float(info["total_balance"]) > 0 for info in infos),
+            "balance_infos": infos,
+        }
+
+    def model_list(self) -> Dict[str, Any]:
+        """Models payload."""
+        names = DEFAULT_MODELS[: self.models] + [
+            f"deepseek-mock-{index}" for index in range(len(DEFAULT_MODELS), self.models)
+        ]
+        return {
+            "object": "list",
+            "data": [{"id": name, "object": "model", "owned_by": "deepseek"} for name in names],
+        }
+
+    def usage(self, token: str, start_date: Optional[str], end_date: Optional[str]) -> Dict[str, Any]:
+        """Usage payload with one record per day and model in the range."""
+        end = date.fromisoformat(end_date) if end_date else date.today()
+        start = date.fromisoformat(start_date) if start_date else end - timedelta(days=29)
+        names = DEFAULT_MODELS[: self.usage_models] + [
+            f"deepseek-mock-{index}" for index in range(len(DEFAULT_MODELS), self.usage_models)
+        ]
+        records: List[Dict[str, Any]] = []
+        day = start
+        while day <= end:
+            for name in names:
+                rng = random.Random(_seed("usage", token, day.isoformat(), name))
+                prompt_tokens = rng.randint(1_000, 2_000_000)
+                completion_tokens = rng.randint(100, 500_000)
+                cost = prompt_tokens * 0.27e-6 + completion_tokens * 1.1e-6
+                records.append({
+                    "date": day.isoformat(),
+                    "model": name,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "cost": f"{cost:.6f}",
+                    "currency": "USD",
+                })
+            day += timedelta(days=1)
+        return {"object": "list", "data": records}
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server sized for many concurrent load-test clients."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Request handler bound to a MockServer through the ``mock`` attribute."""
+
+    mock: MockServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY,
+    # keep-alive connections stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None) -> None:
+        self.mock._record_status(status)
+        try:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if body is not None:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body or b"")))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up, e.g. after a read timeout
+            self.close_connection = True
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+            return
+        self._send(status, body, {"ETag": etag} if status == 200 else None)
+
+    def do_GET(self) -> None:
+        mock = self.mock
+        delay, fault = mock._next_fault()
+        if delay:
+            time.sleep(delay)
+
+        parts = urlsplit(self.path)
+        auth = self.headers.get("Authorization", "")
+        token = auth[len("Bearer "):] if auth.startswith("Bearer ") else ""
+
+        if parts.path not in ("/user/balance", "/models", "/usage"):
+            self._send_json({"error": {"message": "Not Found"}}, 404)
+            return
+        if fault == 429:
+            headers = {"Retry-After": f"{mock.retry_after:g}"} if mock.retry_after is not None else None
+            body = json.dumps({"error": {"message": "Rate limit reached"}}).encode("utf-8")
+            self._send(429, body, headers)
+            return
+        if fault is not None:
+            self._send_json({"error": {"message": "Service Unavailable"}}, fault)
+            return
+        if not token or token.startswith("sk-invalid"):
+            self._send_json({"error": {"message": "Authentication Fails"}}, 401)
+            return
+
+        if parts.path == "/user/balance":
+            self._send_json(mock.balance(token))
+        elif parts.path == "/models":
+            self._send_json(mock.model_list())
+        else:
+            query = parse_qs(parts.query)
+            try:
+                payload = mock.usage(
+                    token,
+                    query.get("start_date", [None])[0],
+                    query.get("end_date", [None])[0],
+                )
+            except ValueError as e:
+                self._send_json({"error": {"message": str(e)}}, 400)
+                return
+            self._send_json(payload)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the mock server from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m deepseek_balance.mockserver",
+        description="Local DeepSeek API mock server for offline load testing",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 5xx response (0-1)")
+    parser.add_argument("--burst-every", type=int, default=0, help="Start a burst of 429 responses every N requests")
+    parser.add_argument("--burst-length", type=int, default=1, help="Consecutive 429 responses per burst")
+    parser.add_argument("--retry-after", type=float, default=1, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--currencies", type=int, default=1, help="Balance entries per account")
+    parser.add_argument("--models", type=int, default=len(DEFAULT_MODELS), help="Models returned by /models")
+    parser.add_argument("--usage-models", type=int, default=2, help="Models with usage on each day")
+    parser.add_argument("--spend-per-request", type=float, default=0.0, help="Balance spent on each balance request")
+    parser.add_argument("--seed", type=int, help="Seed for latency and error randomness")
+    args = parser.parse_args(argv)
+
+    server = MockServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        retry_after=args.retry_after,
+        currencies=args.currencies,
+        models=args.models,
+        usage_models=args.usage_models,
+        spend_per_request=args.spend_per_request,
+        seed=args.seed,
+    )
+    print(f"Mock DeepSeek API listening on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Rate Limiting
+
+Client-side token-bucket rate limiters for DeepSeek API requests, either
+per process (shared between threads) or per host (shared between processes
+through a lock file).
+"""
+
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+from .cache import user_cache_dir
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_STATE_FILE = "ratelimit.state"
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    The bucket holds up to ``burst`` tokens and refills at ``rate`` tokens
+    per second. Each request takes one token; callers that find the bucket
+    empty reserve a future token and wait for it, so concurrent callers are
+    served in order at the configured rate.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: Sustained requests per second
+            burst: Requests allowed at once after an idle period
+                (default: one second worth of requests, at least 1)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        if self.burst < 1:
+            raise ValueError("burst must be at least 1")
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.time()
+
+    def _take(self, tokens: float, updated: float, now: float) -> Tuple[float, float, float]:
+        """Refill the bucket up to now and take one token; return (tokens, updated, wait)."""
+        tokens = min(float(self.burst), tokens + max(0.0, now - updated) * self.rate)
+        tokens -= 1
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, max(now, updated), wait
+
+    def reserve(self) -> float:
+        """
+        Take one token from the bucket.
+
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            self._tokens, self._updated, wait = self._take(self._tokens, self._updated, time.time())
+        return wait
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    Token bucket shared by every process using the same state file.
+
+    The bucket state lives in a small file guarded by an exclusive file
+    lock, so parallel dsbc invocations on one host share a single quota.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, path: Optional[str] = None):
+        """
+        Args:
+            rate: Sustained requests per second
+            burst: Requests allowed at once after an idle period
+            path: State file (default: ``ratelimit.state`` in the user
+                cache directory)
+        """
+        super().__init__(rate, burst)
+        self.path = path or os.path.join(user_cache_dir(), DEFAULT_STATE_FILE)
+
+    def reserve(self) -> float:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                _lock_file(fd)
+                try:
+                    now = time.time()
+                    tokens, updated = self._read_state(fd, now)
+                    tokens, updated, wait = self._take(tokens, updated, now)
+                    state = f"{tokens!r} {updated!r}".encode("ascii")
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    os.write(fd, state)
+                    os.ftruncate(fd, len(state))
+                finally:
+                    _unlock_file(fd)
+            finally:
+                os.close(fd)
+        return wait
+
+    def _read_state(self, fd: int, now: float) -> Tuple[float, float]:
+        """Read (tokens, updated) from the state file; a new bucket is full."""
+        os.lseek(fd, 0, os.SEEK_SET)
+        raw = os.read(fd, 128)
+        try:
+            tokens, updated = (float(v) for v in raw.split())
+            return tokens, updated
+        except ValueError:
+            return float(self.burst), now
+
+
+def _lock_file(fd: int) -> None:
+    """Take an exclusive lock on an open file, blocking until available."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:  # pragma: no cover - Windows
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def _unlock_file(fd: int) -> None:
+    """Release a lock taken with :func:`_lock_file`."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:  # pragma: no cover - Windows
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
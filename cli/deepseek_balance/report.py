@@ -0,0 +1,173 @@
+"""
+Usage Reports
+
+Aggregates the local usage store (see :mod:`deepseek_balance.usage`) by any
+combination of model, day and account. Records are grouped with vectorized
+NumPy operations over the stored columns rather than one Python dictionary
+per record, so tens of millions of records aggregate in seconds. Requires
+the optional ``numpy`` dependency (``pip install dsbc[analytics]``).
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .columnar import require_numpy
+from .usage import DECIMAL_SCALES, UsageStore
+
+# Report dimensions and the record field each one is printed as
+REPORT_DIMENSIONS = {
+    "model": "model",
+    "day": "date",
+    "token": "account",
+}
+REPORT_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens", "cost")
+# Key spaces up to this size are summed with direct bincounts; larger,
+# sparser ones are compacted with a sort first
+DENSE_GROUPS = 1 << 22
+
+
+def group_sums(
+    keys: Sequence[Any],
+    sizes: Sequence[int],
+    values: Dict[str, Any],
+) -> Tuple[List[Any], Any, Dict[str, Any]]:
+    """
+    Sum integer columns per distinct combination of keys.
+
+    The keys are combined into one integer per row, and every column is
+    summed with a single ``bincount`` pass. Sums are exact while they stay
+    below ``2 ** 53``.
+
+    Args:
+        keys: At least one key array, each with values ``0 .. size - 1``
+        sizes: Number of possible values of each key
+        values: Integer columns to sum, one entry per row
+
+    Returns:
+        Tuple of (key arrays of every group, row count of every group,
+        dictionary of summed columns); groups are sorted by their keys
+    """
+    np = require_numpy()
+    combined = np.zeros(len(keys[0]), dtype=np.int64)
+    space = 1
+    for key, size in zip(keys, sizes):
+        combined *= size
+        combined += key
+        space *= size
+
+    if space <= max(DENSE_GROUPS, combined.size):
+        counts = np.bincount(combined, minlength=space)
+        groups = np.flatnonzero(counts)
+        counts = counts[groups]
+        sums = {name: np.bincount(combined, weights=column, minlength=space)[groups] for name, column in values.items()}
+    else:
+        groups, index = np.unique(combined, return_inverse=True)
+        counts = np.bincount(index)
+        sums = {name: np.bincount(index, weights=column) for name, column in values.items()}
+
+    group_keys = []
+    for size in reversed(sizes):
+        groups, key = np.divmod(groups, size)
+        group_keys.append(key)
+    group_keys.reverse()
+    return group_keys, counts, {name: np.rint(column).astype(np.int64) for name, column in sums.items()}
+
+
+def _sorted_codes(codes: Any, names: Sequence[Any]) -> Tuple[Any, List[Any]]:
+    # Renumber codes so that groups come out in name order
+    np = require_numpy()
+    order = sorted(range(len(names)), key=lambda i: (names[i] is None, str(names[i])))
+    rank = np.empty(len(names), dtype=np.int64)
+    rank[order] = np.arange(len(names))
+    return rank[codes], [names[i] for i in order]
+
+
+def usage_report(
+    store: UsageStore,
+    by: Iterable[str] = ("model",),
+    account: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    model: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate stored usage by model, day and/or account.
+
+    Costs in different currencies are never added up: every group is also
+    split by currency.
+
+    Args:
+        store: Usage store to read
+        by: Dimensions to group by, in order: ``model``, ``day`` and/or
+            ``token`` (the account)
+        account: Only this account identifier or label
+        start: First day (default: the first synced day)
+        end: Last day, inclusive (default: the last synced day)
+        model: Only this model
+
+    Returns:
+        One dictionary per group, sorted by the dimensions in order, with
+        the dimension fields (``model``, ``date``, ``account`` label),
+        ``currency``, ``records``, ``prompt_tokens``, ``completion_tokens``,
+        ``total_tokens`` and ``cost`` (a decimal string)
+
+    Raises:
+        ValueError: If a dimension is unknown, or a summed field holds text
+            or fractional values
+    """
+    np = require_numpy()
+    by = list(dict.fromkeys(by))
+    for dimension in by:
+        if dimension not in REPORT_DIMENSIONS:
+            raise ValueError(f"Unknown report dimension {dimension!r}; choose from {', '.join(REPORT_DIMENSIONS)}")
+
+    scanned = store.scan([*REPORT_FIELDS, "currency"], account=account, start=start, end=end, model=model)
+    for field in REPORT_FIELDS:
+        if field in scanned.dictionaries:
+            raise ValueError(f"Usage field {field!r} is not numeric")
+        column = scanned.columns[field]
+        if column.dtype.kind == "f":
+            # Counts sent as floats, e.g. 1005.0, are summed as integers
+            if not np.array_equal(column, np.rint(column)):
+                raise ValueError(f"Usage field {field!r} is not a whole number")
+            scanned.columns[field] = column.astype(np.int64)
+    if not scanned.model.size:
+        return []
+
+    keys, values = [], []
+    for dimension in by:
+        if dimension == "model":
+            key, names = _sorted_codes(scanned.model, scanned.models)
+        elif dimension == "token":
+            labels = store.accounts()
+            key, names = _sorted_codes(scanned.account, [labels.get(a, a) for a in scanned.accounts])
+        else:
+            days = scanned.day.astype(np.int64)
+            first = int(days.min())
+            key = days - first
+            names = [str(np.datetime64(first + offset, "D")) for offset in range(int(days.max()) - first + 1)]
+        keys.append(key)
+        values.append(names)
+    key, currencies = _sorted_codes(scanned.columns["currency"], scanned.dictionaries.get("currency", [None]))
+    keys.append(key)
+    values.append(currencies)
+
+    group_keys, counts, sums = group_sums(
+        keys, [len(names) for names in values], {field: scanned.columns[field] for field in REPORT_FIELDS}
+    )
+
+    scale = scanned.scales.get("cost", DECIMAL_SCALES["cost"])
+    columns = [group_key.tolist() for group_key in group_keys]
+    counts = counts.tolist()
+    sums = {field: column.tolist() for field, column in sums.items()}
+    results = []
+    for i, count in enumerate(counts):
+        row = {REPORT_DIMENSIONS[dimension]: values[d][columns[d][i]] for d, dimension in enumerate(by)}
+        row["currency"] = currencies[columns[-1][i]]
+        row["records"] = count
+        for field in REPORT_FIELDS[:-1]:
+            row[field] = sums[field][i]
+        row["cost"] = format(Decimal(sums["cost"][i]).scaleb(-scale), "f")
+        results.append(row)
+    return results
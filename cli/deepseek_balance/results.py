@@ -0,0 +1,436 @@
+"""
+Typed Results
+
+Compact result objects for the API responses, returned by the clients when
+called with ``typed=True``. Each one parses its response
+once: amounts become exact integer micro-units (millionths of the currency
+unit), exposed as :class:`~decimal.Decimal` properties, and repeated strings
+such as currencies and model names are interned. Instances use
+``__slots__``, so millions of them cost a fraction of the equivalent dicts.
+
+Every result is also a read-only mapping that reads like the JSON object it
+was parsed from, so code written against the raw dicts
+(``balance["balance_infos"][0]["total_balance"]``, ``record.get("cost")``)
+keeps working. Keys the response held as null read back as None. Amounts
+read back in canonical form (``"1.500"`` becomes ``"1.50"``), so output
+that must match the API byte for byte should use the plain response. They are not ``dict`` subclasses, though: ``to_dict()`` gives
+the plain form for ``isinstance`` checks and the stdlib ``json`` module.
+Fields the classes do not know about are kept in ``extra``.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+# decimal is imported on first use: the CLI imports this module at startup
+if TYPE_CHECKING:
+    from decimal import Decimal
+
+# Amounts are stored as integer multiples of 10 ** -AMOUNT_SCALE
+AMOUNT_SCALE = 6
+_AMOUNT_FACTOR = 10 ** AMOUNT_SCALE
+# Micro-units below this convert to floats that print back exactly
+_FLOAT_EXACT = 10 ** 15
+
+
+def parse_amount(value: Any) -> Optional[int]:
+    """
+    Parse a decimal amount, e.g. ``"18.87"``, into integer micro-units.
+
+    Amounts with more than six decimal places are rejected rather than
+    rounded, so a parsed amount always reads back as the API wrote it.
+    Floats are binary approximations and are rounded to the nearest
+    micro-unit instead.
+
+    Args:
+        value: Decimal string or number, or None
+
+    Returns:
+        Micro-units, or None when ``value`` is None
+
+    Raises:
+        ValueError: If the value is not a finite number, or is a string or
+            Decimal with more than six decimal places
+    """
+    if value is None:
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value * _AMOUNT_FACTOR
+    if isinstance(value, str):
+        # Fast path for plain decimal strings such as "18.87"
+        whole, _, fraction = value.partition(".")
+        negative = whole.startswith("-")
+        if negative:
+            whole = whole[1:]
+        if whole.isdecimal() and len(fraction) <= AMOUNT_SCALE and (not fraction or fraction.isdecimal()):
+            units = int(whole) * _AMOUNT_FACTOR + (int(fraction.ljust(AMOUNT_SCALE, "0")) if fraction else 0)
+            return -units if negative else units
+    from decimal import Decimal, InvalidOperation
+
+    try:
+        amount = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid amount {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount {value!r}: not a finite number")
+    micros = amount.scaleb(AMOUNT_SCALE)
+    units = int(micros.to_integral_value())
+    if units != micros and not isinstance(value, float):
+        raise ValueError(f"Invalid amount {value!r}: more than {AMOUNT_SCALE} decimal places")
+    return units
+
+
+def format_amount(micros: int, places: int = 2) -> str:
+    """
+    Format micro-units as a decimal string with at least ``places`` decimals.
+
+    Trailing zeros beyond ``places`` are dropped, so amounts read back as
+    the API wrote them: ``18870000`` becomes ``"18.87"``.
+    """
+    whole, fraction = divmod(abs(micros), _AMOUNT_FACTOR)
+    digits = f"{fraction:0{AMOUNT_SCALE}d}".rstrip("0").ljust(places, "0")
+    sign = "-" if micros < 0 else ""
+    return f"{sign}{whole}.{digits}" if digits else f"{sign}{whole}"
+
+
+def format_rounded(micros: int, places: int = 2) -> str:
+    """
+    Format micro-units rounded half to even to exactly ``places`` decimals.
+
+    Neither parses nor builds a Decimal, so rendering stays as cheap as
+    formatting a float.
+    """
+    step = 10 ** (AMOUNT_SCALE - places)
+    if not micros % step and -_FLOAT_EXACT < micros < _FLOAT_EXACT:
+        # Nothing to round: the nearest float prints exactly these digits
+        return "%.*f" % (places, micros / _AMOUNT_FACTOR)
+    units, remainder = divmod(micros, step)
+    if remainder * 2 > step or (remainder * 2 == step and units % 2):
+        units += 1
+    sign = "-" if units < 0 else ""
+    if places == 0:
+        return f"{sign}{abs(units)}"
+    whole, fraction = divmod(abs(units), 10 ** places)
+    return f"{sign}{whole}.{fraction:0{places}d}"
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _extra(data: Mapping, keys: frozenset) -> Optional[Dict[str, Any]]:
+    if data.keys() <= keys:
+        return None
+    return {key: value for key, value in data.items() if key not in keys}
+
+
+def _nulls(data: Mapping, keys: Tuple[str, ...]) -> int:
+    """Bit mask of the ``keys`` that ``data`` holds with a null value."""
+    mask = 0
+    for bit, key in enumerate(keys):
+        if key in data and data[key] is None:
+            mask |= 1 << bit
+    return mask
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, _Result):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _require_mapping(data: Any, name: str) -> None:
+    if not isinstance(data, Mapping):
+        raise ValueError(f"Expected a JSON object for {name}, got {type(data).__name__}")
+
+
+class _Result(Mapping):
+    """Base class: a read-only mapping over the JSON form of the fields."""
+
+    __slots__ = ("extra", "nulls")
+
+    # JSON keys, in response order
+    _KEYS: Tuple[str, ...] = ()
+    _KEY_SET: frozenset = frozenset()
+    # JSON key -> its bit in ``nulls``, set when the key was present but null
+    _KEY_BITS: Dict[str, int] = {}
+    # JSON key of an amount: (slot holding micro-units, decimal places shown)
+    _AMOUNTS: Dict[str, Tuple[str, int]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._KEY_SET = frozenset(cls._KEYS)
+        cls._KEY_BITS = {key: 1 << bit for bit, key in enumerate(cls._KEYS)}
+
+    def _json_value(self, key: str) -> Any:
+        """JSON form of a known field, or None when it is absent."""
+        amount = self._AMOUNTS.get(key)
+        if amount is None:
+            return getattr(self, key)
+        micros = getattr(self, amount[0])
+        return None if micros is None else format_amount(micros, amount[1])
+
+    def _decimal(self, key: str) -> Optional["Decimal"]:
+        from decimal import Decimal
+
+        text = self._json_value(key)
+        return None if text is None else Decimal(text)
+
+    def __getitem__(self, key: str) -> Any:
+        bit = self._KEY_BITS.get(key)
+        if bit is not None:
+            value = self._json_value(key)
+            if value is not None or self.nulls & bit:
+                return value
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        nulls = self.nulls
+        for key in self._KEYS:
+            if nulls & self._KEY_BITS[key] or getattr(
+                self, self._AMOUNTS[key][0] if key in self._AMOUNTS else key
+            ) is not None:
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        # Cheaper than counting the keys
+        return bool(self.extra is not None or self.nulls) or any(
+            getattr(self, slot) is not None for slot in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain JSON-compatible dict, as the API returned it."""
+        return {key: _plain(value) for key, value in self.items()}
+
+
+class BalanceInfo(_Result):
+    """Balance of one currency."""
+
+    __slots__ = ("currency", "total_micros", "granted_micros", "topped_up_micros")
+
+    _KEYS = ("currency", "total_balance", "granted_balance", "topped_up_balance")
+    _AMOUNTS = {
+        "total_balance": ("total_micros", 2),
+        "granted_balance": ("granted_micros", 2),
+        "topped_up_balance": ("topped_up_micros", 2),
+    }
+
+    def __init__(
+        self,
+        currency: Optional[str] = None,
+        total_micros: Optional[int] = None,
+        granted_micros: Optional[int] = None,
+        topped_up_micros: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        nulls: int = 0,
+    ):
+        """
+        Create a balance entry; amounts are in micro-units, None when absent.
+        """
+        self.currency = currency
+        self.total_micros = total_micros
+        self.granted_micros = granted_micros
+        self.topped_up_micros = topped_up_micros
+        self.extra = extra
+        self.nulls = nulls
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "BalanceInfo":
+        """Parse one entry of ``balance_infos``."""
+        _require_mapping(data, "balance info")
+        return cls(
+            _intern(data.get("currency")),
+            parse_amount(data.get("total_balance")),
+            parse_amount(data.get("granted_balance")),
+            parse_amount(data.get("topped_up_balance")),
+            _extra(data, cls._KEY_SET),
+            _nulls(data, cls._KEYS),
+        )
+
+    @property
+    def total_balance(self) -> Optional["Decimal"]:
+        """Total balance, or None when absent."""
+        return self._decimal("total_balance")
+
+    @property
+    def granted_balance(self) -> Optional["Decimal"]:
+        """Granted (promotional) balance, or None when absent."""
+        return self._decimal("granted_balance")
+
+    @property
+    def topped_up_balance(self) -> Optional["Decimal"]:
+        """Topped-up (paid) balance, or None when absent."""
+        return self._decimal("topped_up_balance")
+
+
+class Balance(_Result):
+    """Response of ``/user/balance``."""
+
+    __slots__ = ("is_available", "balance_infos")
+
+    _KEYS = ("is_available", "balance_infos")
+
+    def __init__(
+        self,
+        is_available: Optional[bool] = None,
+        balance_infos: Optional[Tuple[BalanceInfo, ...]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        nulls: int = 0,
+    ):
+        """
+        Create a balance; ``balance_infos`` is None when the response has none.
+        """
+        self.is_available = is_available
+        self.balance_infos = balance_infos
+        self.extra = extra
+        self.nulls = nulls
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Balance":
+        """Parse a balance response."""
+        if isinstance(data, cls):
+            return data
+        _require_mapping(data, "balance")
+        infos = data.get("balance_infos")
+        return cls(
+            data.get("is_available"),
+            None if infos is None else tuple(BalanceInfo.from_dict(info) for info in infos),
+            _extra(data, cls._KEY_SET),
+            _nulls(data, cls._KEYS),
+        )
+
+    def _json_value(self, key: str) -> Any:
+        if key == "balance_infos" and self.balance_infos is not None:
+            return list(self.balance_infos)
+        return super()._json_value(key)
+
+    def info(self, currency: str) -> Optional[BalanceInfo]:
+        """Balance of one currency, or None if the account has none."""
+        for info in self.balance_infos or ():
+            if info.currency == currency:
+                return info
+        return None
+
+
+class Model(_Result):
+    """One entry of the ``/models`` list."""
+
+    __slots__ = ("id", "object", "owned_by")
+
+    _KEYS = ("id", "object", "owned_by")
+
+    def __init__(
+        self,
+        id: Optional[str] = None,
+        object: Optional[str] = None,
+        owned_by: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        nulls: int = 0,
+    ):
+        """Create a model entry."""
+        self.id = id
+        self.object = object
+        self.owned_by = owned_by
+        self.extra = extra
+        self.nulls = nulls
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Model":
+        """Parse one entry of a models response."""
+        _require_mapping(data, "model")
+        return cls(
+            _intern(data.get("id")),
+            _intern(data.get("object")),
+            _intern(data.get("owned_by")),
+            _extra(data, cls._KEY_SET),
+            _nulls(data, cls._KEYS),
+        )
+
+
+class UsageRecord(_Result):
+    """Usage of one model on one day."""
+
+    __slots__ = ("date", "model", "prompt_tokens", "completion_tokens", "total_tokens", "cost_micros", "currency")
+
+    _KEYS = ("date", "model", "prompt_tokens", "completion_tokens", "total_tokens", "cost", "currency")
+    _AMOUNTS = {"cost": ("cost_micros", 6)}
+
+    def __init__(
+        self,
+        date: Optional[str] = None,
+        model: Optional[str] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        total_tokens: Optional[int] = None,
+        cost_micros: Optional[int] = None,
+        currency: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        nulls: int = 0,
+    ):
+        """
+        Create a usage record; ``cost_micros`` is in micro-units.
+        """
+        self.date = date
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = total_tokens
+        self.cost_micros = cost_micros
+        self.currency = currency
+        self.extra = extra
+        self.nulls = nulls
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "UsageRecord":
+        """Parse one entry of a usage response."""
+        _require_mapping(data, "usage record")
+        return cls(
+            _intern(data.get("date")),
+            _intern(data.get("model")),
+            data.get("prompt_tokens"),
+            data.get("completion_tokens"),
+            data.get("total_tokens"),
+            parse_amount(data.get("cost")),
+            _intern(data.get("currency")),
+            _extra(data, cls._KEY_SET),
+            _nulls(data, cls._KEYS),
+        )
+
+    @property
+    def cost(self) -> Optional["Decimal"]:
+        """Cost, or None when absent."""
+        return self._decimal("cost")
+
+
+def parse_list(data: Any, cls: type) -> Any:
+    """
+    Parse the ``data`` entries of a list response into typed results.
+
+    Args:
+        data: Response such as ``{"object": "list", "data": [...]}``
+        cls: Result class of the entries, e.g. :class:`Model`
+
+    Returns:
+        A copy of the response dict whose ``data`` holds ``cls`` instances;
+        responses without a ``data`` list, or already parsed, are returned
+        unchanged
+    """
+    if not isinstance(data, Mapping) or not isinstance(data.get("data"), list):
+        return data
+    if all(isinstance(entry, cls) for entry in data["data"]):
+        return data
+    entries: List[Any] = [cls.from_dict(entry) for entry in data["data"]]
+    return {**data, "data": entries}
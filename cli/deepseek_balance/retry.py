@@ -0,0 +1,125 @@
+"""
+Retry Policy
+
+Exponential backoff with jitter for transient DeepSeek API failures.
+"""
+
+import random
+import time
+from typing import Optional, Iterable
+
+# Retry defaults
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header value.
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+        now: Current Unix time, for HTTP dates (default: now)
+
+    Returns:
+        Seconds to wait, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # email.utils is slow to import and rarely needed
+    from email.utils import parsedate_to_datetime
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request.
+
+    Connection errors, timeouts and the configured HTTP statuses (429 and
+    5xx by default) are retried with exponential backoff and full jitter.
+    A ``Retry-After`` header, when present, sets the minimum delay, up to
+    ``max_backoff``. The
+    optional deadline bounds the total time spent on one call, including
+    all attempts and waits.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        jitter: bool = True,
+        retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+        respect_retry_after: bool = True,
+        deadline: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_attempts: Total attempts per call, including the first one
+            backoff_factor: Base delay in seconds; attempt n waits up to
+                ``backoff_factor * 2 ** (n - 1)``
+            max_backoff: Upper bound for a single delay, including one
+                requested by ``Retry-After``
+            jitter: Randomize delays between 0 and the backoff value
+            retry_statuses: HTTP status codes worth retrying
+            respect_retry_after: Honour ``Retry-After`` response headers
+            deadline: Total seconds allowed per call (None = unbounded)
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+        self.deadline = deadline
+
+    def should_retry_status(self, status_code: int) -> bool:
+        """Return True if a response with this status should be retried."""
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Return the delay before the attempt following ``attempt``.
+
+        Args:
+            attempt: Number of the attempt that just failed, starting at 1
+        """
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Return the delay before the next attempt, honouring ``Retry-After``.
+
+        A ``Retry-After`` longer than ``max_backoff`` is capped, so a server
+        cannot stall the caller for hours.
+
+        Args:
+            attempt: Number of the attempt that just failed, starting at 1
+            retry_after: ``Retry-After`` header of the failed response
+        """
+        delay = self.backoff(attempt)
+        if self.respect_retry_after:
+            server_delay = parse_retry_after(retry_after)
+            if server_delay is not None:
+                delay = max(delay, min(self.max_backoff, server_delay))
+        return delay
+
+
+# Policy that never retries
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -0,0 +1,632 @@
+"""
+Usage Sync
+
+Incremental local copy of ``/usage`` data. Date ranges are split into
+one-day chunks fetched in parallel over a shared connection pool, so a long
+range never depends on one slow request. A checkpoint records when each day
+was fetched: later syncs skip days that are already final and only fetch
+days that are new or recent enough to still change.
+
+Records are stored in columnar form (see :mod:`deepseek_balance.columnar`),
+one dataset per account and month, so reports read only the columns and
+months they need.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from . import jsonlib
+from .columnar import (
+    decode_column,
+    dictionary_key,
+    load_column,
+    read_manifest,
+    read_partition,
+    require_numpy,
+    write_dataset,
+)
+from .client import DeepSeekClient, create_session, token_fingerprint
+from .constants import DEFAULT_MAX_WORKERS
+from .history import user_data_dir
+
+# Usage store defaults
+USAGE_DIRNAME = "usage"
+CHECKPOINT_FILENAME = "checkpoint.json"
+# Bumped when the store layout changes; older checkpoints are discarded
+CHECKPOINT_VERSION = 2
+# Seconds after a day ends during which its usage may still change
+DEFAULT_SETTLE = 86400
+# Completed chunks between two checkpoint writes during a sync
+CHECKPOINT_EVERY = 50
+
+SECONDS_PER_DAY = 86400
+
+logger = logging.getLogger(__name__)
+
+# Directory prefix of a month dataset, and the name of its one partition
+MONTH_PREFIX = "month="
+PARTITION = "records"
+# Decimal fields stored exactly in micro-units
+DECIMAL_SCALES = {"cost": 6}
+
+
+class UsageColumns(NamedTuple):
+    """Stored usage loaded column by column, one array entry per record."""
+
+    # Account identifiers, indexed by ``account``
+    accounts: List[str]
+    # Account index of every record
+    account: Any
+    # Day of every record, as ``datetime64[D]``
+    day: Any
+    # Model names, indexed by ``model`` (None for records without one)
+    models: List[Optional[str]]
+    # Model index of every record
+    model: Any
+    # Requested columns; scaled columns hold integers, dictionary columns
+    # hold indexes into ``dictionaries``, other numbers are ``int64`` or,
+    # when any value was a float, ``float64``
+    columns: Dict[str, Any]
+    # Decimal places of scaled columns, e.g. ``{"cost": 6}``
+    scales: Dict[str, int]
+    # Distinct values of dictionary columns, e.g. ``{"currency": ["USD"]}``
+    dictionaries: Dict[str, List[Any]]
+
+
+class DayResult(NamedTuple):
+    """Outcome of syncing one account for one day."""
+
+    token: str
+    day: date
+    # Number of records stored, or None when the fetch failed
+    records: Optional[int]
+    # Whether the stored records differ from the previous sync
+    changed: bool
+    error: Optional[Exception]
+
+
+def default_usage_dir() -> str:
+    """Directory of the default usage store."""
+    return os.path.join(user_data_dir(), USAGE_DIRNAME)
+
+
+def day_range(start: date, end: date) -> List[date]:
+    """Every day from ``start`` to ``end``, inclusive."""
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def _day_end(day: date) -> float:
+    """Unix time at which a UTC day ends."""
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() + SECONDS_PER_DAY
+
+
+def _digest(records: List[Dict[str, Any]]) -> str:
+    return hashlib.sha256(jsonlib.dumps(records).encode("utf-8")).hexdigest()[:16]
+
+
+def _month(day: date) -> str:
+    """``YYYY-MM`` month of a day."""
+    return day.isoformat()[:7]
+
+
+class _Dictionary:
+    """Distinct values of a field across datasets, numbered in first-seen order."""
+
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def code(self, value: Any) -> int:
+        key = dictionary_key(value)
+        index = self._codes.get(key)
+        if index is None:
+            index = self._codes[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def translate(self, spec: Dict[str, Any], data: Any) -> Any:
+        """Turn a stored column into codes of this dictionary."""
+        np = require_numpy()
+        values = spec["dictionary"] if "dictionary" in spec else decode_column(spec, data)
+        lookup = np.fromiter((self.code(value) for value in values), dtype=np.uint32, count=len(values))
+        return lookup[data] if "dictionary" in spec else lookup
+
+
+def _write_atomic(path: str, data: str) -> None:
+    """Replace a file in one step, so readers and crashes never see half of it."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class UsageStore:
+    """
+    On-disk columnar store of daily usage records.
+
+    The records of each account and month are one columnar dataset at
+    ``<account>/month=YYYY-MM/``, holding one typed-array file per field.
+    ``date`` and ``model`` are dictionary-encoded columns like any other
+    text field, and ``cost`` is stored exactly as integer micro-units.
+    Storing a day rewrites its month. Accounts are keyed by
+    :func:`deepseek_balance.client.token_fingerprint`, so tokens are never
+    written to disk. The checkpoint maps every synced day to the time it was
+    fetched and a digest of its records.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Store directory (default: ``usage`` in the user data
+                directory, see :func:`deepseek_balance.history.user_data_dir`)
+        """
+        self.directory = directory or default_usage_dir()
+        self._lock = threading.Lock()
+        # Serializes month rewrites, which read the month before replacing it
+        self._write_lock = threading.Lock()
+        self._checkpoint = self._load_checkpoint()
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.directory, CHECKPOINT_FILENAME)
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        try:
+            with open(self.checkpoint_path, "rb") as f:
+                checkpoint = jsonlib.loads(f.read())
+        except FileNotFoundError:
+            checkpoint = {}
+        except ValueError as e:
+            # Truncated or corrupt: replaced by the next save
+            logger.warning(
+                "Ignoring unreadable usage checkpoint %s (%s); every day will be fetched again",
+                self.checkpoint_path, e,
+            )
+            checkpoint = {}
+        if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+            # Missing or written for another layout: every day is fetched again
+            return {"version": CHECKPOINT_VERSION, "accounts": {}}
+        return checkpoint
+
+    def save_checkpoint(self) -> None:
+        """Write the checkpoint to disk."""
+        with self._lock:
+            data = jsonlib.dumps(self._checkpoint)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        _write_atomic(self.checkpoint_path, data)
+
+    def _month_path(self, account: str, month: str) -> str:
+        return os.path.join(self.directory, account, MONTH_PREFIX + month)
+
+    def _months(self, account: str, start: Optional[date], end: Optional[date]) -> List[str]:
+        """Months with synced days of an account in a range, oldest first."""
+        first = start.isoformat() if start is not None else ""
+        last = end.isoformat() if end is not None else "~"
+        return sorted({day_text[:7] for day_text in self.synced_days(account) if first <= day_text <= last})
+
+    def _read_month(self, account: str, month: str) -> List[Dict[str, Any]]:
+        path = self._month_path(account, month)
+        manifest = read_manifest(path)
+        if manifest is None or PARTITION not in manifest["partitions"]:
+            return []
+        return read_partition(path, PARTITION, manifest)
+
+    def accounts(self) -> Dict[str, str]:
+        """Map of account identifier to display label."""
+        with self._lock:
+            return {account: entry["label"] for account, entry in self._checkpoint["accounts"].items()}
+
+    def synced_days(self, account: str) -> Dict[str, Dict[str, Any]]:
+        """Checkpoint entries of an account, keyed by ISO date."""
+        with self._lock:
+            entry = self._checkpoint["accounts"].get(account)
+            return dict(entry["days"]) if entry else {}
+
+    def pending_days(
+        self,
+        account: str,
+        start: date,
+        end: date,
+        settle: float = DEFAULT_SETTLE,
+    ) -> List[date]:
+        """
+        Days in a range that need fetching.
+
+        A day is final, and skipped, once it was fetched at least ``settle``
+        seconds after it ended (UTC). Days never fetched, and days fetched
+        while they could still change, are pending.
+
+        Args:
+            account: Account identifier
+            start: First day
+            end: Last day, inclusive
+            settle: Seconds after the end of a day before its usage is final
+
+        Returns:
+            Pending days, oldest first
+        """
+        synced = self.synced_days(account)
+        pending = []
+        for day in day_range(start, end):
+            entry = synced.get(day.isoformat())
+            if entry is None or entry["fetched_at"] < _day_end(day) + settle:
+                pending.append(day)
+        return pending
+
+    def write_day(
+        self,
+        account: str,
+        day: date,
+        records: List[Dict[str, Any]],
+        label: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ) -> bool:
+        """
+        Store the usage records of one account and day, replacing earlier ones.
+
+        Rewrites the day's month; :meth:`write_days` stores many days with
+        one rewrite per month. The checkpoint is updated in memory; call
+        :meth:`save_checkpoint` to persist it.
+
+        Args:
+            account: Account identifier
+            day: Day the records belong to
+            records: Usage records from the API
+            label: Display label for the account (default: the identifier)
+            fetched_at: Unix time of the fetch (default: now)
+
+        Returns:
+            True if the records differ from the ones stored before
+        """
+        times = None if fetched_at is None else {day: fetched_at}
+        return self.write_days(account, {day: records}, label=label, fetched_at=times)[day]
+
+    def write_days(
+        self,
+        account: str,
+        days: Dict[date, List[Dict[str, Any]]],
+        label: Optional[str] = None,
+        fetched_at: Optional[Dict[date, float]] = None,
+    ) -> Dict[date, bool]:
+        """
+        Store the usage records of several days of one account.
+
+        Every month is read and rewritten once, with the given days replacing
+        their earlier records. Records are stored with ``date`` set to their
+        day. The checkpoint is updated in memory; call
+        :meth:`save_checkpoint` to persist it.
+
+        Args:
+            account: Account identifier
+            days: Usage records from the API, by day
+            label: Display label for the account (default: the identifier)
+            fetched_at: Unix time each day was fetched (default: now)
+
+        Returns:
+            Whether the records of each day differ from the ones stored before
+        """
+        months: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for day, records in days.items():
+            day_text = day.isoformat()
+            months.setdefault(_month(day), {})[day_text] = [{**record, "date": day_text} for record in records]
+        with self._write_lock:
+            for month, replaced in sorted(months.items()):
+                kept = [record for record in self._read_month(account, month) if record["date"] not in replaced]
+                rows = sorted(kept + [record for records in replaced.values() for record in records],
+                              key=lambda record: record["date"])
+                write_dataset(self._month_path(account, month), {PARTITION: rows}, scales=DECIMAL_SCALES)
+
+        digests = {day: _digest(records) for day, records in days.items()}
+        now = time.time()
+        changed = {}
+        with self._lock:
+            entry = self._checkpoint["accounts"].setdefault(account, {"label": label or account, "days": {}})
+            if label:
+                entry["label"] = label
+            for day, records in days.items():
+                previous = entry["days"].get(day.isoformat())
+                entry["days"][day.isoformat()] = {
+                    "fetched_at": fetched_at.get(day, now) if fetched_at else now,
+                    "records": len(records),
+                    "digest": digests[day],
+                }
+                changed[day] = previous is None or previous["digest"] != digests[day]
+        return changed
+
+    def read_day(self, account: str, day: date) -> Optional[List[Dict[str, Any]]]:
+        """
+        Stored records of one account and day, or None if never synced.
+
+        Records keep the order they were fetched in and carry their ``date``;
+        ``cost`` comes back as a decimal string with six decimals, and a
+        field that only other records of the month have reads as None.
+        """
+        day_text = day.isoformat()
+        if day_text not in self.synced_days(account):
+            return None
+        return [record for record in self._read_month(account, _month(day)) if record["date"] == day_text]
+
+    def iter_records(
+        self,
+        account: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over stored records, oldest day first within each account.
+
+        Args:
+            account: Only this account identifier or label
+            start: First day (default: the first synced day)
+            end: Last day, inclusive (default: the last synced day)
+
+        Yields:
+            Tuples of (account identifier, usage record)
+        """
+        first = start.isoformat() if start is not None else ""
+        last = end.isoformat() if end is not None else "~"
+        for account_id, label in sorted(self.accounts().items()):
+            if account is not None and account not in (account_id, label):
+                continue
+            for month in self._months(account_id, start, end):
+                for record in self._read_month(account_id, month):
+                    if first <= record["date"] <= last:
+                        yield account_id, record
+
+    def scan(
+        self,
+        columns: Iterable[str],
+        account: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        model: Optional[str] = None,
+    ) -> UsageColumns:
+        """
+        Load fields of the stored records as NumPy arrays.
+
+        Only the requested columns of the months holding matching days are
+        read, and rows of other days and models are dropped with vectorized
+        masks; large column files are memory-mapped. Text fields such as
+        ``currency`` are returned as codes into one dictionary per field. A
+        field missing from a month reads as zeros, or as the code of None for
+        text fields. Integers become floats when another month stored the
+        field as floats. Requires NumPy.
+
+        Args:
+            columns: Fields to load, e.g. ``prompt_tokens`` or ``cost``
+            account: Only this account identifier or label
+            start: First day (default: the first synced day)
+            end: Last day, inclusive (default: the last synced day)
+            model: Only this model
+
+        Returns:
+            :class:`UsageColumns` with one entry per record
+
+        Raises:
+            ValueError: If a field is stored with different types or scales
+        """
+        np = require_numpy()
+        names = list(dict.fromkeys(columns))
+        accounts: List[str] = []
+        models = _Dictionary()
+        fields = {name: _Dictionary() for name in names}
+        account_parts: List[Any] = []
+        day_parts: List[Any] = []
+        model_parts: List[Any] = []
+        # Arrays per field, or the row count of a dataset missing the field
+        parts: Dict[str, List[Any]] = {name: [] for name in names}
+        kinds: Dict[str, Any] = {}
+
+        for account_id, label in sorted(self.accounts().items()):
+            if account is not None and account not in (account_id, label):
+                continue
+            account_index = len(accounts)
+            accounts.append(account_id)
+            for month in self._months(account_id, start, end):
+                path = self._month_path(account_id, month)
+                manifest = read_manifest(path)
+                info = manifest["partitions"].get(PARTITION) if manifest is not None else None
+                if info is None or info["rows"] == 0:
+                    continue
+                rows, specs = info["rows"], info["columns"]
+
+                def column(name: str) -> Any:
+                    return load_column(path, PARTITION, name, specs[name], rows)
+
+                day = np.array(specs["date"]["dictionary"], dtype="datetime64[D]")[column("date")]
+                if "model" in specs:
+                    model_codes = models.translate(specs["model"], column("model"))
+                else:
+                    model_codes = np.full(rows, models.code(None), dtype=np.uint32)
+
+                keep = np.ones(rows, dtype=bool)
+                if start is not None:
+                    keep &= day >= np.datetime64(start, "D")
+                if end is not None:
+                    keep &= day <= np.datetime64(end, "D")
+                if model is not None:
+                    keep &= model_codes == models.code(model)
+                count = int(np.count_nonzero(keep))
+                if count == 0:
+                    continue
+                select = slice(None) if count == rows else keep
+
+                account_parts.append(np.full(count, account_index, dtype=np.uint32))
+                day_parts.append(day[select])
+                model_parts.append(model_codes[select])
+                for name in names:
+                    spec = specs.get(name)
+                    if spec is None:
+                        parts[name].append(count)
+                        continue
+                    kind = "dictionary" if "dictionary" in spec else spec.get("scale", spec["type"])
+                    if kind == "dictionary" and spec["dictionary"] == [None]:
+                        # Nothing but missing values: compatible with any type
+                        parts[name].append(count)
+                        continue
+                    known = kinds.setdefault(name, kind)
+                    if known != kind:
+                        if {known, kind} != {"int64", "float64"}:
+                            raise ValueError(f"Usage field {name!r} is stored with different types or scales")
+                        kinds[name] = "float64"
+                    data = column(name)
+                    if kind == "dictionary":
+                        data = fields[name].translate(spec, data)
+                    parts[name].append(data[select])
+
+        loaded = {}
+        for name, arrays in parts.items():
+            if kinds.get(name) == "dictionary":
+                fill, dtype = fields[name].code(None), np.uint32
+            else:
+                fill, dtype = 0, np.int64
+            arrays = [np.full(part, fill, dtype=dtype) if isinstance(part, int) else part for part in arrays]
+            loaded[name] = np.concatenate(arrays) if arrays else np.zeros(0, dtype=dtype)
+
+        def joined(arrays: List[Any], dtype: Any) -> Any:
+            return np.concatenate(arrays) if arrays else np.zeros(0, dtype=dtype)
+
+        # Renumber models so that only models with selected records remain
+        model_codes = joined(model_parts, np.uint32)
+        used = np.flatnonzero(np.bincount(model_codes, minlength=len(models.values)))
+        renumber = np.zeros(len(models.values), dtype=np.uint32)
+        renumber[used] = np.arange(len(used), dtype=np.uint32)
+        return UsageColumns(
+            accounts=accounts,
+            account=joined(account_parts, np.uint32),
+            day=joined(day_parts, "datetime64[D]"),
+            models=[models.values[i] for i in used],
+            model=renumber[model_codes],
+            columns=loaded,
+            scales={name: kind for name, kind in kinds.items() if isinstance(kind, int)},
+            dictionaries={name: fields[name].values for name, kind in kinds.items() if kind == "dictionary"},
+        )
+
+
+def sync_usage(
+    store: UsageStore,
+    tokens: Iterable[str],
+    start: date,
+    end: date,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    settle: float = DEFAULT_SETTLE,
+    full: bool = False,
+    session: Optional[requests.Session] = None,
+    account_label: Optional[Callable[[str], str]] = None,
+    **client_options: Any,
+) -> Iterator[DayResult]:
+    """
+    Fetch missing and still-changing days of usage into a store.
+
+    Every account and pending day is one request, run concurrently with at
+    most ``max_workers`` in flight over one connection pool. Failed
+    requests are yielded as they finish; fetched days are stored, and
+    yielded, once every day of their account and month is in, so each month
+    is rewritten once per sync. The checkpoint is saved periodically and
+    when the iteration ends, so an interrupted sync resumes where it
+    stopped.
+
+    Args:
+        store: Store to update
+        tokens: API tokens to sync
+        start: First day
+        end: Last day, inclusive
+        max_workers: Maximum number of requests in flight at once
+        settle: Seconds after the end of a day before its usage is final
+        full: Fetch every day in the range, even final ones
+        session: Existing session to use instead of a private pool
+        account_label: Turns a token into the stored display label
+            (default: the fingerprint)
+        **client_options: Extra DeepSeekClient options, e.g. ``retry`` or
+            ``base_url``
+
+    Yields:
+        One :class:`DayResult` per fetched account and day
+    """
+    if start > end:
+        raise ValueError("start must not be after end")
+    owns_session = session is None
+    if session is None:
+        session = create_session(pool_maxsize=max_workers)
+
+    chunks = []
+    labels: Dict[str, Optional[str]] = {}
+    # Chunks of every account and month still to finish; a month is written once they all have
+    unfinished: Dict[Tuple[str, str], int] = {}
+    for token in dict.fromkeys(tokens):
+        account = token_fingerprint(token)
+        labels[account] = account_label(token) if account_label is not None else None
+        days = day_range(start, end) if full else store.pending_days(account, start, end, settle)
+        client = DeepSeekClient(token, session=session, **client_options)
+        chunks.extend((token, account, client, day) for day in days)
+        for day in days:
+            unfinished[account, _month(day)] = unfinished.get((account, _month(day)), 0) + 1
+
+    def fetch(client: DeepSeekClient, day: date) -> Tuple[List[Dict[str, Any]], float]:
+        fetched_at = time.time()
+        payload = client.get_usage(start_date=day.isoformat(), end_date=day.isoformat())
+        records = payload.get("data", []) if isinstance(payload, dict) else payload
+        return records, fetched_at
+
+    # Fetched days of every account and month: (token, day, records, fetched_at)
+    fetched: Dict[Tuple[str, str], List[Tuple[str, date, List[Dict[str, Any]], float]]] = {}
+
+    def store_month(key: Tuple[str, str]) -> List[DayResult]:
+        days = fetched.pop(key, [])
+        if not days:
+            return []
+        try:
+            changed = store.write_days(
+                key[0], {day: records for _, day, records, _ in days},
+                label=labels[key[0]], fetched_at={day: fetched_at for _, day, _, fetched_at in days},
+            )
+        except Exception as e:
+            return [DayResult(token, day, None, False, e) for token, day, _, _ in days]
+        return [DayResult(token, day, len(records), changed[day], None) for token, day, records, _ in days]
+
+    unsaved = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, client, day): (token, account, day) for token, account, client, day in chunks}
+            try:
+                for future in as_completed(futures):
+                    token, account, day = futures[future]
+                    key = (account, _month(day))
+                    try:
+                        records, fetched_at = future.result()
+                        fetched.setdefault(key, []).append((token, day, records, fetched_at))
+                    except Exception as e:
+                        yield DayResult(token, day, None, False, e)
+                    unfinished[key] -= 1
+                    if unfinished[key]:
+                        continue
+                    results = store_month(key)
+                    unsaved += len(results)
+                    if unsaved >= CHECKPOINT_EVERY:
+                        store.save_checkpoint()
+                        unsaved = 0
+                    yield from results
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        # Interrupted: keep the days fetched so far
+        for key in list(fetched):
+            store_month(key)
+        if chunks:
+            store.save_checkpoint()
+        if owns_session:
+            session.close()
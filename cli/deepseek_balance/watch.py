@@ -0,0 +1,214 @@
+"""
+Long-running balance watcher.
+
+Polls one or more accounts on a fixed schedule, reusing the same clients and
+connection pool for every tick instead of paying interpreter startup and a
+fresh TLS handshake per check.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from .client import DeepSeekClient, create_session
+from .constants import DEFAULT_MAX_WORKERS, DEFAULT_WATCH_INTERVAL
+
+Event = Dict[str, Any]
+
+logger = logging.getLogger(__name__)
+
+
+class Watcher:
+    """
+    Poll account balances on a drift-free schedule.
+
+    Ticks are anchored to the start time, so slow polls do not push later
+    polls back. Ticks missed while a poll overran are skipped rather than
+    fired back to back.
+
+    Each poll produces one event per account, passed to every handler::
+
+        {"token": ..., "timestamp": ..., "balance": {...} or None,
+         "error": str or None, "changed": bool, "report": bool}
+
+    ``changed`` is true when the balance (or error) differs from the previous
+    poll, and on the first poll. ``report`` is true when the event is
+    changed or when ``heartbeat`` seconds passed since the account was last
+    reported, so printers can stay quiet while nothing happens.
+
+    A handler that raises is logged and counted in :attr:`handler_errors`;
+    the other handlers still run and polling goes on.
+    """
+
+    def __init__(
+        self,
+        tokens: Iterable[str],
+        interval: float = DEFAULT_WATCH_INTERVAL,
+        heartbeat: float = 0.0,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        session: Optional[requests.Session] = None,
+        clock: Callable[[], float] = time.monotonic,
+        **client_options: Any,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            tokens: API tokens to poll
+            interval: Seconds between polls
+            heartbeat: Report unchanged balances at least this often, in
+                seconds (0 reports changes only)
+            max_workers: Maximum number of requests in flight at once
+            session: Existing session to use instead of a private pool
+            clock: Monotonic time source, in seconds
+            **client_options: Extra DeepSeekClient options, e.g. ``retry`` or
+                ``base_url``
+
+        Raises:
+            ValueError: If there are no tokens or an option is out of range
+        """
+        tokens = list(dict.fromkeys(tokens))
+        if not tokens:
+            raise ValueError("At least one token is required")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if heartbeat < 0:
+            raise ValueError("heartbeat must not be negative")
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.handlers: List[Callable[[Event], None]] = []
+        self.poll_handlers: List[Callable[[List[Event]], None]] = []
+        self.polls = 0
+        self.handler_errors = 0
+        # Unix time at which the last poll finished, handlers included
+        self.last_poll: Optional[float] = None
+        self._clock = clock
+        self._stop = threading.Event()
+        self._last_state: Dict[str, Tuple[str, Any]] = {}
+        self._last_reported: Dict[str, float] = {}
+
+        workers = max(1, min(max_workers, len(tokens)))
+        self._owns_session = session is None
+        self.session = session if session is not None else create_session(pool_maxsize=workers)
+        self.clients = {
+            token: DeepSeekClient(token, session=self.session, **client_options)
+            for token in tokens
+        }
+        self._executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def add_handler(self, handler: Callable[[Event], None]) -> None:
+        """Call ``handler`` with every event produced by :meth:`poll`."""
+        self.handlers.append(handler)
+
+    def add_poll_handler(self, handler: Callable[[List[Event]], None]) -> None:
+        """Call ``handler`` once per poll with all of its events, e.g. to batch writes."""
+        self.poll_handlers.append(handler)
+
+    def _dispatch(self, handler: Callable[[Any], None], argument: Any) -> None:
+        try:
+            handler(argument)
+        except Exception as e:
+            self.handler_errors += 1
+            logger.warning("Watch handler %s failed: %s", getattr(handler, "__qualname__", handler), e)
+
+    def _fetch(self, token: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]:
+        try:
+            return token, self.clients[token].get_balance(), None
+        except Exception as e:
+            return token, None, e
+
+    def poll(self, at: Optional[float] = None) -> List[Event]:
+        """
+        Fetch every balance once and dispatch the events to the handlers.
+
+        Args:
+            at: Scheduled tick time on the watcher clock (default: now), used
+                for the heartbeat so it does not drift with request latency
+
+        Returns:
+            Events in token order
+        """
+        if at is None:
+            at = self._clock()
+        timestamp = time.time()
+        if self._executor is not None:
+            results = list(self._executor.map(self._fetch, self.clients))
+        else:
+            results = [self._fetch(token) for token in self.clients]
+
+        events = []
+        for token, balance_data, error in results:
+            state = ("error", str(error)) if error is not None else ("balance", balance_data)
+            changed = self._last_state.get(token) != state
+            self._last_state[token] = state
+            last = self._last_reported.get(token)
+            due = self.heartbeat > 0 and last is not None and at - last >= self.heartbeat
+            report = changed or due
+            if report:
+                self._last_reported[token] = at
+            events.append({
+                "token": token,
+                "timestamp": timestamp,
+                "balance": balance_data,
+                "error": None if error is None else str(error),
+                "changed": changed,
+                "report": report,
+            })
+
+        for event in events:
+            for handler in self.handlers:
+                self._dispatch(handler, event)
+        for poll_handler in self.poll_handlers:
+            self._dispatch(poll_handler, events)
+        self.polls += 1
+        self.last_poll = time.time()
+        return events
+
+    def _sleep(self, delay: float) -> bool:
+        """Wait up to ``delay`` seconds; return True if stopped meanwhile."""
+        return self._stop.wait(delay)
+
+    def run(self, count: Optional[int] = None) -> None:
+        """
+        Poll until :meth:`stop` is called or ``count`` polls are done.
+
+        Args:
+            count: Number of polls to run (default: run forever)
+        """
+        start = self._clock()
+        tick = 0
+        done = 0
+        while not self._stop.is_set():
+            self.poll(at=start + tick * self.interval)
+            tick += 1
+            done += 1
+            if count is not None and done >= count:
+                break
+            now = self._clock()
+            if now > start + tick * self.interval:
+                # Overran one or more ticks: resume on the next one
+                tick = int((now - start) // self.interval) + 1
+            if self._sleep(start + tick * self.interval - now):
+                break
+
+    def stop(self) -> None:
+        """Stop :meth:`run` at the next opportunity, from any thread."""
+        self._stop.set()
+
+    def close(self) -> None:
+        """Stop polling and release the worker threads and owned session."""
+        self.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -45,8 +45,6 @@ setup(
     python_requires=">=3.9",
     install_requires=[
         "requests>=2.25.0",
-        "rich>=13.0.0",  # For pretty output
-        "typer>=0.9.0",  # For better CLI experience
     ],
     extras_require={
         "dev": [
@@ -62,6 +60,15 @@ setup(
         "uv": [
             "uv>=0.1.0",
         ],
+        "async": [
+            "aiohttp>=3.8.0",
+        ],
+        "analytics": [
+            "numpy>=1.20.0",
+        ],
+        "fast": [
+            "orjson>=3.6.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,224 @@
+"""
+Tests for balance alerts
+"""
+
+import json
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from deepseek_balance import cli
+from deepseek_balance.alerts import (
+    AlertDispatcher,
+    AlertEngine,
+    CallbackSink,
+    CommandSink,
+    FileSink,
+    LowBalanceRule,
+    UnavailableRule,
+    WebhookSink,
+)
+from deepseek_balance.mockserver import MockServer
+from deepseek_balance.results import Balance
+
+
+def balance(total, currency="USD", available=True):
+    return {
+        "is_available": available,
+        "balance_infos": [
+            {"currency": currency, "total_balance": f"{total:.2f}", "granted_balance": "0.00", "topped_up_balance": f"{total:.2f}"}
+        ],
+    }
+
+
+def event(total, available=True, token="sk-a", error=None, timestamp=1000.0):
+    return {
+        "token": token,
+        "timestamp": timestamp,
+        "balance": None if error else balance(total, available=available),
+        "error": error,
+        "changed": True,
+        "report": True,
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_low_balance_rule_hysteresis():
+    """Test that a balance inside the clear margin keeps the current state."""
+    rule = LowBalanceRule(10, clear_margin=2)
+    assert [c.breached for c in rule.evaluate(balance(9.99))] == [True]
+    assert [c.breached for c in rule.evaluate(balance(11))] == [None]
+    assert [c.breached for c in rule.evaluate(balance(12))] == [False]
+    assert LowBalanceRule(10, currency="CNY").evaluate(balance(1)) == []
+    assert LowBalanceRule(10).clear_margin == 1.0
+    with pytest.raises(ValueError):
+        LowBalanceRule(-1)
+
+
+def test_engine_deduplicates_and_resolves():
+    """Test that alerts fire on state changes only, with hysteresis."""
+    alerts = []
+    engine = AlertEngine([LowBalanceRule(10), UnavailableRule()], alerts.append, account_label=lambda token: token)
+
+    for total in (20, 9, 8, 10.5, 7, 12):
+        engine.handle(event(total))
+    engine.handle(event(0, error="timeout"))
+
+    assert [(alert["rule"], alert["state"], alert["value"]) for alert in alerts] == [
+        ("low_balance", "firing", 9.0),
+        ("low_balance", "resolved", 12.0),
+    ]
+    assert alerts[0]["account"] == "sk-a"
+    assert alerts[0]["currency"] == "USD"
+    assert alerts[0]["message"] == "Balance 9.00 USD is below 10.00"
+    assert alerts[0]["timestamp"] == "1970-01-01T00:16:40+00:00"
+
+    engine.handle(event(50, available=False))
+    assert alerts[-1]["rule"] == "unavailable"
+    assert engine.firing == [("unavailable", "sk-a", None)]
+
+
+def test_engine_confirm_and_repeat():
+    """Test --alert-confirm and --alert-repeat semantics."""
+    alerts = []
+    clock = FakeClock()
+    engine = AlertEngine([LowBalanceRule(10)], alerts.append, confirm=2, repeat=60, clock=clock)
+
+    engine.handle(event(5))
+    engine.handle(event(20))
+    engine.handle(event(5))
+    assert alerts == []
+    engine.handle(event(5))
+    assert len(alerts) == 1
+
+    clock.now = 30
+    engine.handle(event(5))
+    clock.now = 61
+    engine.handle(event(5))
+    assert [alert["state"] for alert in alerts] == ["firing", "firing"]
+
+    with pytest.raises(ValueError):
+        AlertEngine([], alerts.append, confirm=0)
+
+
+def test_slow_sink_never_blocks_submit():
+    """Test that a blocked sink drops overflow instead of delaying the caller."""
+    release = threading.Event()
+    delivered = []
+
+    def slow(alert):
+        release.wait(5)
+        delivered.append(alert)
+
+    fast = []
+    dispatcher = AlertDispatcher([CallbackSink(slow), CallbackSink(fast.append)], queue_size=2)
+    start = time.monotonic()
+    for n in range(10):
+        dispatcher.submit({"n": n})
+    assert time.monotonic() - start < 0.5
+
+    release.set()
+    dispatcher.close()
+    # The slow sink holds one alert in flight plus two queued
+    assert 2 <= len(delivered) <= 3
+    assert len(fast) >= 2
+    assert dispatcher.sent == len(fast) + len(delivered)
+    assert dispatcher.dropped == 20 - dispatcher.sent
+
+
+def test_sink_failures_are_reported():
+    """Test that a failing sink is counted and reported, not raised."""
+    errors = []
+
+    def broken(alert):
+        raise RuntimeError("boom")
+
+    with AlertDispatcher([CallbackSink(broken)], on_error=lambda sink, e: errors.append(str(e))) as dispatcher:
+        dispatcher.submit({})
+    assert errors == ["boom"]
+    assert dispatcher.failed == 1
+
+
+def test_file_and_command_sinks(tmp_path):
+    """Test the NDJSON file sink and the local command sink."""
+    alert = {"rule": "low_balance", "state": "firing", "account": "sk-a...", "currency": "USD", "value": 1.0}
+    path = tmp_path / "alerts.ndjson"
+    FileSink(str(path)).send(alert)
+    FileSink(str(path)).send(alert)
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [alert, alert]
+
+    stdin_copy = tmp_path / "stdin.json"
+    env_copy = tmp_path / "env.txt"
+    CommandSink(f'cat > "{stdin_copy}"; echo "$DSBC_ALERT_STATE $DSBC_ALERT_CURRENCY" > "{env_copy}"').send(alert)
+    assert json.loads(stdin_copy.read_text()) == alert
+    assert env_copy.read_text().strip() == "firing USD"
+
+    with pytest.raises(Exception, match="exited with 3"):
+        CommandSink("exit 3").send(alert)
+
+
+def test_webhook_sink_posts_json():
+    """Test that the webhook sink POSTs the alert as JSON and checks the status."""
+    session = MagicMock()
+    balance = Balance.from_dict({"is_available": True, "balance_infos": [{"currency": "USD", "total_balance": "1.50"}]})
+    WebhookSink("http://127.0.0.1:1/hook", timeout=2, session=session).send({"state": "firing", "balance": balance})
+    args, kwargs = session.post.call_args
+    assert args == ("http://127.0.0.1:1/hook",) and kwargs["timeout"] == 2
+    assert kwargs["headers"] == {"Content-Type": "application/json"}
+    assert json.loads(kwargs["data"]) == {"state": "firing", "balance": balance.to_dict()}
+    session.post.return_value.raise_for_status.assert_called_once()
+
+
+def test_watch_alerts_end_to_end(tmp_path, capsys):
+    """Test dsbc watch with alert rules and a file sink."""
+    path = tmp_path / "alerts.ndjson"
+    with MockServer(spend_per_request=1000) as server:
+        cli.main([
+            "watch", "-t", "sk-a", "--base-url", server.url, "--retries", "0",
+            "--interval", "0.01", "--count", "3", "--alert-below", "USD:1000000",
+            "--alert-unavailable", "--alert-file", str(path),
+        ])
+    capsys.readouterr()
+
+    alerts = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(alert["rule"], alert["state"]) for alert in alerts] == [
+        ("low_balance", "firing"),
+        ("unavailable", "firing"),
+    ]
+    assert alerts[0]["account"] == "sk-a..."
+
+
+def test_watch_prints_alerts_without_sinks(capsys):
+    """Test that alerts go to stderr when no sink is configured."""
+    with MockServer() as server:
+        cli.main([
+            "watch", "-t", "sk-a", "--base-url", server.url, "--retries", "0",
+            "--interval", "0.01", "--count", "2", "--alert-below", "1000000",
+        ])
+    err = capsys.readouterr().err
+    assert err.count("is below 1000000.00") == 1
+
+
+def test_watch_rejects_sink_without_rule(tmp_path, capsys):
+    """Test that a sink without a rule is an error."""
+    with pytest.raises(SystemExit):
+        cli.main(["watch", "-t", "sk-a", "--count", "1", "--alert-file", str(tmp_path / "a")])
+    assert "need a rule" in capsys.readouterr().err
+
+
+def test_parse_threshold():
+    """Test --alert-below parsing."""
+    assert cli.parse_threshold("5") == (None, 5.0)
+    assert cli.parse_threshold("usd:2.5") == ("USD", 2.5)
+    for value in ("", "USD:", "abc", "-1"):
+        with pytest.raises(Exception):
+            cli.parse_threshold(value)
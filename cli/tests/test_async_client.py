@@ -0,0 +1,152 @@
+"""
+Tests for AsyncDeepSeekClient
+"""
+
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from deepseek_balance.async_client import AsyncDeepSeekClient
+from deepseek_balance.results import Balance
+
+
+BALANCE = {
+    "is_available": True,
+    "balance_infos": [
+        {
+            "currency": "USD",
+            "total_balance": "18.87",
+            "granted_balance": "0.00",
+            "topped_up_balance": "18.87",
+        }
+    ],
+}
+
+
+def run_with_server(handler, coro_factory):
+    """Run coro_factory(base_url) against a local aiohttp server."""
+    async def runner():
+        app = web.Application()
+        app.router.add_get("/user/balance", handler)
+        app.router.add_get("/models", handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            return await coro_factory(str(server.make_url("")))
+        finally:
+            await server.close()
+    return asyncio.run(runner())
+
+
+def test_async_client_initialization():
+    """Test that async client initializes correctly."""
+    client = AsyncDeepSeekClient("test-token-123", max_concurrency=5)
+    assert client.api_token == "test-token-123"
+    assert client.headers["Authorization"] == "Bearer test-token-123"
+    assert "dsbc" in client.headers["User-Agent"]
+    assert client.max_concurrency == 5
+
+
+def test_async_get_balance_success():
+    """Test successful async balance retrieval."""
+    async def handler(request):
+        assert request.headers["Authorization"] == "Bearer test-token"
+        return web.json_response(BALANCE)
+
+    async def scenario(base):
+        async with AsyncDeepSeekClient("test-token", base_url=base) as client:
+            return await client.get_balance(), await client.get_balance(typed=True)
+
+    balance, typed = run_with_server(handler, scenario)
+    assert type(balance) is dict
+    assert balance["balance_infos"][0]["total_balance"] == "18.87"
+    assert isinstance(typed, Balance) and typed == balance
+
+
+def test_async_get_balance_failure():
+    """Test async balance retrieval failure."""
+    async def handler(request):
+        return web.json_response({"error": "Unauthorized"}, status=401)
+
+    async def scenario(base):
+        async with AsyncDeepSeekClient("invalid-token", base_url=base) as client:
+            with pytest.raises(Exception, match="Failed to fetch balance"):
+                await client.get_balance()
+            return await client.check_health()
+
+    assert run_with_server(handler, scenario) is False
+
+
+def test_async_concurrency_limit():
+    """Test that requests in flight never exceed max_concurrency."""
+    state = {"active": 0, "peak": 0}
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return web.json_response(BALANCE)
+
+    async def scenario(base):
+        async with AsyncDeepSeekClient("test-token", base_url=base, max_concurrency=3) as client:
+            results = await asyncio.gather(*(client.get_balance() for _ in range(20)))
+            healthy = await client.check_health()
+            return results, healthy
+
+    results, healthy = run_with_server(handler, scenario)
+    assert len(results) == 20
+    assert healthy is True
+    assert state["peak"] <= 3
+
+
+def test_async_clients_share_session_and_limit():
+    """Test that several clients can share one pool and concurrency limit."""
+    state = {"active": 0, "peak": 0}
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return web.json_response(BALANCE)
+
+    async def scenario(base):
+        limit = asyncio.Semaphore(2)
+        async with aiohttp.ClientSession() as session:
+            clients = [
+                AsyncDeepSeekClient(f"token-{i}", base_url=base, session=session, semaphore=limit)
+                for i in range(5)
+            ]
+            results = await asyncio.gather(*(c.get_balance() for c in clients))
+            for client in clients:
+                await client.close()
+            assert not session.closed
+            return results
+
+    assert len(run_with_server(handler, scenario)) == 5
+    assert state["peak"] <= 2
+
+
+def test_async_get_status_single_request():
+    """Test that async get_status returns health and balance from one request."""
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        return web.json_response(BALANCE)
+
+    async def scenario(base):
+        async with AsyncDeepSeekClient("test-token", base_url=base) as client:
+            return await client.get_status()
+
+    status = run_with_server(handler, scenario)
+    assert status["healthy"] is True
+    assert status["balance"] == BALANCE
+    assert status["circuit"] is None
+    assert status["latency_ms"] > 0
+    assert calls == ["/user/balance"]
@@ -0,0 +1,98 @@
+"""
+Tests for the response cache backends
+"""
+
+import os
+
+from deepseek_balance.cache import (
+    CacheEntry,
+    FileCache,
+    MemoryCache,
+    TieredCache,
+    default_cache,
+    user_cache_dir,
+)
+
+
+def test_cache_entry_freshness():
+    """Test that entries expire after their TTL."""
+    entry = CacheEntry({"data": []}, ttl=60, stored_at=1000.0)
+    assert entry.is_fresh(now=1059.0)
+    assert not entry.is_fresh(now=1060.0)
+    
+    restored = CacheEntry.from_dict(entry.to_dict())
+    assert restored.body == {"data": []}
+    assert restored.expires_at == 1060.0
+
+
+def test_memory_cache_evicts_least_recently_used():
+    """Test size-bounded LRU eviction in memory."""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", CacheEntry(1, ttl=60))
+    cache.set("b", CacheEntry(2, ttl=60))
+    assert cache.get("a").body == 1
+    cache.set("c", CacheEntry(3, ttl=60))
+    
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a").body == 1
+    assert cache.get("c").body == 3
+
+
+def test_file_cache_round_trip_and_eviction(tmp_path):
+    """Test on-disk persistence and size-bounded eviction."""
+    cache = FileCache(str(tmp_path), max_entries=2)
+    cache.set("a", CacheEntry({"id": "a"}, ttl=60))
+    assert FileCache(str(tmp_path)).get("a").body == {"id": "a"}
+    
+    os.utime(cache._path("a"), (1, 1))
+    cache.set("b", CacheEntry({"id": "b"}, ttl=60))
+    cache.set("c", CacheEntry({"id": "c"}, ttl=60))
+    assert cache.get("a") is None
+    assert cache.get("c").body == {"id": "c"}
+    
+    cache.clear()
+    assert cache.get("c") is None
+
+
+def test_file_cache_ignores_unwritable_directory(tmp_path):
+    """Test that I/O errors never escape the file cache."""
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache = FileCache(str(blocker / "cache"))
+    cache.set("a", CacheEntry(1, ttl=60))
+    assert cache.get("a") is None
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    """Test that disk hits are promoted into the memory layer."""
+    memory = MemoryCache()
+    disk = FileCache(str(tmp_path))
+    disk.set("a", CacheEntry([1, 2], ttl=60))
+    
+    cache = TieredCache(memory, disk)
+    assert cache.get("a").body == [1, 2]
+    assert memory.get("a").body == [1, 2]
+
+
+def test_user_cache_dir_override(monkeypatch, tmp_path):
+    """Test that DSBC_CACHE_DIR overrides the platform cache directory."""
+    monkeypatch.setenv("DSBC_CACHE_DIR", str(tmp_path))
+    assert user_cache_dir() == str(tmp_path)
+    assert default_cache().layers[1].directory == str(tmp_path)
+
+
+
+def test_cache_entry_validators_round_trip(tmp_path):
+    """Test that ETag and Last-Modified validators persist on disk."""
+    cache = FileCache(str(tmp_path))
+    cache.set("a", CacheEntry({"data": []}, ttl=0, etag='"v1"', last_modified="Mon, 15 Jan 2024 14:30:00 GMT"))
+    
+    entry = cache.get("a")
+    assert entry.has_validators
+    assert entry.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 15 Jan 2024 14:30:00 GMT",
+    }
+    assert not CacheEntry(1, ttl=60).has_validators
+    assert CacheEntry(1, ttl=60).conditional_headers() == {}
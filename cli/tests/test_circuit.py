@@ -0,0 +1,95 @@
+"""
+Tests for the circuit breaker
+"""
+
+import pytest
+from unittest.mock import patch
+
+from deepseek_balance.circuit import CircuitBreaker, CircuitBreakers, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic."""
+
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_opens_after_threshold():
+    """Test that consecutive failures open the circuit."""
+    clock = FakeClock()
+    with patch("deepseek_balance.circuit.time.monotonic", clock):
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.before_request()
+        
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError, match="Circuit open") as exc:
+            breaker.before_request()
+        assert exc.value.retry_in == pytest.approx(30)
+
+
+def test_success_resets_failure_count():
+    """Test that a success between failures keeps the circuit closed."""
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 1
+
+
+def test_half_open_allows_single_probe():
+    """Test that a half-open circuit lets exactly one probe through."""
+    clock = FakeClock()
+    with patch("deepseek_balance.circuit.time.monotonic", clock):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+        breaker.record_failure()
+        clock.now += 10
+        assert breaker.state == HALF_OPEN
+        assert breaker.retry_in == 0
+        
+        breaker.before_request()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        breaker.before_request()
+
+
+def test_failed_probe_reopens_circuit():
+    """Test that a failed probe opens the circuit for another timeout."""
+    clock = FakeClock()
+    with patch("deepseek_balance.circuit.time.monotonic", clock):
+        breaker = CircuitBreaker(failure_threshold=5, recovery_timeout=10)
+        for _ in range(5):
+            breaker.record_failure()
+        clock.now += 10
+        breaker.before_request()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.retry_in == pytest.approx(10)
+
+
+def test_breakers_per_account_are_independent():
+    """Test that one account's failures leave other accounts' circuits closed."""
+    breakers = CircuitBreakers(failure_threshold=1)
+    breakers.get("failing").record_failure()
+    assert breakers.get("failing") is breakers.get("failing")
+    breakers.get("healthy").before_request()
+    assert breakers.states() == {"failing": OPEN, "healthy": CLOSED}
+
+
+def test_invalid_threshold():
+    """Test that the threshold must be positive."""
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_threshold=0)
+    with pytest.raises(ValueError):
+        CircuitBreakers(failure_threshold=0)
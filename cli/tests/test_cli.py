@@ -0,0 +1,265 @@
+"""
+Tests for the dsbc command-line interface
+"""
+
+import json
+
+import pytest
+from unittest.mock import Mock, patch
+
+from deepseek_balance import cli
+from deepseek_balance.client import DeepSeekClient, token_fingerprint
+
+
+BALANCE = {
+    "is_available": True,
+    "balance_infos": [
+        {
+            "currency": "USD",
+            "total_balance": "18.87",
+            "granted_balance": "0.00",
+            "topped_up_balance": "18.87",
+        }
+    ],
+}
+
+
+def test_read_tokens_skips_blanks_and_comments(tmp_path):
+    """Test reading tokens from a file."""
+    tokens_file = tmp_path / "tokens.txt"
+    tokens_file.write_text("# team a\nsk-one\n\n  sk-two  \n")
+    assert cli.read_tokens(str(tokens_file)) == ["sk-one", "sk-two"]
+
+
+def test_read_tokens_from_stdin(monkeypatch):
+    """Test reading tokens from stdin."""
+    import io
+    monkeypatch.setattr("sys.stdin", io.StringIO("sk-one\nsk-two\n"))
+    assert cli.read_tokens("-") == ["sk-one", "sk-two"]
+
+
+def test_get_api_tokens_merges_and_deduplicates(tmp_path):
+    """Test that repeated --token and a tokens file are merged in order."""
+    tokens_file = tmp_path / "tokens.txt"
+    tokens_file.write_text("sk-two\nsk-three\n")
+    tokens = cli.get_api_tokens(["sk-one", "sk-two"], str(tokens_file))
+    assert tokens == ["sk-one", "sk-two", "sk-three"]
+
+
+def test_get_api_tokens_falls_back_to_environment(monkeypatch):
+    """Test that the environment token is used when no list is given."""
+    monkeypatch.setenv("DEEPSEEK_API_TOKEN", "env-token")
+    assert cli.get_api_tokens(None, None) == ["env-token"]
+
+
+def test_mask_token():
+    """Test that tokens are shortened for display."""
+    assert cli.mask_token("sk-1234567890abcdef") == "sk-12345...cdef"
+    assert "short" not in cli.mask_token("short-token")
+
+
+def test_main_multi_account_streams_results(capsys):
+    """Test that several tokens are fanned out and printed per account."""
+    results = [
+        ("sk-aaaaaaaa1111", BALANCE, None),
+        ("sk-bbbbbbbb2222", None, Exception("Failed to fetch balance: 401")),
+    ]
+    with patch("deepseek_balance.client.fetch_balances", return_value=iter(results)) as mock_fetch:
+        with pytest.raises(SystemExit) as exc:
+            cli.main(["-t", "sk-aaaaaaaa1111", "-t", "sk-bbbbbbbb2222", "--workers", "4", "--retries", "4"])
+    
+    assert exc.value.code == 1
+    args, kwargs = mock_fetch.call_args
+    assert args == (["sk-aaaaaaaa1111", "sk-bbbbbbbb2222"],)
+    assert kwargs["max_workers"] == 4
+    assert kwargs["retry"].max_attempts == 5
+    out, err = capsys.readouterr()
+    assert "Account: sk-aaaaa...1111" in out
+    assert "18.87 USD" in out
+    assert "Error: Failed to fetch balance: 401" in out
+    assert "Checked 2 accounts, 1 failed" in err
+
+
+def test_main_multi_account_json(capsys):
+    """Test multi-account JSON output."""
+    results = [("sk-aaaaaaaa1111", BALANCE, None), ("sk-bbbbbbbb2222", BALANCE, None)]
+    with patch("deepseek_balance.client.fetch_balances", return_value=iter(results)):
+        with pytest.raises(SystemExit) as exc:
+            cli.main(["-t", "sk-aaaaaaaa1111", "-t", "sk-bbbbbbbb2222", "--json"])
+    
+    assert exc.value.code == 0
+    out, _ = capsys.readouterr()
+    decoder = json.JSONDecoder()
+    first, end = decoder.raw_decode(out)
+    assert first == {"account": "sk-aaaaa...1111", "balance": BALANCE}
+
+
+def test_main_multi_account_ndjson(capsys):
+    """Test one compact JSON line per account and currency."""
+    results = [("sk-aaaaaaaa1111", BALANCE, None), ("sk-bbbbbbbb2222", None, Exception("401"))]
+    with patch("deepseek_balance.client.fetch_balances", return_value=iter(results)):
+        with pytest.raises(SystemExit):
+            cli.main(["-t", "sk-aaaaaaaa1111", "-t", "sk-bbbbbbbb2222", "--ndjson"])
+    
+    lines = capsys.readouterr().out.splitlines()
+    assert " " not in lines[0]
+    assert [json.loads(line) for line in lines] == [
+        {
+            "account": "sk-aaaaa...1111",
+            "currency": "USD",
+            "total_balance": "18.87",
+            "granted_balance": "0.00",
+            "topped_up_balance": "18.87",
+            "is_available": True,
+        },
+        {"account": "sk-bbbbb...2222", "error": "401"},
+    ]
+
+
+def test_main_ndjson_models_and_balance(capsys, monkeypatch):
+    """Test NDJSON output for models and a single account."""
+    monkeypatch.setenv("DEEPSEEK_API_TOKEN", "sk-aaaaaaaa1111")
+    models = {"object": "list", "data": [{"id": "deepseek-chat", "owned_by": "deepseek"}, {"id": "deepseek-reasoner"}]}
+    with patch("deepseek_balance.client.DeepSeekClient") as mock_client_cls:
+        client = mock_client_cls.return_value
+        client.get_models.return_value = models
+        client.get_balance.return_value = {"is_available": False, "balance_infos": []}
+        cli.main(["--models", "--ndjson", "--cache-ttl", "0"])
+        cli.main(["--ndjson"])
+    
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records == models["data"] + [{"account": "sk-aaaaa...1111", "is_available": False}]
+
+
+def test_main_json_prints_the_api_body(capsys, monkeypatch):
+    """Test that --json keeps null keys and amounts exactly as the API sent them."""
+    monkeypatch.setenv("DEEPSEEK_API_TOKEN", "sk-aaaaaaaa1111")
+    body = {"is_available": None, "balance_infos": [{"currency": "USD", "total_balance": "1.500", "note": None}]}
+    response = Mock(status_code=200, headers={}, content=json.dumps(body).encode())
+    with patch("deepseek_balance.client.requests.Session.get", return_value=response):
+        cli.main(["--json", "--cache-ttl", "0"])
+        cli.main(["--json", "--verbose", "--cache-ttl", "0"])
+    
+    out = capsys.readouterr().out
+    assert json.loads(out[:out.index("Using API token")]) == body
+    assert json.loads(out[out.index("{", out.index("API Latency")):]) == body
+
+
+def test_main_json_and_ndjson_are_exclusive(capsys):
+    """Test that --json and --ndjson cannot be combined."""
+    with pytest.raises(SystemExit):
+        cli.main(["--json", "--ndjson"])
+    assert "not allowed with" in capsys.readouterr().err
+
+
+def test_main_verbose_uses_single_request(capsys, monkeypatch):
+    """Test that --verbose reuses the health-check response for the balance."""
+    monkeypatch.setenv("DEEPSEEK_API_TOKEN", "sk-aaaaaaaa1111")
+    status = {"healthy": True, "status_code": 200, "latency_ms": 12.3, "balance": BALANCE, "error": None}
+    with patch("deepseek_balance.client.DeepSeekClient") as mock_client_cls:
+        client = mock_client_cls.return_value
+        client.get_status.return_value = status
+        cli.main(["--verbose"])
+    
+    client.get_status.assert_called_once()
+    client.get_balance.assert_not_called()
+    client.check_health.assert_not_called()
+    out, _ = capsys.readouterr()
+    assert "API Health: ✅ Healthy" in out
+    assert "API Latency: 12 ms" in out
+    assert "18.87 USD" in out
+
+
+def test_main_models_refresh(monkeypatch, tmp_path, capsys):
+    """Test that --refresh bypasses the models cache."""
+    monkeypatch.setenv("DEEPSEEK_API_TOKEN", "sk-aaaaaaaa1111")
+    monkeypatch.setenv("DSBC_CACHE_DIR", str(tmp_path))
+    with patch("deepseek_balance.client.DeepSeekClient") as mock_client_cls:
+        client = mock_client_cls.return_value
+        client.get_models.return_value = {"data": [{"id": "deepseek-chat", "owned_by": "deepseek"}]}
+        cli.main(["--models", "--refresh"])
+    
+    client.get_models.assert_called_once_with(refresh=True)
+    assert mock_client_cls.call_args[1]["cache"] is not None
+    assert "deepseek-chat" in capsys.readouterr().out
+
+
+
+def test_main_rate_limit_is_shared_across_accounts(monkeypatch, tmp_path):
+    """Test that --rate-limit builds one host-wide limiter for every account."""
+    monkeypatch.setenv("DSBC_CACHE_DIR", str(tmp_path))
+    with patch("deepseek_balance.client.fetch_balances", return_value=iter([])) as mock_fetch:
+        with pytest.raises(SystemExit):
+            cli.main(["-t", "sk-one", "-t", "sk-two", "--rate-limit", "5", "--burst", "2"])
+    
+    limiter = mock_fetch.call_args[1]["rate_limiter"]
+    assert limiter.rate == 5
+    assert limiter.burst == 2
+    assert limiter.path.startswith(str(tmp_path))
+
+
+def test_watch_gives_each_account_a_circuit_breaker():
+    """Test that watch uses one breaker per account unless disabled."""
+    with patch("deepseek_balance.watch.Watcher") as mock_watcher:
+        cli.main(["watch", "-t", "sk-one", "-t", "sk-two", "--circuit-threshold", "3"])
+    breakers = mock_watcher.call_args[1]["circuit_breaker"]
+    assert breakers.failure_threshold == 3
+    assert DeepSeekClient("sk-one", circuit_breaker=breakers).circuit_breaker is breakers.get(token_fingerprint("sk-one"))
+    assert breakers.get(token_fingerprint("sk-one")) is not breakers.get(token_fingerprint("sk-two"))
+    
+    with patch("deepseek_balance.watch.Watcher") as mock_watcher:
+        cli.main(["watch", "-t", "sk-one", "--circuit-threshold", "0"])
+    assert mock_watcher.call_args[1]["circuit_breaker"] is None
+
+
+def test_main_has_no_circuit_breaker(capsys):
+    """Test that a one-shot check neither offers nor uses a circuit breaker."""
+    with pytest.raises(SystemExit):
+        cli.main(["-t", "sk-one", "--circuit-threshold", "3"])
+    assert "unrecognized arguments: --circuit-threshold" in capsys.readouterr().err
+    
+    with patch("deepseek_balance.client.fetch_balances", return_value=iter([])) as mock_fetch:
+        with pytest.raises(SystemExit):
+            cli.main(["-t", "sk-one", "-t", "sk-two"])
+    assert mock_fetch.call_args[1]["circuit_breaker"] is None
+
+
+def test_get_connection_options_precedence(monkeypatch):
+    """Test that arguments win over environment variables, which win over defaults."""
+    monkeypatch.delenv("DEEPSEEK_API_BASE", raising=False)
+    monkeypatch.delenv("DSBC_CONNECT_TIMEOUT", raising=False)
+    monkeypatch.delenv("DSBC_READ_TIMEOUT", raising=False)
+    assert cli.get_connection_options() == {
+        "base_url": "https://api.deepseek.com",
+        "connect_timeout": 5.0,
+        "read_timeout": 10.0,
+    }
+    
+    monkeypatch.setenv("DEEPSEEK_API_BASE", "http://localhost:9000")
+    monkeypatch.setenv("DSBC_READ_TIMEOUT", "2.5")
+    options = cli.get_connection_options(connect_timeout=0.5)
+    assert options == {"base_url": "http://localhost:9000", "connect_timeout": 0.5, "read_timeout": 2.5}
+    
+    assert cli.get_connection_options(base_url="http://mock")["base_url"] == "http://mock"
+
+
+def test_get_connection_options_rejects_invalid_values(monkeypatch):
+    """Test validation of timeout settings."""
+    monkeypatch.setenv("DSBC_READ_TIMEOUT", "fast")
+    with pytest.raises(ValueError, match="DSBC_READ_TIMEOUT"):
+        cli.get_connection_options()
+    with pytest.raises(ValueError, match="--connect-timeout"):
+        cli.get_connection_options(connect_timeout=0, read_timeout=1)
+
+
+def test_main_passes_connection_options(monkeypatch, tmp_path, capsys):
+    """Test that --base-url and timeouts reach the client."""
+    monkeypatch.setenv("DEEPSEEK_API_TOKEN", "sk-aaaaaaaa1111")
+    monkeypatch.setenv("DSBC_CACHE_DIR", str(tmp_path))
+    with patch("deepseek_balance.client.DeepSeekClient") as mock_client_cls:
+        mock_client_cls.return_value.get_balance.return_value = BALANCE
+        cli.main(["--base-url", "http://127.0.0.1:8080", "--read-timeout", "2"])
+    
+    kwargs = mock_client_cls.call_args[1]
+    assert kwargs["base_url"] == "http://127.0.0.1:8080"
+    assert kwargs["read_timeout"] == 2
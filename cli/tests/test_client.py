@@ -2,10 +2,12 @@
 Tests for DeepSeekClient
 """
 
+import json
+
 import pytest
 import requests
 from unittest.mock import Mock, patch
-from deepseek_balance.client import DeepSeekClient
+from deepseek_balance.client import DeepSeekClient, fetch_balances
 
 
 def test_client_initialization():
@@ -18,20 +20,20 @@ def test_client_initialization():
     assert "dsbc" in client.headers["User-Agent"]
 
 
-@patch("deepseek_balance.client.requests.get")
+@patch("deepseek_balance.client.requests.Session.get")
 def test_get_balance_success(mock_get):
     """Test successful balance retrieval."""
     # Mock response
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response.content = json.dumps({
         "total_balance": 100.0,
         "available_balance": 75.5,
         "used_balance": 24.5,
         "currency": "USD",
         "account_id": "acc_123",
         "timestamp": "2024-01-15T14:30:00Z"
-    }
+    }).encode()
     mock_get.return_value = mock_response
     
     # Test client
@@ -50,7 +52,7 @@ def test_get_balance_success(mock_get):
     assert "Authorization" in call_args[1]["headers"]
 
 
-@patch("deepseek_balance.client.requests.get")
+@patch("deepseek_balance.client.requests.Session.get")
 def test_get_balance_failure(mock_get):
     """Test balance retrieval failure."""
     # Mock failed response
@@ -66,13 +68,13 @@ def test_get_balance_failure(mock_get):
         client.get_balance()
 
 
-@patch("deepseek_balance.client.requests.get")
+@patch("deepseek_balance.client.requests.Session.get")
 def test_get_models_success(mock_get):
     """Test successful models retrieval."""
     # Mock response
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response.content = json.dumps({
         "data": [
             {
                 "id": "deepseek-chat",
@@ -84,7 +86,7 @@ def test_get_models_success(mock_get):
                 }
             }
         ]
-    }
+    }).encode()
     mock_get.return_value = mock_response
     
     # Test client
@@ -98,19 +100,20 @@ def test_get_models_success(mock_get):
     assert models["data"][0]["name"] == "DeepSeek Chat"
 
 
-@patch("deepseek_balance.client.requests.get")
+@patch("deepseek_balance.client.requests.Session.get")
 def test_check_health_success(mock_get):
     """Test health check success."""
     # Mock successful response
     mock_response = Mock()
     mock_response.status_code = 200
+    mock_response.content = b'{"is_available": true, "balance_infos": []}'
     mock_get.return_value = mock_response
     
     client = DeepSeekClient("test-token")
     assert client.check_health() is True
 
 
-@patch("deepseek_balance.client.requests.get")
+@patch("deepseek_balance.client.requests.Session.get")
 def test_check_health_failure(mock_get):
     """Test health check failure."""
     # Mock failed response
@@ -122,7 +125,7 @@ def test_check_health_failure(mock_get):
     assert client.check_health() is False
 
 
-@patch("deepseek_balance.client.requests.get")
+@patch("deepseek_balance.client.requests.Session.get")
 def test_check_health_exception(mock_get):
     """Test health check with exception."""
     # Mock exception
@@ -170,4 +173,376 @@ def test_formatting_functions():
     formatted = format_models(models_data)
     assert "DEEPSEEK AVAILABLE MODELS" in formatted
     assert "deepseek-chat" in formatted
-    assert "deepseek" in formatted
\ No newline at end of file
+    assert "deepseek" in formatted
+
+
+def test_client_shares_pooled_session():
+    """Test that all endpoint methods reuse the same pooled session."""
+    client = DeepSeekClient("test-token", pool_connections=2, pool_maxsize=20)
+    adapter = client.session.get_adapter("https://api.deepseek.com")
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 20
+    
+    with patch.object(client.session, "get") as mock_get:
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.content = json.dumps({"data": []}).encode()
+        client.get_balance()
+        client.get_models()
+        client.check_health()
+        client.get_usage()
+        assert mock_get.call_count == 4
+
+
+def test_client_keep_alive_disabled():
+    """Test that disabling keep-alive asks the server to close connections."""
+    client = DeepSeekClient("test-token", keep_alive=False)
+    assert client.session.headers["Connection"] == "close"
+
+
+def test_client_context_manager_closes_session():
+    """Test that the context manager closes an owned session."""
+    with patch("deepseek_balance.client.requests.Session.close") as mock_close:
+        with DeepSeekClient("test-token"):
+            pass
+        mock_close.assert_called_once()
+
+
+def test_client_does_not_close_shared_session():
+    """Test that a caller-provided session is left open."""
+    session = Mock()
+    with DeepSeekClient("test-token", session=session) as client:
+        assert client.session is session
+    session.close.assert_not_called()
+
+
+def test_fetch_balances_streams_all_accounts():
+    """Test concurrent multi-account balance fan-out."""
+    def fake_get(url, headers=None, params=None, timeout=None):
+        response = Mock()
+        response.status_code = 200
+        if headers["Authorization"] == "Bearer bad-token":
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError("Unauthorized")
+        response.content = json.dumps({"is_available": True, "balance_infos": []}).encode()
+        return response
+
+    session = Mock()
+    session.get.side_effect = fake_get
+    tokens = ["token-a", "token-b", "bad-token", "token-c"]
+    
+    results = {token: (data, error) for token, data, error in fetch_balances(tokens, max_workers=2, session=session)}
+    
+    assert set(results) == set(tokens)
+    assert session.get.call_count == 4
+    assert results["token-a"][0] == {"is_available": True, "balance_infos": []}
+    assert results["token-a"][1] is None
+    assert results["bad-token"][0] is None
+    assert "Failed to fetch balance" in str(results["bad-token"][1])
+    session.close.assert_not_called()
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_get_status_single_request(mock_get):
+    """Test that get_status returns health, latency and balance from one request."""
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.content = json.dumps({"is_available": True, "balance_infos": []}).encode()
+    mock_get.return_value = mock_response
+    
+    client = DeepSeekClient("test-token")
+    status = client.get_status()
+    
+    assert status["healthy"] is True
+    assert status["status_code"] == 200
+    assert status["latency_ms"] >= 0
+    assert status["balance"] == {"is_available": True, "balance_infos": []}
+    assert status["error"] is None
+    mock_get.assert_called_once()
+
+
+@patch("deepseek_balance.client.time.sleep")
+@patch("deepseek_balance.client.requests.Session.get")
+def test_get_status_unhealthy(mock_get, mock_sleep):
+    """Test get_status on an HTTP error and on a network error."""
+    mock_response = Mock()
+    mock_response.status_code = 401
+    mock_get.return_value = mock_response
+    
+    client = DeepSeekClient("invalid-token")
+    status = client.get_status()
+    assert status["healthy"] is False
+    assert status["balance"] is None
+    assert status["error"] == "HTTP 401"
+    
+    mock_get.side_effect = requests.exceptions.ConnectionError("Network error")
+    status = client.get_status()
+    assert status["healthy"] is False
+    assert status["status_code"] is None
+    assert "Network error" in status["error"]
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_get_models_uses_cache(mock_get):
+    """Test that cached models are served without a network request."""
+    from deepseek_balance.cache import MemoryCache
+    
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.content = json.dumps({"data": [{"id": "deepseek-chat"}]}).encode()
+    mock_get.return_value = mock_response
+    
+    client = DeepSeekClient("test-token", cache=MemoryCache(), cache_ttl=60)
+    assert client.get_models() == {"data": [{"id": "deepseek-chat"}]}
+    assert client.get_models() == {"data": [{"id": "deepseek-chat"}]}
+    assert mock_get.call_count == 1
+    
+    client.get_models(refresh=True)
+    assert mock_get.call_count == 2
+    
+    # A different token does not share cache entries
+    other = DeepSeekClient("other-token", cache=client.cache, cache_ttl=60)
+    other.get_models()
+    assert mock_get.call_count == 3
+
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_get_models_revalidates_with_etag(mock_get):
+    """Test that stale models are revalidated and a 304 reuses the cached body."""
+    from deepseek_balance.cache import MemoryCache
+    
+    first = Mock()
+    first.status_code = 200
+    first.headers = {"ETag": '"v1"', "Last-Modified": "Mon, 15 Jan 2024 14:30:00 GMT"}
+    first.content = json.dumps({"data": [{"id": "deepseek-chat"}]}).encode()
+    not_modified = Mock()
+    not_modified.status_code = 304
+    not_modified.headers = {}
+    mock_get.side_effect = [first, not_modified]
+    
+    client = DeepSeekClient("test-token", cache=MemoryCache(), cache_ttl=0)
+    models = client.get_models()
+    assert client.get_models() is models
+    
+    conditional = mock_get.call_args[1]["headers"]
+    assert conditional["If-None-Match"] == '"v1"'
+    assert conditional["If-Modified-Since"] == "Mon, 15 Jan 2024 14:30:00 GMT"
+    assert conditional["Authorization"] == "Bearer test-token"
+    not_modified.json.assert_not_called()
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_get_balance_conditional_request(mock_get):
+    """Test that balances are always revalidated but not re-downloaded on 304."""
+    from deepseek_balance.cache import MemoryCache
+    
+    first = Mock()
+    first.status_code = 200
+    first.headers = {"ETag": 'W/"b1"'}
+    first.content = json.dumps({"is_available": True, "balance_infos": []}).encode()
+    not_modified = Mock()
+    not_modified.status_code = 304
+    not_modified.headers = {"ETag": 'W/"b1"'}
+    mock_get.side_effect = [first, not_modified]
+    
+    client = DeepSeekClient("test-token", cache=MemoryCache(), cache_ttl=3600)
+    balance = client.get_balance()
+    assert client.get_balance() is balance
+    assert mock_get.call_count == 2
+    assert mock_get.call_args[1]["headers"]["If-None-Match"] == 'W/"b1"'
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_get_balance_without_validators_is_not_cached(mock_get):
+    """Test that balances without validators are not stored."""
+    from deepseek_balance.cache import MemoryCache
+    
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.content = json.dumps({"is_available": True}).encode()
+    mock_get.return_value = mock_response
+    
+    cache = MemoryCache()
+    client = DeepSeekClient("test-token", cache=cache)
+    client.get_balance()
+    client.get_balance()
+    assert len(cache) == 0
+    assert "If-None-Match" not in mock_get.call_args[1]["headers"]
+
+
+
+def _response(status_code, headers=None, payload=None):
+    """Build a mock response."""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = json.dumps(payload).encode()
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status_code} Error")
+    return response
+
+
+@patch("deepseek_balance.client.time.sleep")
+@patch("deepseek_balance.client.requests.Session.get")
+def test_retry_transient_failures(mock_get, mock_sleep):
+    """Test that connection errors and 5xx responses are retried."""
+    from deepseek_balance.retry import RetryPolicy
+    
+    mock_get.side_effect = [
+        requests.exceptions.ConnectionError("reset"),
+        _response(502),
+        _response(200, payload={"is_available": True}),
+    ]
+    client = DeepSeekClient("test-token", retry=RetryPolicy(max_attempts=3, jitter=False))
+    
+    assert client.get_balance() == {"is_available": True}
+    assert mock_get.call_count == 3
+    assert [c[0][0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
+
+
+@patch("deepseek_balance.client.time.sleep")
+@patch("deepseek_balance.client.requests.Session.get")
+def test_retry_respects_retry_after(mock_get, mock_sleep):
+    """Test that Retry-After sets the minimum delay after a 429."""
+    from deepseek_balance.retry import RetryPolicy
+    
+    mock_get.side_effect = [_response(429, {"Retry-After": "7"}), _response(200, payload={})]
+    client = DeepSeekClient("test-token", retry=RetryPolicy(jitter=False))
+    
+    client.get_balance()
+    mock_sleep.assert_called_once_with(7.0)
+
+
+@patch("deepseek_balance.client.time.sleep")
+@patch("deepseek_balance.client.requests.Session.get")
+def test_retry_gives_up_after_max_attempts(mock_get, mock_sleep):
+    """Test that the last retryable response is reported as a failure."""
+    from deepseek_balance.retry import RetryPolicy
+    
+    mock_get.return_value = _response(503)
+    client = DeepSeekClient("test-token", retry=RetryPolicy(max_attempts=2))
+    
+    with pytest.raises(Exception, match="Failed to fetch balance: 503"):
+        client.get_balance()
+    assert mock_get.call_count == 2
+
+
+@patch("deepseek_balance.client.time.sleep")
+@patch("deepseek_balance.client.requests.Session.get")
+def test_retry_does_not_retry_client_errors(mock_get, mock_sleep):
+    """Test that 4xx responses other than 429 fail immediately."""
+    mock_get.return_value = _response(401)
+    client = DeepSeekClient("test-token")
+    
+    with pytest.raises(Exception, match="Failed to fetch balance"):
+        client.get_balance()
+    assert mock_get.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+@patch("deepseek_balance.client.time.sleep")
+@patch("deepseek_balance.client.requests.Session.get")
+def test_retry_deadline_bounds_total_time(mock_get, mock_sleep):
+    """Test that a Retry-After beyond the deadline stops retrying."""
+    from deepseek_balance.retry import RetryPolicy
+    
+    mock_get.return_value = _response(429, {"Retry-After": "60"})
+    client = DeepSeekClient("test-token", retry=RetryPolicy(max_attempts=5, deadline=10))
+    
+    with pytest.raises(Exception, match="deadline"):
+        client.get_balance()
+    assert mock_get.call_count == 1
+    mock_sleep.assert_not_called()
+    assert max(mock_get.call_args[1]["timeout"]) <= 10
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_rate_limiter_gates_every_request(mock_get):
+    """Test that each attempt waits on the rate limiter."""
+    mock_get.return_value = _response(200, payload={})
+    limiter = Mock()
+    client = DeepSeekClient("test-token", rate_limiter=limiter)
+    
+    client.get_balance()
+    client.check_health()
+    assert limiter.acquire.call_count == 2
+
+
+@patch("deepseek_balance.client.time.sleep")
+@patch("deepseek_balance.client.requests.Session.get")
+def test_circuit_breaker_fails_fast(mock_get, mock_sleep):
+    """Test that an open circuit fails fast without network requests."""
+    from deepseek_balance.circuit import CircuitBreaker, CircuitOpenError
+    from deepseek_balance.retry import NO_RETRY
+    
+    mock_get.side_effect = requests.exceptions.ConnectTimeout("timed out")
+    client = DeepSeekClient(
+        "test-token", retry=NO_RETRY, circuit_breaker=CircuitBreaker(failure_threshold=2)
+    )
+    assert client.circuit_state == "closed"
+    for _ in range(2):
+        with pytest.raises(Exception, match="Failed to fetch balance"):
+            client.get_balance()
+    assert client.circuit_state == "open"
+    
+    with pytest.raises(CircuitOpenError):
+        client.get_balance()
+    status = client.get_status()
+    assert status["healthy"] is False
+    assert status["circuit"] == "open"
+    assert "Circuit open" in status["error"]
+    assert mock_get.call_count == 2
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_circuit_breaker_ignores_client_errors(mock_get):
+    """Test that 4xx responses do not count as API failures."""
+    from deepseek_balance.circuit import CircuitBreaker
+    
+    mock_get.return_value = _response(401)
+    client = DeepSeekClient("bad-token", circuit_breaker=CircuitBreaker(failure_threshold=1))
+    assert client.check_health() is False
+    assert client.circuit_state == "closed"
+    assert DeepSeekClient("test-token").circuit_state is None
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_base_url_and_timeouts_per_instance(mock_get):
+    """Test that base URL and timeouts are configurable per client."""
+    mock_get.return_value = _response(200, payload={"data": []})
+    client = DeepSeekClient(
+        "test-token", base_url="http://127.0.0.1:8080/", connect_timeout=1.5, read_timeout=3
+    )
+    
+    client.get_balance()
+    assert mock_get.call_args[0][0] == "http://127.0.0.1:8080/user/balance"
+    assert mock_get.call_args[1]["timeout"] == (1.5, 3)
+    
+    client.get_models(timeout=0.5)
+    assert mock_get.call_args[0][0] == "http://127.0.0.1:8080/models"
+    assert mock_get.call_args[1]["timeout"] == 0.5
+    
+    client.get_usage("2024-01-01", "2024-01-31")
+    assert mock_get.call_args[0][0] == "http://127.0.0.1:8080/usage"
+    
+    client.check_health()
+    assert mock_get.call_args[1]["timeout"] == (1.5, 3)
+    assert DeepSeekClient("test-token", read_timeout=30).health_timeout == (5.0, 5.0)
+
+
+@patch('deepseek_balance.client.requests.Session.get')
+def test_iter_usage_reports_truncated_body(mock_get):
+    """Test that a body cut off mid-array fails after the complete records."""
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = iter([b'{"data": [{"date": "2024-01-01"}, {"da'])
+    mock_get.return_value = mock_response
+
+    records = DeepSeekClient("test-token").iter_usage("2024-01-01", "2024-01-31", chunk_size=1024)
+    assert next(records) == {"date": "2024-01-01"}
+    with pytest.raises(Exception, match="Failed to fetch usage: Invalid JSON response"):
+        next(records)
+    assert mock_get.call_args[1]["stream"] is True
+    mock_response.iter_content.assert_called_once_with(1024)
+    mock_response.close.assert_called_once()
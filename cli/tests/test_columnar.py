@@ -0,0 +1,100 @@
+"""
+Tests for the columnar file format
+"""
+
+import os
+
+import pytest
+from unittest.mock import patch
+
+from deepseek_balance import columnar
+from deepseek_balance.columnar import (
+    decode_column,
+    encode_column,
+    load_column,
+    read_manifest,
+    read_partition,
+    write_dataset,
+)
+
+
+def test_encode_column_infers_types():
+    """Test integer, float, scaled decimal, nullable and dictionary columns."""
+    spec, data = encode_column([1, 2, 3])
+    assert spec == {"type": "int64"} and data.typecode == "q"
+
+    spec, data = encode_column([1, 2.5])
+    assert spec == {"type": "float64"} and list(data) == [1.0, 2.5]
+
+    spec, data = encode_column(["0.123456", "1.5", None, 2], scale=6)
+    assert spec == {"type": "int64", "scale": 6, "nulls": [2]}
+    assert list(data) == [123456, 1500000, 0, 2000000]
+    assert decode_column(spec, data) == ["0.123456", "1.500000", None, "2.000000"]
+
+    spec, data = encode_column([1005, None])
+    assert spec == {"type": "int64", "nulls": [1]} and list(data) == [1005, 0]
+    assert decode_column(spec, data) == [1005, None]
+    spec, data = encode_column([None, 3, 0.5])
+    assert spec == {"type": "float64", "nulls": [0]} and list(data) == [0.0, 3.0, 0.5]
+    assert decode_column(spec, data) == [None, 3.0, 0.5]
+    assert encode_column([None, None])[0] == {"type": "uint32", "dictionary": [None]}
+
+    spec, data = encode_column(["USD", "CNY", "USD", None, True, 1, {"a": 1}])
+    assert spec["type"] == "uint32"
+    assert spec["dictionary"] == ["USD", "CNY", None, True, 1, {"a": 1}]
+    assert list(data) == [0, 1, 0, 2, 3, 4, 5]
+    assert decode_column(spec, data) == ["USD", "CNY", "USD", None, True, 1, {"a": 1}]
+
+    spec, _ = encode_column(["n/a"], scale=6)
+    assert spec == {"type": "uint32", "dictionary": ["n/a"]}
+    with pytest.raises(ValueError, match="more than 6 decimal places"):
+        encode_column(["0.1", "0.1234567"], scale=6)
+    assert list(encode_column([0.30000000000000004], scale=6)[1]) == [300_000]
+
+
+def test_dataset_round_trip(tmp_path):
+    """Test writing, replacing and reading a partitioned dataset."""
+    directory = str(tmp_path / "date=2024-01-01")
+    records = [
+        {"model": "a", "tokens": 10, "cost": "0.25", "currency": "USD"},
+        {"model": "a", "tokens": 20, "cost": "0.50", "currency": "USD", "extra": 1.5},
+    ]
+    write_dataset(directory, {"model=a": records, "model=b": []}, exclude=["model"], scales={"cost": 6})
+
+    manifest = read_manifest(directory)
+    assert manifest["partitions"]["model=b"] == {"rows": 0, "columns": {}}
+    assert list(manifest["partitions"]["model=a"]["columns"]) == ["tokens", "cost", "currency", "extra"]
+    assert os.path.getsize(os.path.join(directory, "model=a", "tokens.bin")) == 16
+    assert read_partition(directory, "model=a", manifest) == [
+        {"tokens": 10, "cost": "0.250000", "currency": "USD", "extra": None},
+        {"tokens": 20, "cost": "0.500000", "currency": "USD", "extra": 1.5},
+    ]
+
+    write_dataset(directory, {"model=c": [{"tokens": 1}]})
+    assert list(read_manifest(directory)["partitions"]) == ["model=c"]
+    assert sorted(os.listdir(tmp_path)) == ["date=2024-01-01"]
+    assert read_manifest(str(tmp_path / "missing")) is None
+
+
+def test_load_column_memory_maps_large_files(tmp_path, monkeypatch):
+    """Test NumPy loading with and without memory mapping, and the array fallback."""
+    np = pytest.importorskip("numpy")
+    directory = str(tmp_path / "dataset")
+    rows = 10_000
+    write_dataset(directory, {"p": [{"n": i} for i in range(rows)]})
+    spec = read_manifest(directory)["partitions"]["p"]["columns"]["n"]
+
+    mapped = load_column(directory, "p", "n", spec, rows)
+    assert isinstance(mapped, np.memmap)
+    assert int(mapped.sum()) == rows * (rows - 1) // 2
+
+    monkeypatch.setattr(columnar, "MMAP_THRESHOLD", 1 << 30)
+    loaded = load_column(directory, "p", "n", spec, rows)
+    assert not isinstance(loaded, np.memmap)
+    assert loaded[-1] == rows - 1
+
+    with patch.dict("sys.modules", {"numpy": None}):
+        plain = load_column(directory, "p", "n", spec, rows)
+        assert plain.typecode == "q" and plain[-1] == rows - 1
+        with pytest.raises(ImportError, match="dsbc\\[analytics\\]"):
+            columnar.require_numpy()
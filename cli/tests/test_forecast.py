@@ -0,0 +1,110 @@
+"""
+Tests for balance depletion forecasting
+"""
+
+import json
+import time
+
+import pytest
+from unittest.mock import patch
+
+np = pytest.importorskip("numpy")
+
+from deepseek_balance import cli  # noqa: E402
+from deepseek_balance.forecast import compute_forecasts, forecast  # noqa: E402
+from deepseek_balance.history import HistoryStore  # noqa: E402
+
+DAY = 86400.0
+
+
+def balance(total):
+    return {
+        "is_available": True,
+        "balance_infos": [
+            {"currency": "USD", "total_balance": f"{total:.4f}", "granted_balance": "0", "topped_up_balance": f"{total:.4f}"}
+        ],
+    }
+
+
+def test_compute_forecasts_fits_every_series_at_once():
+    """Test spend rate, depletion time and degenerate series."""
+    t = np.arange(0, 5 * DAY, 3600.0)
+    steady = 100 - 2 * t / DAY
+    flat = np.full(t.size, 50.0)
+    groups = np.concatenate([np.zeros(t.size), np.ones(t.size), [2]])
+    fits = compute_forecasts(groups, np.concatenate([t, t, [0]]), np.concatenate([steady, flat, [7.0]]))
+
+    assert fits["samples"].tolist() == [t.size, t.size, 1]
+    assert fits["rate"][0] * DAY == pytest.approx(2.0)
+    assert fits["r2"][0] == pytest.approx(1.0)
+    assert fits["balance"][0] == pytest.approx(steady[-1])
+    assert fits["depletes_at"][0] == pytest.approx(50 * DAY)
+    assert fits["rate"][1] == 0
+    assert np.isnan(fits["depletes_at"][1])
+    assert np.isnan(fits["rate"][2])
+    assert fits["balance"][2] == 7.0
+
+
+def test_compute_forecasts_ignores_top_ups():
+    """Test that a recharge does not read as negative spending."""
+    t = np.arange(0, 4 * DAY, 3600.0)
+    totals = 20 - 3 * t / DAY
+    totals[t >= 2 * DAY] += 100
+    fits = compute_forecasts(np.zeros(t.size), t, totals)
+
+    # The hour containing the recharge hides its own spending
+    assert fits["rate"][0] * DAY == pytest.approx(3.0, rel=0.02)
+    assert fits["balance"][0] == pytest.approx(totals[-1])
+    assert fits["depletes_at"][0] == pytest.approx(t[-1] + totals[-1] / fits["rate"][0])
+
+
+def test_forecast_reads_hourly_closes():
+    """Test forecasting from a history store with minute-level samples."""
+    now = 472_222 * 3600.0
+    with HistoryStore(":memory:") as store:
+        store.record_many(
+            ("acct-a", balance(10 - minute / 1440), now - 3 * DAY + 60 * minute, "team-a")
+            for minute in range(3 * 1440)
+        )
+        store.record("acct-b", balance(5), timestamp=now - 3600)
+        assert len(store.closes()) == 3 * 24 + 1
+        results = forecast(store, window=2 * DAY, now=now)
+
+    team_a, acct_b = results
+    assert team_a["label"] == "team-a"
+    assert team_a["samples"] == 48
+    assert team_a["burn_rate_per_day"] == pytest.approx(1.0, rel=1e-4)
+    assert team_a["days_left"] == pytest.approx(7.0, abs=0.01)
+    assert acct_b["burn_rate_per_day"] is None
+    assert acct_b["days_left"] is None
+
+
+def test_forecast_command(tmp_path, capsys):
+    """Test dsbc forecast text and JSON output."""
+    path = str(tmp_path / "history.sqlite3")
+    now = time.time()
+    with HistoryStore(path) as store:
+        for hour in range(48):
+            store.record("acct-a", balance(50 - hour), timestamp=now - 48 * 3600 + hour * 3600, label="sk-a...")
+
+    cli.main(["forecast", "--history-file", path])
+    text = capsys.readouterr().out
+    cli.main(["forecast", "--history-file", path, "--json"])
+    records = json.loads(capsys.readouterr().out)
+
+    assert "DEEPSEEK BALANCE FORECAST" in text
+    assert "sk-a...  3.00 USD  burn 24.00/day  empty in 0.1 days" in text
+    assert records[0]["burn_rate_per_day"] == pytest.approx(24.0)
+    assert records[0]["depletes_at"].endswith("+00:00")
+
+
+def test_format_forecast_without_history():
+    """Test the empty forecast table."""
+    assert "No history recorded in this window" in cli.format_forecast([])
+
+
+def test_forecast_without_numpy_names_the_extra():
+    """Test the shared install hint when numpy is missing."""
+    with patch.dict("sys.modules", {"numpy": None}):
+        with pytest.raises(ImportError, match="forecasting.*dsbc\\[analytics\\]"):
+            compute_forecasts([0], [0.0], [1.0])
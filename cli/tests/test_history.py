@@ -0,0 +1,134 @@
+"""
+Tests for the balance history store
+"""
+
+import json
+import time
+
+import pytest
+
+from deepseek_balance import cli
+from deepseek_balance.history import HistoryStore, Sample, default_history_path
+from deepseek_balance.mockserver import MockServer
+
+
+def balance(total, currency="USD", available=True):
+    return {
+        "is_available": available,
+        "balance_infos": [
+            {
+                "currency": currency,
+                "total_balance": f"{total:.2f}",
+                "granted_balance": "1.00",
+                "topped_up_balance": f"{total - 1:.2f}",
+            }
+        ],
+    }
+
+
+def test_record_and_query_range():
+    """Test appending polls and reading a time range back."""
+    with HistoryStore(":memory:") as store:
+        for minute in range(10):
+            store.record("acct-a", balance(100 - minute), timestamp=1000 + 60 * minute, label="team-a")
+        store.record("acct-b", balance(5, "CNY"), timestamp=1000)
+
+        samples = store.query("acct-a", start=1120, end=1300)
+        assert [sample.timestamp for sample in samples] == [1120, 1180, 1240]
+        assert samples[0] == Sample("acct-a", "USD", 1120, 98.0, 1.0, 97.0, True)
+        assert store.query("team-a", start=1300)[0].total == 95.0
+        assert [sample.account for sample in store.query(currency="CNY")] == ["acct-b"]
+        assert store.accounts() == {"acct-b": "acct-b", "acct-a": "team-a"}
+
+
+def test_record_is_append_only_per_second():
+    """Test that a duplicate account, currency and second keeps the first sample."""
+    with HistoryStore(":memory:") as store:
+        assert store.record("acct-a", balance(10), timestamp=1000.2) == 1
+        assert store.record("acct-a", balance(20), timestamp=1000.7) == 0
+        assert [sample.total for sample in store.query()] == [10.0]
+
+
+def test_downsample_keeps_closing_balance():
+    """Test bucketed downsampling."""
+    with HistoryStore(":memory:") as store:
+        store.record_many(
+            ("acct-a", balance(100 - minute, available=minute < 100), 60 * minute, None)
+            for minute in range(120)
+        )
+        hourly = store.downsample(3600)
+
+    assert [(sample.timestamp, sample.total, sample.available) for sample in hourly] == [
+        (0, 41.0, True),
+        (3600, -19.0, False),
+    ]
+
+
+def test_prune_and_retention():
+    """Test age-based retention."""
+    now = time.time()
+    with HistoryStore(":memory:") as store:
+        store.record_many([("acct-a", balance(10), now - 7200, None), ("acct-a", balance(9), now - 60, None)])
+        assert store.prune(3600) == 1
+        assert len(store.query()) == 1
+
+    with HistoryStore(":memory:", retention=3600) as store:
+        store.record("acct-a", balance(10), timestamp=now - 7200)
+        assert store.query() == []
+
+    with pytest.raises(ValueError):
+        HistoryStore(":memory:", retention=0)
+
+
+def test_store_persists_in_wal_mode(tmp_path, monkeypatch):
+    """Test the on-disk database and the default location."""
+    monkeypatch.setenv("DSBC_DATA_DIR", str(tmp_path / "data"))
+    path = default_history_path()
+    assert path == str(tmp_path / "data" / "history.sqlite3")
+
+    with HistoryStore() as store:
+        store.record("acct-a", balance(10), timestamp=1000)
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with HistoryStore(path) as store:
+        assert len(store.query()) == 1
+
+
+def test_watch_records_history(tmp_path, capsys):
+    """Test dsbc watch --history-file and dsbc history end to end."""
+    path = str(tmp_path / "history.sqlite3")
+    with MockServer(currencies=2) as server:
+        cli.main([
+            "watch", "-t", "sk-a", "-t", "sk-invalid-1", "--base-url", server.url,
+            "--retries", "0", "--interval", "0.01", "--count", "2", "--history-file", path,
+        ])
+    capsys.readouterr()
+
+    with HistoryStore(path) as store:
+        samples = store.query()
+        assert {sample.currency for sample in samples} == {"USD", "CNY"}
+        assert list(store.accounts().values()) == ["sk-a..."]
+        assert "sk-a" not in store.accounts()
+
+    cli.main(["history", "--history-file", path, "--json"])
+    records = json.loads(capsys.readouterr().out)
+    assert len(records) == len(samples)
+    assert records[0]["account"] == "sk-a..."
+
+    cli.main(["history", "--history-file", path, "--ndjson"])
+    assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == records
+
+    cli.main(["history", "--history-file", path, "--account", "sk-a...", "--currency", "CNY", "--bucket", "1h"])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert "sk-a..." in lines[0] and "CNY" in lines[0]
+
+
+def test_parse_duration():
+    """Test duration parsing for --since, --bucket and --retention."""
+    assert cli.parse_duration("90") == 90
+    assert cli.parse_duration("15m") == 900
+    assert cli.parse_duration("1.5h") == 5400
+    assert cli.parse_duration("7D") == 604800
+    for value in ("", "abc", "0", "-5m"):
+        with pytest.raises(Exception):
+            cli.parse_duration(value)
@@ -0,0 +1,137 @@
+"""
+Tests for the JSON backend
+"""
+
+import json
+import tracemalloc
+from importlib.util import find_spec
+
+import pytest
+from unittest.mock import Mock, patch
+
+from deepseek_balance import jsonlib
+from deepseek_balance.client import DeepSeekClient
+
+BACKENDS = [
+    "json",
+    pytest.param("orjson", marks=pytest.mark.skipif(find_spec("orjson") is None, reason="orjson is not installed")),
+]
+
+PAYLOAD = {
+    "is_available": True,
+    "balance_infos": [{"currency": "USD", "total_balance": "18.87", "granted_balance": "0.00"}],
+    "nested": {"list": [1, 2.5, None, False], "text": "café"},
+}
+
+
+@pytest.fixture
+def restore_backend():
+    previous = jsonlib.backend()
+    yield
+    jsonlib.use_backend(previous)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_round_trip(backend, restore_backend):
+    """Test that every backend decodes bytes and text and encodes like the standard library."""
+    assert jsonlib.use_backend(backend) == backend
+    body = json.dumps(PAYLOAD).encode("utf-8")
+    assert jsonlib.loads(body) == PAYLOAD
+    assert jsonlib.loads(body.decode("utf-8")) == PAYLOAD
+    assert json.loads(jsonlib.dumps(PAYLOAD)) == PAYLOAD
+    assert " " not in jsonlib.dumps({"a": [1, 2]})
+    assert jsonlib.dumps({"a": [1, {"b": None}], "c": []}, pretty=True) == json.dumps(
+        {"a": [1, {"b": None}], "c": []}, indent=2
+    )
+    with pytest.raises(ValueError):
+        jsonlib.loads(b"{not json")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_encode_typed_results(backend, restore_backend):
+    """Test that mappings such as typed API results encode like dicts."""
+    from deepseek_balance.results import Balance
+
+    jsonlib.use_backend(backend)
+    balance = Balance.from_dict(PAYLOAD)
+    assert json.loads(jsonlib.dumps({"balance": balance})) == {"balance": PAYLOAD}
+    assert json.loads(jsonlib.dumps([balance], pretty=True)) == [PAYLOAD]
+    with pytest.raises(TypeError):
+        jsonlib.dumps({"when": object()})
+
+
+def test_use_backend_validates_name(restore_backend):
+    """Test backend selection errors."""
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        jsonlib.use_backend("simdjson")
+    with patch.dict("sys.modules", {"orjson": None}):
+        assert jsonlib.use_backend("auto") == "json"
+        with pytest.raises(ImportError, match="dsbc\\[fast\\]"):
+            jsonlib.use_backend("orjson")
+
+
+def test_environment_forces_standard_library(monkeypatch, restore_backend):
+    """Test DSBC_JSON_BACKEND=json."""
+    monkeypatch.setenv("DSBC_JSON_BACKEND", "json")
+    monkeypatch.setattr(jsonlib, "_backend", None)
+    monkeypatch.setattr(jsonlib, "_loads", None)
+    assert jsonlib.loads(b"[1]") == [1]
+    assert jsonlib.backend() == "json"
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_client_reports_invalid_json(mock_get):
+    """Test that an undecodable body is reported as a failed request."""
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.content = b"<html>Bad Gateway</html>"
+    mock_get.return_value = mock_response
+
+    with pytest.raises(Exception, match="Failed to fetch balance: Invalid JSON response"):
+        DeepSeekClient("test-token").get_balance()
+
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_iter_array_decodes_items_across_chunks():
+    """Test incremental decoding with members before the array and split characters."""
+    document = {
+        "object": "list",
+        "meta": {"nested": [1, {"text": "]}"}]},
+        "data": [{"model": "café", "n": 1}, 123456, "x", [], None],
+        "after": 1,
+    }
+    body = json.dumps(document, ensure_ascii=False).encode("utf-8")
+    for size in (1, 2, 5, len(body)):
+        assert list(jsonlib.iter_array(chunked(body, size), key="data")) == document["data"]
+
+    assert list(jsonlib.iter_array([b" [ 1 ,2 ] "])) == [1, 2]
+    assert list(jsonlib.iter_array([b'{"object": "list"}'], key="data")) == []
+    assert list(jsonlib.iter_array([b"{}"], key="data")) == []
+
+    for body in (b'{"data": [1, 2', b'{"data": [{"a": ', b"<html>", b"", b'{"data": [1 2]}', b'{"data": null}'):
+        with pytest.raises(ValueError):
+            list(jsonlib.iter_array(chunked(body, 3), key="data"))
+
+
+def test_iter_array_memory_stays_flat():
+    """Test that a long array is never held in memory as a whole."""
+    record = {"date": "2024-01-01", "model": "deepseek-chat", "prompt_tokens": 123456, "cost": "0.123456"}
+    line = json.dumps(record).encode()
+    count = 20_000
+
+    def body():
+        yield b'{"object": "list", "data": ['
+        for i in range(count):
+            yield line + (b"," if i < count - 1 else b"]}")
+
+    tracemalloc.start()
+    try:
+        seen = sum(1 for item in jsonlib.iter_array(body(), key="data") if item == record)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert seen == count
+    assert peak < len(line) * count // 10
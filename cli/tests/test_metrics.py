@@ -0,0 +1,121 @@
+"""
+Tests for the Prometheus metrics exporter
+"""
+
+import time
+
+import pytest
+import requests
+from unittest.mock import patch
+
+from deepseek_balance import cli
+from deepseek_balance.metrics import MetricsExporter, render_metrics, CONTENT_TYPE
+from deepseek_balance.mockserver import MockServer
+
+
+BALANCE = {
+    "is_available": True,
+    "balance_infos": [
+        {"currency": "USD", "total_balance": "18.87", "granted_balance": "1.00", "topped_up_balance": "17.87"},
+        {"currency": "CNY", "total_balance": "5", "granted_balance": "0", "topped_up_balance": "5"},
+    ],
+}
+
+
+def test_render_metrics():
+    """Test the text exposition format."""
+    body = render_metrics({
+        "team-a": {"up": True, "balance": BALANCE, "last_success": 1700000000.5},
+        'we"ird': {"up": False, "balance": None, "last_success": None},
+    }).decode("utf-8")
+    lines = body.splitlines()
+
+    assert "# TYPE deepseek_balance_total gauge" in lines
+    assert 'deepseek_balance_up{account="team-a"} 1' in lines
+    assert 'deepseek_balance_up{account="we\\"ird"} 0' in lines
+    assert 'deepseek_balance_available{account="team-a"} 1' in lines
+    assert 'deepseek_balance_total{account="team-a",currency="USD"} 18.87' in lines
+    assert 'deepseek_balance_granted{account="team-a",currency="USD"} 1.0' in lines
+    assert 'deepseek_balance_topped_up{account="team-a",currency="CNY"} 5.0' in lines
+    assert 'deepseek_balance_last_success_timestamp_seconds{account="team-a"} 1700000000.5' in lines
+    assert not any(line.startswith("deepseek_balance_total") and "we" in line for line in lines)
+    assert body.endswith("\n")
+
+
+def test_render_metrics_tolerates_null_fields():
+    """Test that null currencies and balance lists do not break the response."""
+    body = render_metrics({
+        "team-a": {"up": True, "balance": {"balance_infos": [{"currency": None, "total_balance": "2"}]},
+                   "last_success": None},
+        "team-b": {"up": True, "balance": {"is_available": True, "balance_infos": None}, "last_success": None},
+    }).decode("utf-8")
+    assert 'deepseek_balance_total{account="team-a",currency="USD"} 2.0' in body.splitlines()
+
+
+def test_serve_metrics_labels_accounts_by_fingerprint():
+    """Test that serve-metrics keeps token characters out of the labels."""
+    with patch("deepseek_balance.metrics.MetricsExporter") as mock_exporter:
+        mock_exporter.return_value.serve_forever.side_effect = KeyboardInterrupt
+        cli.main(["serve-metrics", "-t", "sk-aaaaaaaa1111"])
+    assert "account_label" not in mock_exporter.call_args[1]
+
+
+def test_exporter_keeps_last_balance_when_poll_fails():
+    """Test that a failing account reports up 0 but keeps its last balance."""
+    with MockServer() as server:
+        exporter = MetricsExporter(["sk-a"], port=0, account_label=lambda token: token, base_url=server.url)
+        exporter.watcher.poll()
+        first = exporter.metrics()
+        assert exporter.metrics() is first
+        with patch.object(exporter.watcher.clients["sk-a"], "get_balance", side_effect=Exception("boom")):
+            exporter.watcher.poll()
+        exporter.watcher.close()
+
+    lines = exporter.metrics().decode("utf-8").splitlines()
+    assert 'deepseek_balance_up{account="sk-a"} 0' in lines
+    assert any(line.startswith('deepseek_balance_total{account="sk-a",currency="USD"}') for line in lines)
+
+
+def test_exporter_keeps_polling_when_an_update_fails():
+    """Test that handler errors do not stop the poller, and liveness is exported."""
+    assert b"deepseek_balance_exporter_up" not in render_metrics({})
+    assert "deepseek_balance_exporter_up 0" in render_metrics({}, running=False).decode("utf-8")
+
+    with MockServer() as server:
+        with MetricsExporter(["sk-a"], interval=0.01, port=0, base_url=server.url) as exporter:
+            # Unknown token: every _update raises KeyError
+            exporter._labels.clear()
+            deadline = time.monotonic() + 5
+            while exporter.watcher.handler_errors < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            lines = exporter.metrics().decode("utf-8").splitlines()
+
+    assert exporter.watcher.handler_errors >= 2
+    assert "deepseek_balance_exporter_up 1" in lines
+    assert any(line.startswith("deepseek_balance_exporter_last_poll_timestamp_seconds ") for line in lines)
+
+
+def test_exporter_serves_scrapes_from_cache():
+    """Test that many scrapes cost a single upstream request."""
+    with MockServer() as server:
+        with MetricsExporter(["sk-a", "sk-b"], interval=3600, port=0, base_url=server.url) as exporter:
+            deadline = time.monotonic() + 5
+            while exporter.watcher.polls == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            with requests.Session() as session:
+                responses = [session.get(exporter.url, timeout=5) for _ in range(20)]
+                missing = session.get(exporter.url.replace("/metrics", "/nope"), timeout=5)
+
+    assert server.request_count == 2
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[0].headers["Content-Type"] == CONTENT_TYPE
+    assert responses[0].text.count("deepseek_balance_up{") == 2
+    assert missing.status_code == 404
+
+
+def test_serve_metrics_command_rejects_invalid_options(capsys):
+    """Test dsbc serve-metrics argument validation."""
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main(["serve-metrics", "-t", "sk-a", "--interval", "0"])
+    assert exc_info.value.code == 1
+    assert "interval" in capsys.readouterr().err
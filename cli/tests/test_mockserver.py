@@ -0,0 +1,115 @@
+"""
+Tests for the local mock DeepSeek API server, using the real HTTP transport
+"""
+
+import time
+
+import pytest
+from unittest.mock import patch
+
+from deepseek_balance.cache import MemoryCache
+from deepseek_balance.circuit import CircuitBreaker, CircuitOpenError
+from deepseek_balance.client import DeepSeekClient
+from deepseek_balance.mockserver import MockServer
+from deepseek_balance.retry import RetryPolicy, NO_RETRY
+
+
+def test_mock_server_serves_endpoints():
+    """Test balance, models and usage payloads over real HTTP."""
+    with MockServer(currencies=2, models=4, usage_models=3) as server:
+        with DeepSeekClient("sk-test", base_url=server.url) as client:
+            balance = client.get_balance()
+            models = client.get_models()
+            usage = client.get_usage("2024-01-01", "2024-01-10")
+    
+    assert balance["is_available"] is True
+    assert [info["currency"] for info in balance["balance_infos"]] == ["USD", "CNY"]
+    assert len(models["data"]) == 4
+    assert models["data"][0]["id"] == "deepseek-chat"
+    assert len(usage["data"]) == 30
+    assert usage["data"][0]["date"] == "2024-01-01"
+    assert set(usage["data"][0]) >= {"model", "prompt_tokens", "completion_tokens", "cost"}
+
+
+def test_iter_usage_streams_records():
+    """Test streaming usage records over real HTTP, and its errors."""
+    with MockServer(usage_models=3) as server:
+        with DeepSeekClient("sk-test", base_url=server.url) as client:
+            records = client.iter_usage("2024-01-01", "2024-01-10", chunk_size=64)
+            assert next(records)["date"] == "2024-01-01"
+            assert len(list(records)) == 29
+            assert list(client.iter_usage("2024-01-01", "2024-01-10")) == client.get_usage("2024-01-01", "2024-01-10")["data"]
+
+        with DeepSeekClient("sk-invalid-1", base_url=server.url, retry=NO_RETRY) as client:
+            with pytest.raises(Exception, match="Failed to fetch usage"):
+                list(client.iter_usage("2024-01-01", "2024-01-02"))
+
+
+def test_mock_server_is_deterministic_per_token():
+    """Test that each token gets its own stable balance."""
+    with MockServer() as server:
+        with DeepSeekClient("sk-a", base_url=server.url) as a, DeepSeekClient("sk-b", base_url=server.url) as b:
+            assert a.get_balance() == a.get_balance()
+            assert a.get_balance() != b.get_balance()
+
+
+def test_mock_server_rejects_invalid_tokens():
+    """Test that sk-invalid tokens get a 401."""
+    with MockServer() as server:
+        client = DeepSeekClient("sk-invalid-1", base_url=server.url)
+        assert client.check_health() is False
+        with pytest.raises(Exception, match="401"):
+            client.get_balance()
+
+
+def test_mock_server_etag_revalidation():
+    """Test conditional requests end to end."""
+    with MockServer() as server:
+        client = DeepSeekClient("sk-test", base_url=server.url, cache=MemoryCache(), cache_ttl=0)
+        first = client.get_models()
+        assert client.get_models() is first
+    assert server.status_counts == {200: 1, 304: 1}
+
+
+@patch("deepseek_balance.client.time.sleep")
+def test_mock_server_429_burst_is_retried(mock_sleep):
+    """Test that retries ride out a 429 burst and honour Retry-After."""
+    with MockServer(burst_every=2, burst_length=1, retry_after=2) as server:
+        client = DeepSeekClient("sk-test", base_url=server.url, retry=RetryPolicy(max_attempts=3, jitter=False))
+        for _ in range(3):
+            client.get_balance()
+    assert server.status_counts == {200: 3, 429: 1}
+    assert mock_sleep.call_count == 1
+    assert all(call[0][0] >= 2 for call in mock_sleep.call_args_list)
+
+
+def test_mock_server_errors_open_circuit():
+    """Test that injected 5xx errors open the circuit breaker."""
+    with MockServer(error_rate=1.0, seed=1) as server:
+        client = DeepSeekClient(
+            "sk-test", base_url=server.url, retry=NO_RETRY, circuit_breaker=CircuitBreaker(failure_threshold=2)
+        )
+        for _ in range(2):
+            with pytest.raises(Exception, match="Failed to fetch balance"):
+                client.get_balance()
+        with pytest.raises(CircuitOpenError):
+            client.get_balance()
+    assert server.request_count == 2
+
+
+def test_mock_server_latency():
+    """Test configured latency and read timeouts."""
+    with MockServer(latency=0.2) as server:
+        client = DeepSeekClient("sk-test", base_url=server.url, retry=NO_RETRY, read_timeout=0.05)
+        started = time.perf_counter()
+        assert client.check_health() is False
+        assert time.perf_counter() - started < 0.2
+
+
+def test_mock_server_spend_per_request():
+    """Test that balances decrease when spending is emulated."""
+    with MockServer(spend_per_request=1.0) as server:
+        client = DeepSeekClient("sk-test", base_url=server.url)
+        first = float(client.get_balance()["balance_infos"][0]["total_balance"])
+        second = float(client.get_balance()["balance_infos"][0]["total_balance"])
+    assert first - second == pytest.approx(1.0)
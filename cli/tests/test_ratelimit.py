@@ -0,0 +1,77 @@
+"""
+Tests for the token-bucket rate limiters
+"""
+
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from deepseek_balance.ratelimit import RateLimiter, FileRateLimiter
+
+
+class FakeClock:
+    """Controllable replacement for time.time."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limiter_allows_burst_then_paces():
+    """Test that a full bucket serves a burst, then waits reflect the rate."""
+    clock = FakeClock()
+    with patch("deepseek_balance.ratelimit.time.time", clock):
+        limiter = RateLimiter(rate=2, burst=3)
+        assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.reserve() == pytest.approx(0.5)
+        assert limiter.reserve() == pytest.approx(1.0)
+        
+        clock.now += 10
+        assert limiter.reserve() == 0.0
+
+
+def test_rate_limiter_validates_arguments():
+    """Test rejected configurations."""
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+    with pytest.raises(ValueError):
+        RateLimiter(rate=1, burst=0)
+    assert RateLimiter(rate=0.5).burst == 1
+
+
+def test_rate_limiter_is_thread_safe():
+    """Test that concurrent reservations never hand out the same slot."""
+    clock = FakeClock()
+    waits = []
+    with patch("deepseek_balance.ratelimit.time.time", clock):
+        limiter = RateLimiter(rate=10, burst=1)
+        threads = [threading.Thread(target=lambda: waits.append(limiter.reserve())) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert sorted(round(w, 6) for w in waits) == [round(i / 10, 6) for i in range(20)]
+
+
+def test_file_rate_limiter_shares_bucket_between_instances(tmp_path):
+    """Test that limiters using the same state file share one quota."""
+    clock = FakeClock()
+    path = str(tmp_path / "limits" / "ratelimit.state")
+    with patch("deepseek_balance.ratelimit.time.time", clock):
+        first = FileRateLimiter(rate=1, burst=2, path=path)
+        second = FileRateLimiter(rate=1, burst=2, path=path)
+        assert first.reserve() == 0.0
+        assert second.reserve() == 0.0
+        assert first.reserve() == pytest.approx(1.0)
+        assert second.reserve() == pytest.approx(2.0)
+
+
+def test_file_rate_limiter_recovers_from_corrupt_state(tmp_path):
+    """Test that an unreadable state file starts a full bucket."""
+    path = tmp_path / "ratelimit.state"
+    path.write_text("garbage")
+    limiter = FileRateLimiter(rate=1, burst=1, path=str(path))
+    assert limiter.reserve() == 0.0
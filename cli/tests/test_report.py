@@ -0,0 +1,123 @@
+"""
+Tests for usage reports
+"""
+
+import json
+from datetime import date
+
+import pytest
+
+from deepseek_balance import cli, report
+from deepseek_balance.usage import UsageStore
+
+np = pytest.importorskip("numpy")
+
+START = date(2024, 1, 1)
+END = date(2024, 1, 2)
+
+
+def record(day, model, prompt, completion, cost, currency="USD"):
+    return {
+        "date": day.isoformat(), "model": model, "prompt_tokens": prompt, "completion_tokens": completion,
+        "total_tokens": prompt + completion, "cost": cost, "currency": currency,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = UsageStore(str(tmp_path))
+    store.write_day("acct-b", START, [
+        record(START, "deepseek-reasoner", 10, 5, "0.000100"),
+        record(START, "deepseek-chat", 20, 1, "0.000200"),
+    ], label="sk-b...")
+    store.write_day("acct-a", START, [record(START, "deepseek-chat", 1, 2, "1.5", currency="CNY")], label="sk-a...")
+    store.write_day("acct-a", END, [record(END, "deepseek-chat", 3, 4, "0.000003")])
+    store.save_checkpoint()
+    return store
+
+
+@pytest.mark.parametrize("dense", [report.DENSE_GROUPS, 0])
+def test_group_sums_matches_python(dense, monkeypatch):
+    """Test the dense and sorted group-by paths against a dictionary sum."""
+    monkeypatch.setattr(report, "DENSE_GROUPS", dense)
+    rng = np.random.default_rng(0)
+    a, b = rng.integers(0, 3, 1000), rng.integers(0, 50, 1000)
+    v = rng.integers(0, 10**12, 1000)
+
+    keys, counts, sums = report.group_sums([a, b], [3, 50], {"v": v})
+    expected = {}
+    for key in zip(a.tolist(), b.tolist(), v.tolist()):
+        expected.setdefault(key[:2], [0, 0])
+        expected[key[:2]][0] += 1
+        expected[key[:2]][1] += key[2]
+    assert list(zip(keys[0].tolist(), keys[1].tolist())) == sorted(expected)
+    assert counts.tolist() == [expected[key][0] for key in sorted(expected)]
+    assert sums["v"].tolist() == [expected[key][1] for key in sorted(expected)]
+
+
+def test_usage_report_groups_by_dimensions_and_currency(store):
+    """Test grouping order, labels, currency splits and exact costs."""
+    by_model = report.usage_report(store)
+    assert [(row["model"], row["currency"]) for row in by_model] == [
+        ("deepseek-chat", "CNY"), ("deepseek-chat", "USD"), ("deepseek-reasoner", "USD"),
+    ]
+    assert by_model[1] == {
+        "model": "deepseek-chat", "currency": "USD", "records": 2, "prompt_tokens": 23,
+        "completion_tokens": 5, "total_tokens": 28, "cost": "0.000203",
+    }
+
+    rows = report.usage_report(store, by=["token", "day"], start=START, end=START)
+    assert [(row["account"], row["date"], row["cost"]) for row in rows] == [
+        ("sk-a...", "2024-01-01", "1.500000"), ("sk-b...", "2024-01-01", "0.000300"),
+    ]
+    assert report.usage_report(store, by=["day"], account="sk-a...", model="deepseek-reasoner") == []
+    with pytest.raises(ValueError, match="Unknown report dimension 'user'"):
+        report.usage_report(store, by=["model", "user"])
+
+
+def test_usage_report_sums_missing_and_float_tokens(tmp_path):
+    """Test that missing token counts count as zero and whole floats as integers."""
+    store = UsageStore(str(tmp_path))
+    chat = {"model": "deepseek-chat", "prompt_tokens": 1000, "completion_tokens": 5, "cost": "0.1", "currency": "USD"}
+    store.write_day("acct", START, [{**chat, "total_tokens": 1005}, {**chat, "total_tokens": None}])
+    store.write_day("acct", date(2024, 2, 1), [{**chat, "total_tokens": 1005.0}])
+    store.write_day("acct", date(2024, 3, 1), [{**chat, "total_tokens": None}])
+
+    (row,) = report.usage_report(store)
+    assert row["records"] == 4
+    assert (row["prompt_tokens"], row["total_tokens"], row["cost"]) == (4000, 2010, "0.400000")
+    assert isinstance(row["total_tokens"], int)
+
+    store.write_day("acct", date(2024, 4, 1), [{**chat, "total_tokens": 0.5}])
+    with pytest.raises(ValueError, match="'total_tokens' is not a whole number"):
+        report.usage_report(store)
+    store.write_day("acct", date(2024, 4, 1), [{**chat, "total_tokens": "lots"}])
+    with pytest.raises(ValueError, match="'total_tokens' is stored with different types"):
+        report.usage_report(store)
+    text = UsageStore(str(tmp_path / "text"))
+    text.write_day("acct", START, [{**chat, "total_tokens": "lots"}])
+    with pytest.raises(ValueError, match="'total_tokens' is not numeric"):
+        report.usage_report(text)
+
+
+def test_usage_report_command(store, capsys):
+    """Test dsbc usage report text, JSON and NDJSON output."""
+    argv = ["usage", "report", "--usage-dir", store.directory]
+    cli.main(argv + ["--by", "model,day"])
+    text = capsys.readouterr().out
+    assert "DEEPSEEK USAGE REPORT" in text
+    assert "  - deepseek-reasoner  2024-01-01  in 10  out 5  cost 0.000100 USD" in text
+    assert "  Total: in 33  out 10  cost 0.000303 USD" in text
+    assert "  Total: in 1  out 2  cost 1.500000 CNY" in text
+
+    cli.main(argv + ["--by", "token", "--json"])
+    assert [row["account"] for row in json.loads(capsys.readouterr().out)] == ["sk-a...", "sk-a...", "sk-b..."]
+
+    cli.main(argv + ["--by", "day", "--ndjson", "--start", "2024-01-02"])
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["date"] for line in lines] == ["2024-01-02"]
+
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main(argv + ["--by", "hour"])
+    assert exc_info.value.code == 1
+    assert "Unknown report dimension" in capsys.readouterr().err
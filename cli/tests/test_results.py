@@ -0,0 +1,163 @@
+"""
+Tests for the typed result objects
+"""
+
+import json
+import pickle
+import sys
+from decimal import Decimal
+
+import pytest
+from unittest.mock import Mock, patch
+
+from deepseek_balance import jsonlib
+from deepseek_balance.cache import MemoryCache
+from deepseek_balance.cli import format_balance, format_balance_line
+from deepseek_balance.client import DeepSeekClient
+from deepseek_balance.results import (
+    Balance,
+    BalanceInfo,
+    Model,
+    UsageRecord,
+    format_amount,
+    format_rounded,
+    parse_amount,
+    parse_list,
+)
+
+BALANCE = {
+    "is_available": True,
+    "balance_infos": [
+        {"currency": "USD", "total_balance": "18.87", "granted_balance": "0.00", "topped_up_balance": "18.87"},
+        {"currency": "CNY", "total_balance": "110.50", "granted_balance": "10.00", "topped_up_balance": "100.50"},
+    ],
+}
+
+
+def test_amounts_are_exact_micro_units():
+    """Test amount parsing, validation and formatting."""
+    assert parse_amount("18.87") == 18_870_000
+    assert parse_amount(2) == 2_000_000
+    assert parse_amount(0.1) == 100_000
+    assert parse_amount("0.1230000") == 123_000 and parse_amount("1e-6") == 1
+    assert parse_amount(0.30000000000000004) == 300_000
+    assert parse_amount(None) is None
+    with pytest.raises(ValueError, match="Invalid amount"):
+        parse_amount("n/a")
+    for value in ("0.1234567", "0.0000015"):
+        with pytest.raises(ValueError, match="more than 6 decimal places"):
+            parse_amount(value)
+    for value in ("Infinity", "-inf", "NaN", float("inf"), float("nan")):
+        with pytest.raises(ValueError, match="not a finite number"):
+            parse_amount(value)
+
+    assert format_amount(18_870_000) == "18.87"
+    assert format_amount(18_875_000) == "18.875"
+    assert format_amount(10, places=6) == "0.000010"
+    assert format_amount(-1_500_000) == "-1.50"
+    assert format_amount(3_000_000, places=0) == "3"
+    assert [format_rounded(m) for m in (18_874_999, 18_875_000, 18_885_000, -1_505_000, -5_000, 0)] == [
+        "18.87", "18.88", "18.88", "-1.50", "0.00", "0.00",
+    ]
+    assert format_rounded(2_500_000, places=0) == "2"
+    assert format_rounded(10 ** 21 + 1) == "1000000000000000.00"
+    assert parse_amount("-0.5") == -500_000 and parse_amount(" 1.5") == 1_500_000
+
+
+def test_balance_reads_like_the_response_dict():
+    """Test typed fields alongside dict access, equality and JSON output."""
+    balance = Balance.from_dict({**BALANCE, "note": "new field"})
+    usd = balance.info("USD")
+    assert usd.total_balance == Decimal("18.87") and usd.total_micros == 18_870_000
+    assert balance.info("EUR") is None
+
+    assert balance["balance_infos"][1]["total_balance"] == "110.50"
+    assert balance.get("note") == "new field" and balance.extra == {"note": "new field"}
+    assert balance.get("missing", 0) == 0 and "missing" not in balance
+    assert list(balance) == ["is_available", "balance_infos", "note"]
+    assert balance == {**BALANCE, "note": "new field"}
+    assert {**usd} == BALANCE["balance_infos"][0]
+    assert json.loads(jsonlib.dumps(balance)) == {**BALANCE, "note": "new field"}
+    assert json.loads(json.dumps(balance.to_dict())) == {**BALANCE, "note": "new field"}
+    assert pickle.loads(pickle.dumps(balance)) == balance
+    assert Balance.from_dict(balance) is balance
+
+    nulls = {"is_available": None, "balance_infos": [{"currency": None, "total_balance": "1.500"}]}
+    parsed = Balance.from_dict(nulls)
+    assert parsed["is_available"] is None and parsed.get("is_available", "absent") is None
+    assert list(parsed) == ["is_available", "balance_infos"] and list(parsed["balance_infos"][0]) == [
+        "currency", "total_balance",
+    ]
+    assert parsed.to_dict() == {"is_available": None, "balance_infos": [{"currency": None, "total_balance": "1.50"}]}
+    assert pickle.loads(pickle.dumps(parsed)) == parsed
+
+    partial = BalanceInfo.from_dict({"currency": "USD"})
+    assert partial.total_balance is None and dict(partial) == {"currency": "USD"}
+    with pytest.raises(KeyError):
+        partial["total_balance"]
+    with pytest.raises(ValueError, match="JSON object"):
+        Balance.from_dict(["not", "an", "object"])
+
+
+def test_list_entries_are_compact():
+    """Test models and usage records, and that they carry no per-instance dict."""
+    usage = parse_list({"object": "list", "data": [
+        {"date": "2024-01-01", "model": "deepseek-chat", "prompt_tokens": 10, "completion_tokens": 5,
+         "total_tokens": 15, "cost": "0.000010", "currency": "USD"},
+    ]}, UsageRecord)
+    record = usage["data"][0]
+    assert record.cost == Decimal("0.00001") and record.cost_micros == 10
+    assert record["cost"] == "0.000010" and record.get("currency") == "USD"
+    assert parse_list(usage, UsageRecord) is usage
+    assert parse_list({"error": "x"}, Model) == {"error": "x"}
+
+    model = Model.from_dict({"id": "deepseek-chat", "object": "model", "owned_by": "deepseek"})
+    assert model.id == "deepseek-chat" and model["owned_by"] == "deepseek"
+    assert repr(model) == "Model(id='deepseek-chat', object='model', owned_by='deepseek')"
+
+    for result in (record, model, Balance.from_dict(BALANCE), BalanceInfo()):
+        assert not hasattr(result, "__dict__")
+    assert sys.getsizeof(record) < sys.getsizeof(record.to_dict())
+    assert record.model is UsageRecord.from_dict({"model": "deepseek-" + "chat"}).model
+
+
+def test_formatting_uses_typed_amounts():
+    """Test that the formatters accept typed and raw balances alike."""
+    balance = Balance.from_dict(BALANCE)
+    assert format_balance(balance) == format_balance(BALANCE)
+    assert "Total Balance:     110.50 CNY" in format_balance(balance)
+    assert format_balance_line(balance) == (
+        "✅ Available  18.87 USD (topped-up 18.87, granted 0.00)  "
+        "110.50 CNY (topped-up 100.50, granted 10.00)"
+    )
+    assert "❌ Unavailable" in format_balance_line({"is_available": False})
+
+
+@patch("deepseek_balance.client.requests.Session.get")
+def test_client_returns_dicts_unless_typed(mock_get):
+    """Test plain dict results by default, typed ones on request, and invalid amounts."""
+    response = Mock()
+    response.status_code = 200
+    response.headers = {"ETag": '"v1"'}
+    response.content = json.dumps(BALANCE).encode()
+    mock_get.return_value = response
+
+    client = DeepSeekClient("test-token")
+    balance = client.get_balance()
+    assert type(balance) is dict and json.loads(json.dumps(balance)) == BALANCE
+    assert type(client.get_status()["balance"]) is dict
+    typed = client.get_balance(typed=True)
+    assert isinstance(typed, Balance) and typed == BALANCE
+    assert isinstance(client.get_status(typed=True)["balance"], Balance)
+
+    response.content = json.dumps({"data": [{"id": "deepseek-chat"}]}).encode()
+    client = DeepSeekClient("test-token", cache=MemoryCache(), cache_ttl=60)
+    assert isinstance(client.get_models(typed=True)["data"][0], Model)
+    assert type(client.get_models()["data"][0]) is dict
+    assert mock_get.call_count == 5
+    json.dumps(client.get_models())
+
+    for amount in ("lots", "Infinity", "0.1234567"):
+        response.content = json.dumps({"balance_infos": [{"total_balance": amount}]}).encode()
+        with pytest.raises(Exception, match="Failed to fetch balance: Invalid amount"):
+            client.get_balance(typed=True)
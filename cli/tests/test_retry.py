@@ -0,0 +1,54 @@
+"""
+Tests for the retry policy
+"""
+
+import pytest
+
+from deepseek_balance.retry import RetryPolicy, parse_retry_after, NO_RETRY
+
+
+def test_backoff_grows_exponentially_and_is_capped():
+    """Test exponential backoff without jitter."""
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+    assert [policy.backoff(n) for n in range(1, 5)] == [1, 2, 4, 5]
+
+
+def test_backoff_jitter_stays_within_bounds():
+    """Test that jittered delays never exceed the backoff value."""
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+    for attempt in range(1, 6):
+        for _ in range(20):
+            assert 0 <= policy.backoff(attempt) <= min(5, 2 ** (attempt - 1))
+
+
+def test_parse_retry_after():
+    """Test Retry-After parsing for seconds and HTTP dates."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    now = 1705329000.0  # Mon, 15 Jan 2024 14:30:00 GMT
+    assert parse_retry_after("Mon, 15 Jan 2024 14:30:30 GMT", now=now) == 30.0
+
+
+def test_delay_honours_retry_after():
+    """Test that Retry-After raises the delay up to the cap but is optional."""
+    policy = RetryPolicy(backoff_factor=1, jitter=False)
+    assert policy.delay(1, "10") == 10.0
+    assert policy.delay(1, None) == 1
+    assert policy.delay(1, "86400") == policy.max_backoff
+    assert RetryPolicy(backoff_factor=1, jitter=False, respect_retry_after=False).delay(1, "10") == 1
+
+
+def test_retry_statuses():
+    """Test which statuses are retried by default."""
+    policy = RetryPolicy()
+    assert policy.should_retry_status(429)
+    assert policy.should_retry_status(503)
+    assert not policy.should_retry_status(401)
+    assert NO_RETRY.max_attempts == 1
+
+
+def test_invalid_max_attempts():
+    """Test that at least one attempt is required."""
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
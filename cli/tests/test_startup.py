@@ -0,0 +1,82 @@
+"""
+Startup-time budget for the dsbc command
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+
+CLI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported by `dsbc --help` or `dsbc --version`
+HEAVY_MODULES = ["requests", "urllib3", "aiohttp", "concurrent.futures", "email.utils", "rich", "typer", "orjson"]
+
+# Cumulative import time budget for deepseek_balance.cli, in microseconds.
+# Generous for slow CI machines; importing requests alone exceeds it.
+IMPORT_BUDGET_US = 60_000
+
+
+def run_python(code, *flags):
+    """Run code in a fresh interpreter using the source tree."""
+    env = dict(os.environ, PYTHONPATH=CLI_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=CLI_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_version_and_help_do_not_load_heavy_modules():
+    """Test that --version and --help never import the HTTP stack."""
+    for flag in ("--version", "--help"):
+        code = (
+            "import json, sys\n"
+            "from deepseek_balance.cli import main\n"
+            "try:\n"
+            f"    main([{flag!r}])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]), file=sys.stderr)\n"
+        )
+        result = run_python(code)
+        assert json.loads(result.stderr.strip().splitlines()[-1]) == [], flag
+
+
+def test_package_import_is_lazy():
+    """Test that public names still resolve on first access."""
+    code = (
+        "import sys, deepseek_balance\n"
+        "assert 'requests' not in sys.modules\n"
+        "assert deepseek_balance.DeepSeekClient.__name__ == 'DeepSeekClient'\n"
+        "assert 'requests' in sys.modules\n"
+        "assert 'DeepSeekClient' in dir(deepseek_balance)\n"
+    )
+    run_python(code)
+
+
+def test_async_client_does_not_load_requests():
+    """Test that aiohttp-only users never import the requests stack."""
+    code = (
+        "import sys\n"
+        "import deepseek_balance.async_client\n"
+        "assert 'requests' not in sys.modules\n"
+        "assert 'deepseek_balance.client' not in sys.modules\n"
+    )
+    run_python(code)
+
+
+def test_cli_import_time_budget():
+    """Test that importing the CLI stays within the startup budget."""
+    result = run_python("import deepseek_balance.cli", "-X", "importtime")
+    cumulative = None
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*deepseek_balance\.cli$", line)
+        if match:
+            cumulative = int(match.group(1))
+    assert cumulative is not None
+    assert cumulative < IMPORT_BUDGET_US, f"deepseek_balance.cli imported in {cumulative}us"
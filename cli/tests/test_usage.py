@@ -0,0 +1,202 @@
+"""
+Tests for usage sync
+"""
+
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from deepseek_balance import cli
+from deepseek_balance.client import token_fingerprint
+from deepseek_balance.mockserver import MockServer
+from deepseek_balance.retry import NO_RETRY
+from deepseek_balance.usage import UsageStore, day_range, sync_usage
+
+START = date(2024, 1, 1)
+END = date(2024, 1, 5)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def test_pending_days_skip_final_days(tmp_path):
+    """Test that only new days and days fetched before they settled are pending."""
+    store = UsageStore(str(tmp_path))
+    store.write_day("acct", date(2024, 1, 1), [], fetched_at=utc(2024, 1, 3))
+    store.write_day("acct", date(2024, 1, 2), [], fetched_at=utc(2024, 1, 3, 12))
+
+    pending = store.pending_days("acct", date(2024, 1, 1), date(2024, 1, 3), settle=86400)
+    assert pending == [date(2024, 1, 2), date(2024, 1, 3)]
+    assert store.pending_days("acct", date(2024, 1, 1), date(2024, 1, 1), settle=2 * 86400) == [date(2024, 1, 1)]
+    assert day_range(END, END) == [END]
+
+
+def test_write_day_detects_changes_and_persists(tmp_path):
+    """Test change detection and the on-disk checkpoint."""
+    store = UsageStore(str(tmp_path))
+    records = [{"date": "2024-01-01", "model": "deepseek-chat", "total_tokens": 10}]
+    assert store.write_day("acct", START, records, label="sk-a...") is True
+    assert store.write_day("acct", START, records) is False
+    assert store.write_day("acct", START, records + records) is True
+    store.save_checkpoint()
+
+    reopened = UsageStore(str(tmp_path))
+    assert reopened.accounts() == {"acct": "sk-a..."}
+    assert reopened.synced_days("acct")["2024-01-01"]["records"] == 2
+    assert reopened.read_day("acct", START) == records + records
+    assert reopened.read_day("acct", END) is None
+    assert [record for _, record in reopened.iter_records(account="sk-a...")] == records + records
+
+
+def test_corrupt_checkpoint_falls_back_to_full_resync(tmp_path, caplog):
+    """Test that an unreadable checkpoint is logged and every day becomes pending."""
+    store = UsageStore(str(tmp_path))
+    store.write_day("acct", START, [], fetched_at=utc(2024, 2, 1))
+    store.save_checkpoint()
+    with open(store.checkpoint_path, "r+b") as f:
+        f.truncate(10)
+
+    reopened = UsageStore(str(tmp_path))
+    assert "unreadable usage checkpoint" in caplog.text
+    assert reopened.pending_days("acct", START, START) == [START]
+    reopened.save_checkpoint()
+    assert UsageStore(str(tmp_path)).accounts() == {}
+
+
+def test_store_is_partitioned_by_month(tmp_path):
+    """Test the columnar layout and scanning only the requested columns."""
+    np = pytest.importorskip("numpy")
+    store = UsageStore(str(tmp_path))
+    store.write_day("acct", START, [
+        {"date": "2024-01-01", "model": "deepseek-chat", "prompt_tokens": 10, "cost": "0.000010", "currency": "USD"},
+        {"date": "2024-01-01", "model": "org/model", "prompt_tokens": 5, "cost": "1.5", "currency": "USD"},
+    ], label="sk-a...")
+    store.write_day("acct", END, [{"date": "2024-01-05", "model": "deepseek-chat", "prompt_tokens": 7}])
+    store.write_day("acct", date(2024, 2, 1), [{"date": "2024-02-01", "model": "deepseek-chat", "prompt_tokens": 1}])
+
+    assert sorted(os.listdir(tmp_path / "acct")) == ["month=2024-01", "month=2024-02"]
+    month_dir = tmp_path / "acct" / "month=2024-01"
+    assert sorted(os.listdir(month_dir / "records")) == [
+        "cost.bin", "currency.bin", "date.bin", "model.bin", "prompt_tokens.bin",
+    ]
+    assert store.read_day("acct", START)[1] == {
+        "date": "2024-01-01", "model": "org/model", "prompt_tokens": 5, "cost": "1.500000", "currency": "USD",
+    }
+    assert store.read_day("acct", END) == [
+        {"date": "2024-01-05", "model": "deepseek-chat", "prompt_tokens": 7, "cost": None, "currency": None},
+    ]
+
+    scanned = store.scan(["prompt_tokens", "cost"], account="sk-a...", end=END)
+    assert scanned.accounts == ["acct"]
+    assert scanned.models == ["deepseek-chat", "org/model"]
+    assert scanned.model.tolist() == [0, 1, 0]
+    assert scanned.day.tolist() == [START, START, END]
+    assert scanned.columns["prompt_tokens"].tolist() == [10, 5, 7]
+    assert scanned.columns["cost"].tolist() == [10, 1_500_000, 0]
+    assert scanned.scales == {"cost": 6}
+
+    assert store.scan(["prompt_tokens"], start=END, model="deepseek-chat").columns["prompt_tokens"].tolist() == [7, 1]
+    only_org = store.scan(["prompt_tokens"], model="org/model")
+    assert only_org.models == ["org/model"] and only_org.model.tolist() == [0]
+    assert store.scan(["prompt_tokens"], account="other").columns["prompt_tokens"].size == 0
+    currencies = store.scan(["currency"], end=END)
+    assert currencies.dictionaries == {"currency": ["USD", None]}
+    assert currencies.columns["currency"].tolist() == [0, 0, 1]
+    store.write_day("acct", date(2024, 2, 1), [{"date": "2024-02-01", "model": "deepseek-chat", "cost": "n/a"}])
+    with pytest.raises(ValueError, match="different types"):
+        store.scan(["cost"])
+    assert np.issubdtype(scanned.account.dtype, np.unsignedinteger)
+
+
+def test_write_days_rewrites_each_month_once(tmp_path):
+    """Test that several days of a month are stored together and replace older records."""
+    store = UsageStore(str(tmp_path))
+    store.write_day("acct", START, [{"model": "a", "total_tokens": 1}])
+    changed = store.write_days("acct", {
+        START: [{"model": "a", "total_tokens": 2}],
+        END: [{"model": "b", "total_tokens": 3}],
+        date(2024, 2, 1): [],
+    }, fetched_at={END: 5.0})
+    assert changed == {START: True, END: True, date(2024, 2, 1): True}
+    assert [record for _, record in store.iter_records()] == [
+        {"model": "a", "total_tokens": 2, "date": "2024-01-01"},
+        {"model": "b", "total_tokens": 3, "date": "2024-01-05"},
+    ]
+    assert store.read_day("acct", date(2024, 2, 1)) == []
+    assert store.synced_days("acct")["2024-01-05"]["fetched_at"] == 5.0
+
+
+def test_sync_fetches_each_day_once(tmp_path):
+    """Test parallel day chunks and incremental re-syncs."""
+    store = UsageStore(str(tmp_path))
+    with MockServer(usage_models=3) as server:
+        options = {"base_url": server.url, "retry": NO_RETRY}
+        results = list(sync_usage(store, ["sk-a", "sk-b", "sk-a"], START, END, max_workers=4, **options))
+        assert server.request_count == 10
+        assert all(result.error is None and result.records == 3 and result.changed for result in results)
+
+        assert list(sync_usage(UsageStore(str(tmp_path)), ["sk-a", "sk-b"], START, END, **options)) == []
+        assert server.request_count == 10
+
+        refetched = list(sync_usage(store, ["sk-a"], START, END, full=True, **options))
+        assert server.request_count == 15
+        assert not any(result.changed for result in refetched)
+
+    assert os.listdir(tmp_path / token_fingerprint("sk-a")) == ["month=2024-01"]
+    records = [record for _, record in store.iter_records(token_fingerprint("sk-a"))]
+    assert [record["date"] for record in records[::3]] == [day.isoformat() for day in day_range(START, END)]
+
+
+def test_sync_refetches_unsettled_and_failed_days(tmp_path):
+    """Test that today and failed days are fetched again on the next sync."""
+    today = datetime.now(timezone.utc).date()
+    store = UsageStore(str(tmp_path))
+    with MockServer() as server:
+        options = {"base_url": server.url, "retry": NO_RETRY, "settle": 0}
+        results = list(sync_usage(store, ["sk-a", "sk-invalid-1"], today - timedelta(days=3), today, **options))
+        assert sum(result.error is not None for result in results) == 4
+
+        again = list(sync_usage(store, ["sk-a", "sk-invalid-1"], today - timedelta(days=3), today, **options))
+    assert sorted((result.token, result.day) for result in again if result.error is None) == [("sk-a", today)]
+    assert len(again) == 5
+
+    with pytest.raises(ValueError):
+        list(sync_usage(store, ["sk-a"], END, START))
+
+
+def test_usage_sync_command(tmp_path, capsys):
+    """Test dsbc usage sync text and NDJSON output."""
+    usage_dir = str(tmp_path / "usage")
+    with MockServer() as server:
+        argv = [
+            "usage", "sync", "-t", "sk-a", "--base-url", server.url, "--retries", "0",
+            "--start", "2024-01-01", "--end", "2024-01-03", "--usage-dir", usage_dir,
+        ]
+        cli.main(argv + ["--ndjson"])
+        lines = capsys.readouterr().out.splitlines()
+        cli.main(argv)
+        text = capsys.readouterr().out
+
+    records = sorted((json.loads(line) for line in lines), key=lambda record: record["date"])
+    assert records[0] == {"account": "sk-a...", "date": "2024-01-01", "records": 2, "changed": True}
+    assert len(records) == 3
+    assert "Synced 1 accounts from 2024-01-01 to 2024-01-03: 0 days fetched (0 changed), 0 failed, 3 up to date" in text
+
+
+def test_usage_sync_command_errors(tmp_path, capsys):
+    """Test dsbc usage argument validation and failure exit codes."""
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main(["usage", "sync", "-t", "sk-a", "--start", "2999-01-01", "--usage-dir", str(tmp_path)])
+    assert exc_info.value.code == 1
+    assert "is after the last day" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        cli.main(["usage", "sync", "--start", "01/02/2024"])
+    assert "invalid date" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        cli.main(["usage"])
+    assert "sync" in capsys.readouterr().err
@@ -0,0 +1,184 @@
+"""
+Tests for watch mode
+"""
+
+import json
+
+import pytest
+from unittest.mock import patch
+
+from deepseek_balance import cli
+from deepseek_balance.mockserver import MockServer
+from deepseek_balance.retry import NO_RETRY
+from deepseek_balance.watch import Watcher
+
+
+class FakeClock:
+    """Monotonic clock advanced by the watcher's sleeps and by fake request latency."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+        return False
+
+
+def test_watcher_reports_changes_only():
+    """Test that unchanged balances are polled but not reported."""
+    with MockServer() as server:
+        with Watcher(["sk-a", "sk-b"], interval=1, base_url=server.url) as watcher:
+            first = watcher.poll()
+            second = watcher.poll()
+
+    assert [event["token"] for event in first] == ["sk-a", "sk-b"]
+    assert all(event["changed"] and event["report"] for event in first)
+    assert not any(event["changed"] or event["report"] for event in second)
+    assert server.request_count == 4
+
+
+def test_watcher_detects_spend_and_errors():
+    """Test that balance changes and errors are reported."""
+    with MockServer(spend_per_request=0.01) as server:
+        with Watcher(["sk-a", "sk-invalid-1"], interval=1, base_url=server.url, retry=NO_RETRY) as watcher:
+            watcher.poll()
+            events = watcher.poll()
+
+    spending, failing = events
+    assert spending["changed"] is True
+    assert spending["error"] is None
+    assert failing["balance"] is None
+    assert "401" in failing["error"]
+    assert failing["changed"] is False
+
+
+def test_watcher_heartbeat_reports_unchanged_balances():
+    """Test that heartbeat reports follow the schedule, not request latency."""
+    with MockServer() as server:
+        with Watcher(["sk-a"], interval=10, heartbeat=30, base_url=server.url) as watcher:
+            reports = [watcher.poll(at=1000 + 10 * tick)[0]["report"] for tick in range(7)]
+
+    assert reports == [True, False, False, True, False, False, True]
+
+
+def test_watcher_schedule_does_not_drift():
+    """Test that ticks stay anchored to the start time and overruns are skipped."""
+    clock = FakeClock()
+    with MockServer() as server:
+        watcher = Watcher(["sk-a"], interval=10, clock=clock, base_url=server.url)
+        watcher._sleep = clock.sleep
+        scheduled = []
+        latencies = iter([2.0, 25.0, 0.5, 0.0])
+
+        def slow_poll(event):
+            scheduled.append(clock.now)
+            clock.now += next(latencies)
+
+        watcher.add_handler(slow_poll)
+        with watcher:
+            watcher.run(count=4)
+
+    assert scheduled == [1000.0, 1010.0, 1040.0, 1050.0]
+    assert clock.sleeps == [8.0, 5.0, 9.5]
+
+
+def test_watcher_survives_failing_handlers(caplog):
+    """Test that a raising handler is logged and counted, and polling goes on."""
+    seen = []
+
+    def broken(event):
+        raise OSError("disk full")
+
+    with MockServer() as server:
+        with Watcher(["sk-a"], interval=0.01, base_url=server.url) as watcher:
+            watcher.add_handler(broken)
+            watcher.add_handler(seen.append)
+            watcher.add_poll_handler(broken)
+            watcher.run(count=2)
+
+    assert len(seen) == 2
+    assert watcher.polls == 2 and watcher.handler_errors == 4
+    assert watcher.last_poll is not None
+    assert "disk full" in caplog.text
+
+
+def test_watcher_rejects_invalid_options():
+    """Test watcher argument validation."""
+    with pytest.raises(ValueError):
+        Watcher([], interval=1)
+    with pytest.raises(ValueError):
+        Watcher(["sk-a"], interval=0)
+    with pytest.raises(ValueError):
+        Watcher(["sk-a"], interval=1, heartbeat=-1)
+
+
+def test_watch_command_prints_changes(capsys):
+    """Test dsbc watch end to end against the mock server."""
+    with MockServer(spend_per_request=0.5) as server:
+        cli.main(["watch", "-t", "sk-a", "--base-url", server.url, "--interval", "0.01", "--count", "3"])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert all("sk-a..." in line and "✅ Available" in line for line in lines)
+
+
+def test_watch_command_json_and_quiet_when_unchanged(capsys):
+    """Test that JSON watch output skips polls without changes."""
+    with MockServer() as server:
+        cli.main(["watch", "-t", "sk-a", "--base-url", server.url, "--interval", "0.01", "--count", "3", "--json"])
+
+    record = json.loads(capsys.readouterr().out)
+    assert record["account"] == "sk-a..."
+    assert record["balance"]["is_available"] is True
+    assert record["timestamp"].endswith("+00:00")
+    assert server.request_count == 3
+
+
+def test_watch_command_ndjson_per_currency(capsys):
+    """Test that NDJSON watch output has one line per account and currency."""
+    with MockServer(currencies=2) as server:
+        cli.main([
+            "watch", "-t", "sk-a", "-t", "sk-b", "--base-url", server.url,
+            "--interval", "0.01", "--count", "1", "--ndjson",
+        ])
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted((record["account"], record["currency"]) for record in records) == [
+        ("sk-a...", "CNY"), ("sk-a...", "USD"), ("sk-b...", "CNY"), ("sk-b...", "USD"),
+    ]
+    assert all(record["timestamp"].endswith("+00:00") and "total_balance" in record for record in records)
+
+
+def test_watch_command_rejects_invalid_count(capsys):
+    """Test dsbc watch argument validation."""
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main(["watch", "-t", "sk-a", "--count", "0"])
+    assert exc_info.value.code == 1
+    assert "--count" in capsys.readouterr().err
+
+
+def test_main_dispatches_watch():
+    """Test that the watch subcommand is routed to its own parser."""
+    with patch.dict(cli.COMMANDS, {"watch": lambda argv: argv}):
+        assert cli.main(["watch", "--interval", "5"]) == ["--interval", "5"]
+
+
+def test_format_balance_line():
+    """Test the one-line balance summary."""
+    balance = {
+        "is_available": False,
+        "balance_infos": [
+            {"currency": "USD", "total_balance": "18.87", "granted_balance": "1", "topped_up_balance": "17.87"},
+            {"currency": "CNY", "total_balance": "5", "granted_balance": "0", "topped_up_balance": "5"},
+        ],
+    }
+    line = cli.format_balance_line(balance)
+    assert line.startswith("❌ Unavailable")
+    assert "18.87 USD (topped-up 17.87, granted 1.00)" in line
+    assert "5.00 CNY" in line
+    assert cli.format_balance_line({}) == "No balance data received"